@@ -0,0 +1,116 @@
+"""Odkrywanie miejsc algorytmu Alpha (kroki 4-8) i sieć Petriego.
+
+Miejsca odpowiadają maksymalnym parom (A, B), dla których A x B zawiera się
+w relacji przyczynowości (->), a elementy A oraz elementy B są wzajemnie
+niepowiązane (#). Zamiast przeglądać zbiór potęgowy, pary wyznaczamy jako
+maksymalne kliki grafu na wierzchołkach {a_L} ∪ {b_R}:
+  * a_L - a'_L, gdy a # a'     (warunek wewnątrz A),
+  * b_R - b'_R, gdy b # b'     (warunek wewnątrz B),
+  * a_L - b_R,  gdy a -> b     (warunek A x B ⊆ ->).
+Klika z niepustymi obiema stronami to poprawna para, a klika maksymalna to
+para maksymalna. Kliki wylicza algorytm Bron-Kerbosch z pivotem na maskach
+bitowych (int), z odcięciem gałęzi, które nie mogą już dać niepustego B.
+"""
+import numpy as np
+
+
+class PetriNet:
+    """Sieć Petriego: przejścia = aktywności, miejsca = nazwa -> (wejścia, wyjścia)."""
+
+    def __init__(self, transitions, places, initial_place='start', final_place='end'):
+        self.transitions = list(transitions)
+        self.places = places
+        self.initial_place = initial_place
+        self.final_place = final_place
+
+    def input_places(self, transition):
+        return [name for name, (_, outputs) in self.places.items() if transition in outputs]
+
+    def output_places(self, transition):
+        return [name for name, (inputs, _) in self.places.items() if transition in inputs]
+
+    def __repr__(self):
+        return f"PetriNet({len(self.transitions)} przejść, {len(self.places)} miejsc)"
+
+
+def _bits(mask):
+    """Indeksy ustawionych bitów maski."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _neighbour_masks(footprint):
+    """Maski sąsiedztwa grafu par dla wierzchołków 0..n-1 (strona A) i n..2n-1 (strona B)."""
+    n = len(footprint.vocabulary)
+    choice = footprint.choice
+    causality = footprint.causality
+    usable = np.diag(choice) # Aktywność z pętlą (a > a) nie spełnia a # a
+    weights = 1 << np.arange(n, dtype=object)
+
+    def mask(row):
+        return int(weights[row & usable].sum()) if n else 0
+
+    neighbours = [0] * (2 * n)
+    for a in range(n):
+        if not usable[a]:
+            continue
+        in_a = choice[a].copy()
+        in_a[a] = False
+        neighbours[a] = mask(in_a) | (mask(causality[a]) << n)
+        in_b = in_a
+        neighbours[n + a] = (mask(in_b) << n) | mask(causality[:, a])
+    return neighbours, usable
+
+
+def maximal_alpha_pairs(footprint):
+    """Lista maksymalnych par (A, B) jako pary zbiorów nazw aktywności (Y_L algorytmu Alpha)."""
+    n = len(footprint.vocabulary)
+    vocabulary = footprint.vocabulary
+    neighbours, usable = _neighbour_masks(footprint)
+    left_mask = (1 << n) - 1
+    right_mask = left_mask << n
+    candidates = sum(1 << v for v in range(2 * n) if usable[v % n] and neighbours[v])
+
+    pairs = []
+    stack = [(0, candidates, 0)] # (R - bieżąca klika, P - kandydaci, X - wykluczeni)
+    while stack:
+        clique, possible, excluded = stack.pop()
+        if not possible:
+            if not excluded and clique & left_mask and clique & right_mask:
+                a_set = frozenset(vocabulary[v] for v in _bits(clique & left_mask))
+                b_set = frozenset(vocabulary[v - n] for v in _bits(clique & right_mask))
+                pairs.append((a_set, b_set))
+            continue
+        # Odcięcie: bez wierzchołków jednej ze stron w R ∪ P nie powstanie poprawna para
+        reachable = clique | possible
+        if not (reachable & left_mask and reachable & right_mask):
+            continue
+        # Pivot: wierzchołek z P ∪ X o największej liczbie sąsiadów w P
+        pivot = max(_bits(possible | excluded), key=lambda v: bin(neighbours[v] & possible).count('1'))
+        for v in _bits(possible & ~neighbours[pivot]):
+            stack.append((clique | (1 << v), possible & neighbours[v], excluded & neighbours[v]))
+            possible &= ~(1 << v)
+            excluded |= 1 << v
+    return sorted(pairs, key=lambda pair: (sorted(pair[0]), sorted(pair[1])))
+
+
+def observed_start_end(encoded_log):
+    """Zbiory T_I i T_O: aktywności rozpoczynające i kończące ślady."""
+    events, offsets = encoded_log.as_numpy()
+    lengths = np.diff(offsets)
+    starts = offsets[:-1][lengths > 0]
+    ends = offsets[1:][lengths > 0] - 1
+    vocabulary = encoded_log.vocabulary
+    return ({vocabulary[code] for code in np.unique(events[starts])},
+            {vocabulary[code] for code in np.unique(events[ends])})
+
+
+def discover_alpha_net(footprint, start_activities, end_activities):
+    """Sieć Petriego algorytmu Alpha: miejsce dla każdej pary z Y_L oraz miejsca start/end."""
+    places = {'start': (frozenset(), frozenset(start_activities))}
+    for index, (a_set, b_set) in enumerate(maximal_alpha_pairs(footprint), start=1):
+        places[f"p{index}"] = (a_set, b_set)
+    places['end'] = (frozenset(end_activities), frozenset())
+    return PetriNet(footprint.vocabulary, places)
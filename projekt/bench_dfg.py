@@ -0,0 +1,67 @@
+"""Porównanie zliczania aktywności i przejść: pętla w Pythonie vs np.bincount.
+
+Log bazowy (repairexample.xes) jest powielany w pamięci `--scale` razy.
+Przed pomiarem sprawdzana jest zgodność wyników obu metod.
+
+Użycie: python bench_dfg.py [--scale 100] [--repeat 3]
+"""
+import argparse
+import time
+from collections import defaultdict
+
+from dfg import DirectlyFollowsCounts
+from encoded_log import EncodedLog
+from xes_stream import read_workflow_log
+
+
+def count_python(workflow_log):
+    """Dotychczasowa pętla z sekcji 3 projekt.py (na napisach)."""
+    activity_counter = defaultdict(int)
+    transition_counter = defaultdict(int)
+    direct_succession_rel = defaultdict(set)
+    for w_trace in workflow_log:
+        for activity in w_trace:
+            activity_counter[activity] += 1
+        for i in range(len(w_trace) - 1):
+            transition = (w_trace[i], w_trace[i+1])
+            transition_counter[transition] += 1
+            direct_succession_rel[w_trace[i]].add(w_trace[i+1])
+    return activity_counter, transition_counter, direct_succession_rel
+
+
+def count_numpy(encoded_log):
+    return DirectlyFollowsCounts.from_encoded_log(encoded_log).to_dicts()
+
+
+def best_time(function, argument, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--log', default='repairexample.xes', help="Plik XES bazowy")
+    parser.add_argument('--scale', type=int, default=100, help="Krotność powielenia śladów")
+    parser.add_argument('--repeat', type=int, default=3, help="Liczba powtórzeń (brany jest najlepszy czas)")
+    args = parser.parse_args()
+
+    workflow_log = read_workflow_log(args.log) * args.scale
+    encoded_log = EncodedLog.from_traces(workflow_log)
+
+    if [dict(d) for d in count_python(workflow_log)] != [dict(d) for d in count_numpy(encoded_log)]:
+        raise SystemExit("Błąd: wyniki metod się różnią.")
+
+    python_time = best_time(count_python, workflow_log, args.repeat)
+    numpy_time = best_time(count_numpy, encoded_log, args.repeat)
+    print(f"Ślady: {len(encoded_log)}, zdarzenia: {encoded_log.num_events}")
+    print(f"Pętla Python: {python_time:.3f} s")
+    print(f"np.bincount:  {numpy_time:.3f} s")
+    print(f"Przyspieszenie: {python_time / numpy_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
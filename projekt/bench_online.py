@@ -0,0 +1,80 @@
+"""Benchmark odtwarzania strumienia zdarzeń przez IncrementalMiner.
+
+Zdarzenia z logu bazowego (repairexample.xes) są sortowane po znaczniku
+czasu, więc przypadki przeplatają się jak w działającym systemie. Przy
+`--scale` > 1 każde zdarzenie jest powielane z innym identyfikatorem
+przypadku. Co `--snapshot-every` zdarzeń wykonywana jest migawka modelu.
+Na końcu migawka porównywana jest z licznościami trybu wsadowego.
+
+Użycie: python bench_online.py [--scale 100] [--max-cases 100000] [--idle-timeout 86400]
+"""
+import argparse
+import time
+from operator import itemgetter
+
+from dfg import DirectlyFollowsCounts
+from encoded_log import EncodedLog
+from online import DEFAULT_MAX_CASES, IncrementalMiner
+from xes_stream import iter_event_stream, read_workflow_log
+
+
+def replay_events(log_file, scale):
+    """Lista zdarzeń (case_id, aktywność, czas) posortowana stabilnie po czasie.
+
+    Gdy któremuś zdarzeniu brakuje znacznika czasu, zachowana jest kolejność z pliku.
+    """
+    events = list(iter_event_stream(log_file))
+    if all(timestamp is not None for _, _, timestamp in events):
+        events.sort(key=itemgetter(2))
+    if scale == 1:
+        return events
+    return [(f"{case_id}#{copy}", activity, timestamp)
+            for case_id, activity, timestamp in events
+            for copy in range(scale)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--log', default='repairexample.xes', help="Plik XES bazowy")
+    parser.add_argument('--scale', type=int, default=100, help="Krotność powielenia przypadków")
+    parser.add_argument('--max-cases', type=int, default=DEFAULT_MAX_CASES, help="Limit otwartych przypadków")
+    parser.add_argument('--idle-timeout', type=float, default=None, help="Czas bezczynności (s), po którym przypadek jest zamykany")
+    parser.add_argument('--snapshot-every', type=int, default=100_000, help="Co ile zdarzeń wykonywać migawkę (0 = tylko na końcu)")
+    args = parser.parse_args()
+
+    events = replay_events(args.log, args.scale)
+    miner = IncrementalMiner(args.max_cases, args.idle_timeout)
+    consume = miner.consume
+    snapshots = 0
+    snapshot_time = 0.0
+
+    start = time.perf_counter()
+    for number, (case_id, activity, timestamp) in enumerate(events, start=1):
+        consume(case_id, activity, timestamp)
+        if args.snapshot_every and number % args.snapshot_every == 0:
+            snapshot_start = time.perf_counter()
+            miner.snapshot()
+            snapshot_time += time.perf_counter() - snapshot_start
+            snapshots += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"Zdarzenia: {len(events)}, aktywności: {len(miner.vocabulary)}, "
+          f"otwarte przypadki: {miner.open_cases}, zamknięte przedwcześnie: {miner.evicted_cases}")
+    print(f"Czas odtwarzania: {elapsed:.3f} s ({len(events) / elapsed:,.0f} zdarzeń/s)")
+    if snapshots:
+        print(f"Migawki: {snapshots}, średnio {snapshot_time / snapshots * 1000:.2f} ms")
+
+    if miner.evicted_cases:
+        print("Porównanie z trybem wsadowym pominięte: część przypadków zamknięto przed końcem.")
+        return
+    batch = DirectlyFollowsCounts.from_encoded_log(EncodedLog.from_traces(read_workflow_log(args.log)))
+    online_dicts = [dict(d) for d in miner.snapshot().to_dicts()]
+    batch_dicts = [{key: value * args.scale for key, value in d.items()} for d in batch.to_dicts()[:2]]
+    if online_dicts[:2] == batch_dicts:
+        print("Migawka zgodna z licznościami trybu wsadowego.")
+    else:
+        print("Uwaga: migawka różni się od trybu wsadowego (znaczniki czasu w śladach nie są monotoniczne).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Porównanie parserów XES: strumieniowego (iterparse) i opyenxes.
+
+Mierzy czas i szczytowe zużycie pamięci (RSS) dla oryginalnego pliku
+repairexample.xes oraz dla syntetycznego logu powstałego przez
+powielenie jego śladów (domyślnie 100x). Każdy pomiar uruchamiany jest
+w osobnym procesie, aby szczytowy RSS nie był zawyżony przez poprzednie.
+
+Użycie: python bench_parser.py [--scale 100] [--parsers stream opyenxes]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from xes_stream import read_workflow_log, read_workflow_log_opyenxes
+
+PARSERS = {
+    'stream': read_workflow_log,
+    'opyenxes': read_workflow_log_opyenxes,
+}
+
+
+def write_scaled_log(source_path, target_path, scale):
+    """Zapisuje log z nagłówkiem źródła i jego śladami powtórzonymi `scale` razy."""
+    with open(source_path, encoding='utf-8') as source:
+        content = source.read()
+    first_trace = content.index('<trace>')
+    log_end = content.rindex('</log>')
+    header, traces, footer = content[:first_trace], content[first_trace:log_end], content[log_end:]
+    with open(target_path, 'w', encoding='utf-8') as target:
+        target.write(header)
+        for _ in range(scale):
+            target.write(traces)
+        target.write(footer)
+
+
+def measure(parser_name, log_file_path):
+    """Pomiar w bieżącym procesie; zwraca słownik z wynikami."""
+    start = time.perf_counter()
+    workflow_log = PARSERS[parser_name](log_file_path)
+    elapsed = time.perf_counter() - start
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # Linux: kilobajty
+    return {
+        'parser': parser_name,
+        'file': os.path.basename(log_file_path),
+        'traces': len(workflow_log),
+        'events': sum(len(trace) for trace in workflow_log),
+        'seconds': round(elapsed, 3),
+        'peak_rss_mb': round(peak_rss_kb / 1024, 1),
+    }
+
+
+def measure_in_subprocess(parser_name, log_file_path):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--worker', parser_name, log_file_path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--log', default='repairexample.xes', help="Plik XES bazowy")
+    parser.add_argument('--scale', type=int, default=100, help="Krotność powielenia śladów w logu syntetycznym")
+    parser.add_argument('--parsers', nargs='+', choices=sorted(PARSERS), default=['stream', 'opyenxes'])
+    parser.add_argument('--worker', nargs=2, metavar=('PARSER', 'PLIK'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(*args.worker)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scaled_path = os.path.join(tmp_dir, f"scaled_x{args.scale}.xes")
+        write_scaled_log(args.log, scaled_path, args.scale)
+
+        print(f"{'parser':<10} {'plik':<24} {'ślady':>9} {'zdarzenia':>11} {'czas [s]':>9} {'RSS [MB]':>9}")
+        for log_file_path in (args.log, scaled_path):
+            for parser_name in args.parsers:
+                r = measure_in_subprocess(parser_name, log_file_path)
+                print(f"{r['parser']:<10} {r['file']:<24} {r['traces']:>9} {r['events']:>11} {r['seconds']:>9} {r['peak_rss_mb']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Pomiar wczytywania logu razem z czasami wydajności (mine_performance).
+
+Log wczytywany jest z domyślnym klasyfikatorem oraz z każdym klasyfikatorem
+z nagłówka, który zawiera lifecycle:transition (np. 'MXML Legacy Classifier').
+Przed pomiarem sprawdzane jest, że przy takim klasyfikatorze czasy obsługi
+nie są puste i mają tyle samo próbek co przy klasyfikatorze domyślnym -
+zdarzenia start i complete muszą być łączone po nazwie aktywności, a nie
+po klasie ('X+start' i 'X+complete').
+
+Użycie: python bench_performance.py [--log repairexample.xes] [--workers 1] [--repeat 3]
+"""
+import argparse
+import time
+
+from performance import mine_performance
+from xes_stream import DEFAULT_ACTIVITY_KEYS, read_classifiers
+
+
+def service_samples(performance):
+    return sum(sketch.count for sketch in performance.service_sketches.values())
+
+
+def best_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--log', default='repairexample.xes', help="Plik XES")
+    parser.add_argument('--workers', type=int, default=1, help="Liczba procesów")
+    parser.add_argument('--repeat', type=int, default=3, help="Liczba powtórzeń (brany jest najlepszy czas)")
+    args = parser.parse_args()
+
+    classifiers = {'domyślny': DEFAULT_ACTIVITY_KEYS}
+    classifiers.update((name, classifier) for name, classifier in read_classifiers(args.log).items()
+                       if 'lifecycle:transition' in classifier.keys)
+
+    results = {}
+    for name, classifier in classifiers.items():
+        seconds, (encoded_log, _, performance) = best_time(
+            lambda: mine_performance(args.log, classifier, workers=args.workers), args.repeat)
+        results[name] = performance
+        print(f"{name}: {seconds:.3f} s ({encoded_log.total_events / seconds:,.0f} zdarzeń/s), "
+              f"krawędzie z czasami: {len(performance.edge_sketches)}, "
+              f"próbki czasów obsługi: {service_samples(performance)}")
+
+    expected = service_samples(results['domyślny'])
+    for name, performance in results.items():
+        if expected and not performance.service_sketches:
+            raise SystemExit(f"Błąd: brak czasów obsługi dla klasyfikatora '{name}'.")
+        if service_samples(performance) != expected:
+            raise SystemExit(f"Błąd: klasyfikator '{name}' daje inną liczbę próbek czasów obsługi.")
+    print("Czasy obsługi zgodne dla wszystkich klasyfikatorów.")
+
+
+if __name__ == "__main__":
+    main()
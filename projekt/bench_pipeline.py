@@ -0,0 +1,158 @@
+"""Benchmark etapów potoku projekt.py na syntetycznych logach różnej wielkości.
+
+Dla każdej wielkości (`--sizes`, liczba zdarzeń, np. od 10K do 100M) log
+generowany jest przez synthetic_log.py (albo brany z `--data-dir`, jeśli
+już istnieje), a potem projekt.py uruchamiany jest w osobnym procesie z
+`--profile-json` dla każdego minera z `--miners` - szczytowy RSS nie jest
+więc zawyżany przez poprzednie pomiary. Wyniki wszystkich przebiegów
+(czas, pamięć i przepustowość każdego etapu) zapisywane są jako JSON.
+
+Z `--baseline` (wcześniejszy plik wyników) porównywany jest czas każdego
+etapu; etapy wolniejsze niż `--tolerance` razy (i dłuższe niż
+`--min-seconds`) są zgłaszane jako regresje, a skrypt kończy się kodem 1.
+
+Uwaga: log XES zajmuje ok. 250 B na zdarzenie (100M zdarzeń - ok. 25 GB).
+
+Użycie: python bench_pipeline.py [--sizes 10000 100000 1000000] [--miners heuristic alpha]
+        [--output bench_pipeline.json] [--baseline poprzedni.json] [--data-dir logi]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from synthetic_log import (
+    DEFAULT_ACTIVITIES, DEFAULT_CONCURRENCY, DEFAULT_NOISE, DEFAULT_RESOURCES, traces_for_events, write_synthetic_log,
+)
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+MINER_ARGS = {
+    'heuristic': ['--miner', 'heuristic', '--dependency-threshold', '0.9'],
+    'alpha': ['--miner', 'alpha', '--conformance'],
+    'performance': ['--miner', 'heuristic', '--performance', 'mean'],
+    'social': ['--miner', 'heuristic', '--social', 'both'],
+}
+TOLERANCE = 1.25
+MIN_SECONDS = 0.05
+PIPELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'projekt.py')
+
+
+def synthetic_log_path(data_dir, size, args):
+    name = f"synthetic_{size}_a{args.activities}_c{args.concurrency}_n{args.noise}_s{args.seed}.xes"
+    return os.path.join(data_dir, name)
+
+
+def ensure_log(path, size, args):
+    """Generuje log syntetyczny, jeśli nie istnieje."""
+    if os.path.exists(path):
+        return
+    print(f"Generowanie logu syntetycznego ({size} zdarzeń): '{path}'")
+    write_synthetic_log(path + '.tmp', traces_for_events(size, args.activities), args.activities,
+                        args.concurrency, args.noise, args.resources, args.seed)
+    os.replace(path + '.tmp', path)
+
+
+def run_pipeline(log_path, miner, args, work_dir):
+    """Uruchamia projekt.py w osobnym procesie i zwraca jego raport etapów."""
+    report_path = os.path.join(work_dir, f"profile_{miner}.json")
+    command = [sys.executable, PIPELINE, '--log', os.path.abspath(log_path), '--no-cache',
+               '--render', args.render, '--workers', str(args.workers), '--profile-json', report_path]
+    subprocess.run(command + MINER_ARGS[miner], check=True, cwd=work_dir, stdout=subprocess.DEVNULL)
+    with open(report_path, encoding='utf-8') as report:
+        return json.load(report)
+
+
+def _stage_times(run):
+    """{(rozmiar, miner, etap, wystąpienie): czas} - etapy mogą się powtarzać (np. 'social/graph')."""
+    times, seen = {}, {}
+    for stage in run['report']['stages']:
+        occurrence = seen[stage['stage']] = seen.get(stage['stage'], -1) + 1
+        times[(run['size'], run['miner'], stage['stage'], occurrence)] = stage['seconds']
+    return times
+
+
+def compare(results, baseline, tolerance=TOLERANCE, min_seconds=MIN_SECONDS):
+    """Lista regresji (rozmiar, miner, etap, czas bazowy, czas bieżący) względem wyników bazowych."""
+    previous = {}
+    for run in baseline['runs']:
+        previous.update(_stage_times(run))
+    regressions = []
+    for run in results['runs']:
+        for key, seconds in _stage_times(run).items():
+            before = previous.get(key)
+            if before is None or seconds < min_seconds:
+                continue
+            if seconds > before * tolerance:
+                regressions.append(key[:3] + (before, seconds))
+    return regressions
+
+
+def print_run(run):
+    print(f"\n{run['miner']} - {run['size']:,} zdarzeń (łącznie {run['report']['total_seconds']:.2f} s, "
+          f"szczyt RSS {run['report']['peak_rss_mb']:.0f} MB)")
+    for stage in run['report']['stages']:
+        rate = f"{stage['events_per_second']:,.0f}/s" if 'events_per_second' in stage else ''
+        print(f"  {'  ' * stage['depth'] + stage['stage'].rsplit('/', 1)[-1]:<30} {stage['seconds']:>9.3f} s "
+              f"{rate:>16} {stage['peak_rss_mb']:>8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="Liczby zdarzeń w logach")
+    parser.add_argument('--miners', nargs='+', choices=sorted(MINER_ARGS), default=['heuristic', 'alpha'],
+                        help="Warianty potoku do zmierzenia")
+    parser.add_argument('--activities', type=int, default=DEFAULT_ACTIVITIES, help="Liczba aktywności w modelu")
+    parser.add_argument('--concurrency', type=float, default=DEFAULT_CONCURRENCY,
+                        help="Odsetek aktywności w blokach równoległych (0-1)")
+    parser.add_argument('--noise', type=float, default=DEFAULT_NOISE, help="Odsetek zaburzonych śladów (0-1)")
+    parser.add_argument('--resources', type=int, default=DEFAULT_RESOURCES, help="Liczba wykonawców")
+    parser.add_argument('--seed', type=int, default=0, help="Ziarno generatora logów")
+    parser.add_argument('--workers', type=int, default=1, help="Liczba procesów potoku (--workers projekt.py)")
+    parser.add_argument('--render', choices=['sync', 'background', 'none'], default='none',
+                        help="Tryb renderowania grafów w potoku")
+    parser.add_argument('--data-dir', help="Katalog na logi syntetyczne (zachowywane między uruchomieniami)")
+    parser.add_argument('--output', default='bench_pipeline.json', help="Plik JSON z wynikami")
+    parser.add_argument('--baseline', help="Wcześniejszy plik wyników do wykrywania regresji")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="Dopuszczalny stosunek czasu etapu do czasu bazowego")
+    parser.add_argument('--min-seconds', type=float, default=MIN_SECONDS,
+                        help="Krótsze etapy nie są porównywane (szum pomiaru)")
+    args = parser.parse_args()
+
+    results = {
+        'parameters': {key: getattr(args, key) for key in ('activities', 'concurrency', 'noise', 'resources',
+                                                           'seed', 'workers', 'render')},
+        'runs': [],
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_dir = args.data_dir or work_dir
+        os.makedirs(data_dir, exist_ok=True)
+        for size in sorted(args.sizes):
+            log_path = synthetic_log_path(data_dir, size, args)
+            ensure_log(log_path, size, args)
+            for miner in args.miners:
+                run = {'size': size, 'miner': miner, 'report': run_pipeline(log_path, miner, args, work_dir)}
+                results['runs'].append(run)
+                print_run(run)
+            if not args.data_dir:
+                os.remove(log_path)
+
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(results, output, ensure_ascii=False, indent=2)
+    print(f"\nWyniki zapisane jako '{args.output}'")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline:
+            regressions = compare(results, json.load(baseline), args.tolerance, args.min_seconds)
+        for size, miner, stage, before, after in regressions:
+            print(f"Regresja: {miner} {size:,} zdarzeń, etap '{stage}': {before:.3f} s -> {after:.3f} s "
+                  f"({after / before:.2f}x)")
+        if regressions:
+            raise SystemExit(1)
+        print(f"Brak regresji względem '{args.baseline}' (tolerancja {args.tolerance}x).")
+
+
+if __name__ == "__main__":
+    main()
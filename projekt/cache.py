@@ -0,0 +1,213 @@
+"""Trwała pamięć podręczna wczytanych logów i grafów bezpośrednich następstw.
+
+Każdy wpis to katalog nazwany kluczem wyliczonym z zawartości pliku XES
+(SHA-256), jego czasu modyfikacji i wybranego klasyfikatora zdarzeń.
+W katalogu zapisywane są pliki .npy (kody zdarzeń, przesunięcia śladów,
+liczności aktywności, macierz następstw), meta.json ze słownikiem
+aktywności i opcjonalnie extra.json (np. szkice czasów wydajności). Tablice są wczytywane przez `np.load(mmap_mode='r')`, więc
+ponowne uruchomienie nie parsuje pliku i nie kopiuje danych do pamięci.
+
+Zmiana pliku (treść lub mtime) daje nowy klucz, więc stare wpisy nigdy nie
+są trafiane; usuwa je `invalidate()` albo polityka LRU ograniczająca łączny
+rozmiar katalogu. Czas ostatniego użycia wpisu to mtime jego meta.json.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from dfg import DirectlyFollowsCounts
+from encoded_log import EncodedLog
+
+DEFAULT_CACHE_DIR = '.mining_cache'
+DEFAULT_MAX_CACHE_BYTES = 1 << 30 # 1 GiB
+
+_DIGEST_MEMO_FILE = 'digests.json'
+_META_FILE = 'meta.json'
+_EXTRA_FILE = 'extra.json'
+_ARRAYS = ('events', 'offsets')
+_OPTIONAL_ARRAYS = (
+    'weights',                    # Krotności wariantów (tylko dla logów wariantów)
+    'activity_counts', 'matrix',  # Graf następstw (brak dla wpisów zapisanych bez niego)
+)
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_digest(log_file_path):
+    """SHA-256 zawartości pliku, liczony blokami."""
+    digest = hashlib.sha256()
+    with open(log_file_path, 'rb') as log_file:
+        for block in iter(lambda: log_file.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _directory_size(path):
+    total = 0
+    for dir_path, _, file_names in os.walk(path):
+        for file_name in file_names:
+            total += os.path.getsize(os.path.join(dir_path, file_name))
+    return total
+
+
+class LogCache:
+    """Katalog z wpisami (EncodedLog, DirectlyFollowsCounts) adresowanymi treścią pliku."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    # --- Klucze ---
+
+    def _digest_memo_path(self):
+        return os.path.join(self.cache_dir, _DIGEST_MEMO_FILE)
+
+    def _cached_digest(self, log_file_path, stat):
+        """Skrót pliku; przeliczany tylko, gdy zmieniła się ścieżka, rozmiar lub mtime."""
+        memo_key = f"{os.path.abspath(log_file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        try:
+            with open(self._digest_memo_path(), encoding='utf-8') as memo_file:
+                memo = json.load(memo_file)
+        except (FileNotFoundError, ValueError):
+            memo = {}
+        if memo_key not in memo:
+            memo = {key: value for key, value in memo.items()
+                    if not key.startswith(f"{os.path.abspath(log_file_path)}|")}
+            memo[memo_key] = file_digest(log_file_path)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._digest_memo_path(), 'w', encoding='utf-8') as memo_file:
+                json.dump(memo, memo_file)
+        return memo[memo_key]
+
+    def key(self, log_file_path, classifier):
+        """Klucz wpisu: skrót treści pliku + mtime + klasyfikator."""
+        stat = os.stat(log_file_path)
+        digest = self._cached_digest(log_file_path, stat)
+        return hashlib.sha256(f"{digest}|{stat.st_mtime_ns}|{classifier}".encode('utf-8')).hexdigest()[:32]
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    # --- Odczyt i zapis ---
+
+    def load(self, log_file_path, classifier):
+        """Zwraca (EncodedLog, DirectlyFollowsCounts) z pamięci podręcznej lub None.
+
+        Dla wpisów zapisanych bez grafu następstw drugim elementem jest None.
+        """
+        entry_path = self._entry_path(self.key(log_file_path, classifier))
+        meta_path = os.path.join(entry_path, _META_FILE)
+        try:
+            with open(meta_path, encoding='utf-8') as meta_file:
+                meta = json.load(meta_file)
+            arrays = {name: np.load(os.path.join(entry_path, f"{name}.npy"), mmap_mode='r') for name in _ARRAYS}
+            for name in _OPTIONAL_ARRAYS:
+                path = os.path.join(entry_path, f"{name}.npy")
+                arrays[name] = np.load(path, mmap_mode='r') if os.path.exists(path) else None
+        except (FileNotFoundError, ValueError):
+            return None
+
+        os.utime(meta_path) # Oznacz jako ostatnio używany (LRU)
+        vocabulary = meta['vocabulary']
+        encoded_log = EncodedLog.from_arrays(vocabulary, arrays['events'], arrays['offsets'], arrays['weights'])
+        directly_follows = None
+        if arrays['matrix'] is not None:
+            directly_follows = DirectlyFollowsCounts(vocabulary, arrays['activity_counts'], arrays['matrix'])
+        return encoded_log, directly_follows
+
+    def load_extra(self, log_file_path, classifier):
+        """Dane dodatkowe wpisu (słownik zapisany przez store(..., extra=...)) lub None."""
+        extra_path = os.path.join(self._entry_path(self.key(log_file_path, classifier)), _EXTRA_FILE)
+        try:
+            with open(extra_path, encoding='utf-8') as extra_file:
+                return json.load(extra_file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def store(self, log_file_path, classifier, encoded_log, directly_follows, extra=None):
+        """Zapisuje wpis (atomowo - przez katalog tymczasowy) i przycina katalog do `max_bytes`.
+
+        `directly_follows` może być None (sam log, np. widok zasobów). `extra`
+        (słownik serializowalny do JSON, np. szkice czasów) zapisywany jest
+        obok tablic i odczytywany przez load_extra.
+        """
+        key = self.key(log_file_path, classifier)
+        entry_path = self._entry_path(key)
+        events, offsets = encoded_log.as_numpy()
+        arrays = {'events': events, 'offsets': offsets}
+        if directly_follows is not None:
+            arrays['activity_counts'] = np.asarray(directly_follows.activity_counts)
+            arrays['matrix'] = np.asarray(directly_follows.matrix)
+        if encoded_log.weights is not None:
+            arrays['weights'] = encoded_log.trace_weights()
+        meta = {
+            'source': os.path.abspath(log_file_path),
+            'classifier': classifier,
+            'vocabulary': list(encoded_log.vocabulary),
+            'created': time.time(),
+        }
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(prefix=f".{key}.", dir=self.cache_dir)
+        try:
+            for name, values in arrays.items():
+                np.save(os.path.join(tmp_path, f"{name}.npy"), values)
+            with open(os.path.join(tmp_path, _META_FILE), 'w', encoding='utf-8') as meta_file:
+                json.dump(meta, meta_file, ensure_ascii=False)
+            if extra is not None:
+                with open(os.path.join(tmp_path, _EXTRA_FILE), 'w', encoding='utf-8') as extra_file:
+                    json.dump(extra, extra_file, ensure_ascii=False)
+            if os.path.isdir(entry_path):
+                shutil.rmtree(entry_path)
+            os.replace(tmp_path, entry_path)
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        self.evict(keep=key)
+        return key
+
+    # --- Unieważnianie i eksmisja ---
+
+    def entries(self):
+        """Lista (ostatnie_użycie, rozmiar, klucz, meta) dla wszystkich wpisów."""
+        result = []
+        if not os.path.isdir(self.cache_dir):
+            return result
+        for key in os.listdir(self.cache_dir):
+            meta_path = os.path.join(self.cache_dir, key, _META_FILE)
+            if key.startswith('.') or not os.path.isfile(meta_path):
+                continue
+            try:
+                with open(meta_path, encoding='utf-8') as meta_file:
+                    meta = json.load(meta_file)
+            except ValueError:
+                meta = {}
+            result.append((os.path.getmtime(meta_path), _directory_size(self._entry_path(key)), key, meta))
+        return result
+
+    def invalidate(self, log_file_path=None):
+        """Usuwa wpisy dla danego pliku (lub wszystkie, gdy brak ścieżki). Zwraca liczbę usuniętych."""
+        source = os.path.abspath(log_file_path) if log_file_path else None
+        removed = 0
+        for _, _, key, meta in self.entries():
+            if source is None or meta.get('source') == source:
+                shutil.rmtree(self._entry_path(key), ignore_errors=True)
+                removed += 1
+        return removed
+
+    def evict(self, keep=None):
+        """Usuwa najdawniej używane wpisy, dopóki łączny rozmiar przekracza `max_bytes`."""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, key, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry_path(key), ignore_errors=True)
+            total -= size
@@ -0,0 +1,320 @@
+"""Zgodność logu z siecią Petriego: odtwarzanie tokenów (token-based replay).
+
+Sieć jest kompilowana do macierzy incydencji `pre` i `post` (przejście x
+miejsce, liczby całkowite), z przejściami ułożonymi wg kodów aktywności
+EncodedLog - kody zdarzeń są od razu indeksami wierszy. Każdy wariant
+śladu odtwarzany jest raz, a wyniki ważone są jego krotnością. Warianty
+odtwarzane są wsadowo: znakowania całej paczki to macierz wariant x miejsce,
+a pętla w Pythonie biegnie tylko po pozycjach w śladzie. Paczki rozdzielane
+są między procesy.
+
+Dla śladu: p - tokeny wyprodukowane (z tokenem początkowym), c - zużyte
+(z tokenem końcowym), m - brakujące, r - pozostałe, a
+  dopasowanie (fitness) = 1/2 (1 - m / c) + 1/2 (1 - r / p).
+Precyzja liczona jest jak w ETConformance: dla każdego prefiksu śladów
+porównywane są przejścia włączone w sieci z aktywnościami, które w logu
+po tym prefiksie wystąpiły (przejścia "uciekające" obniżają precyzję).
+Drzewo prefiksów budowane jest poziomami (wektorowo po wariantach), a
+znakowanie i przejścia włączone liczone są raz dla każdego węzła. Gdy poziom
+drzewa ma dość węzłów, ich poddrzewa (rozłączne) są dzielone między procesy.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from parallel import split_evenly
+
+BATCH_SIZE = 1024
+
+
+class CompiledNet:
+    """Sieć Petriego w postaci macierzy incydencji dopasowanych do słownika logu.
+
+    Wiersze `pre`/`post` to przejścia: najpierw aktywności `vocabulary`
+    logu (w tej samej kolejności kodów), potem przejścia sieci nieobecne
+    w logu, a na końcu wiersz zerowy dla zdarzeń spoza sieci.
+    """
+
+    def __init__(self, transitions, places, pre, post, in_net, initial_place, final_place):
+        self.transitions = transitions   # nazwy przejść (kod -> nazwa)
+        self.places = places             # nazwy miejsc (indeks -> nazwa)
+        self.pre = pre                   # [t, p] - tokeny zużywane z miejsca p
+        self.pre_t = pre.T.astype(np.float32) # [p, t] - do testu włączenia (mnożenie float przez BLAS)
+        self.post = post                 # [t, p] - tokeny produkowane do miejsca p
+        self.in_net = in_net             # czy aktywność jest przejściem sieci
+        self.initial_place = initial_place
+        self.final_place = final_place
+
+    @classmethod
+    def from_petri_net(cls, petri_net, vocabulary):
+        known = set(vocabulary)
+        transitions = list(vocabulary) + [t for t in petri_net.transitions if t not in known]
+        codes = {transition: code for code, transition in enumerate(transitions)}
+        places = list(petri_net.places)
+        pre = np.zeros((len(transitions) + 1, len(places)), dtype=np.int32)
+        post = np.zeros_like(pre)
+        for index, (inputs, outputs) in enumerate(petri_net.places.values()):
+            pre[[codes[t] for t in outputs], index] = 1
+            post[[codes[t] for t in inputs], index] = 1
+        in_net = np.zeros(len(transitions) + 1, dtype=bool)
+        in_net[[codes[t] for t in petri_net.transitions]] = True
+        return cls(transitions, places, pre, post, in_net,
+                   places.index(petri_net.initial_place), places.index(petri_net.final_place))
+
+    @property
+    def skip_code(self):
+        """Indeks zerowego wiersza dla zdarzeń, których nie ma w sieci."""
+        return len(self.transitions)
+
+
+class ReplayResult:
+    """Sumy odtwarzania ważone krotnościami wariantów i diagnostyka."""
+
+    def __init__(self, net, totals, trace_fitness, weights, missing_by_transition,
+                 remaining_by_place, unknown_by_transition, precision):
+        self.net = net
+        self.produced, self.consumed, self.missing, self.remaining = totals
+        self.trace_fitness = trace_fitness                  # dopasowanie każdego wariantu
+        self.weights = weights                              # krotności wariantów
+        self.missing_by_transition = missing_by_transition  # brakujące tokeny przy odpaleniu aktywności
+        self.remaining_by_place = remaining_by_place        # tokeny pozostałe w miejscach
+        self.unknown_by_transition = unknown_by_transition  # zdarzenia aktywności spoza sieci
+        self.precision = precision
+
+    @property
+    def fitness(self):
+        missing = self.missing / self.consumed if self.consumed else 0.0
+        remaining = self.remaining / self.produced if self.produced else 0.0
+        return 0.5 * (1 - missing) + 0.5 * (1 - remaining)
+
+    @property
+    def fitting_traces(self):
+        """Udział śladów odtworzonych bez brakujących i pozostałych tokenów."""
+        total = self.weights.sum()
+        return float(self.weights[self.trace_fitness >= 1.0].sum() / total) if total else 1.0
+
+    def missing_by_activity(self):
+        return {self.net.transitions[code]: int(count)
+                for code, count in enumerate(self.missing_by_transition[:-1].tolist()) if count}
+
+    def remaining_by_place_name(self):
+        return {self.net.places[index]: int(count) for index, count in enumerate(self.remaining_by_place.tolist()) if count}
+
+    def unknown_activities(self):
+        return {self.net.transitions[code]: int(count)
+                for code, count in enumerate(self.unknown_by_transition[:-1].tolist()) if count}
+
+
+def _enabled(net, markings):
+    """Maska włączonych przejść dla każdego znakowania (wiersza `markings`).
+
+    Łuki sieci mają wagę 1, więc przejście jest włączone, gdy żadne z jego
+    miejsc wejściowych nie jest puste. Mnożenie wykonywane jest na float32,
+    bo NumPy przekazuje do BLAS tylko macierze zmiennoprzecinkowe (sumy są
+    małymi liczbami całkowitymi, więc wynik jest dokładny).
+    """
+    empty = (markings <= 0).astype(np.float32)
+    return (empty @ net.pre_t == 0) & net.in_net[None, :]
+
+
+def _fire(net, markings, step):
+    """Odpala przejścia `step` w znakowaniach (brakujące tokeny są dodawane); zwraca (znakowania, braki)."""
+    need = net.pre[step]
+    short = np.maximum(need - markings, 0)
+    return markings + short - need + net.post[step], short
+
+
+def _replay_batch(net, codes, weights):
+    """Odtwarza paczkę wariantów wyrównanych do wspólnej długości (kod skip_code = brak zdarzenia)."""
+    pre, post = net.pre, net.post
+    num_variants, max_length = codes.shape
+    markings = np.zeros((num_variants, pre.shape[1]), dtype=np.int64)
+    markings[:, net.initial_place] = 1
+    produced = np.ones(num_variants, dtype=np.int64)
+    consumed = np.zeros(num_variants, dtype=np.int64)
+    missing = np.zeros(num_variants, dtype=np.int64)
+    missing_by_transition = np.zeros(pre.shape[0], dtype=np.int64)
+
+    for position in range(max_length):
+        step = codes[:, position]
+        markings, short = _fire(net, markings, step)
+        short_count = short.sum(axis=1)
+        missing += short_count
+        np.add.at(missing_by_transition, step, short_count * weights)
+        consumed += pre[step].sum(axis=1)
+        produced += post[step].sum(axis=1)
+
+    # Token końcowy
+    final = net.final_place
+    missing += markings[:, final] == 0
+    markings[:, final] = np.maximum(markings[:, final] - 1, 0)
+    consumed += 1
+    remaining = markings.sum(axis=1)
+    return produced, consumed, missing, remaining, missing_by_transition, (markings * weights[:, None]).sum(axis=0)
+
+
+def _replay_range(net, events, offsets, weights, batch_size):
+    """Odtwarza zakres wariantów paczkami; zwraca sumy częściowe paczek i zdarzenia spoza sieci."""
+    results = []
+    known = net.in_net[events]
+    unknown_by_transition = np.bincount(events[~known], weights=np.repeat(weights, np.diff(offsets))[~known],
+                                        minlength=len(net.in_net)).astype(np.int64)
+    events = np.where(known, events, net.skip_code)
+    for first, last in split_evenly(len(weights), max(1, -(-len(weights) // batch_size))):
+        lengths = np.diff(offsets[first:last + 1])
+        codes = np.full((last - first, int(lengths.max()) if len(lengths) else 0), net.skip_code, dtype=np.intp)
+        rows = np.repeat(np.arange(last - first), lengths)
+        columns = np.arange(offsets[last] - offsets[first]) - np.repeat(offsets[first:last] - offsets[first], lengths)
+        codes[rows, columns] = events[offsets[first]:offsets[last]]
+        results.append(_replay_batch(net, codes, weights[first:last]))
+    return results, unknown_by_transition
+
+
+def _precision_levels(net, events, offsets, weights, markings, node, active, depth, max_nodes=None):
+    """Przechodzi drzewo prefiksów poziomami od głębokości `depth`.
+
+    Na głębokości d każdy wariant dłuższy niż d przechodzi z węzła swojego
+    prefiksu krawędzią (węzeł, aktywność), a unikalne krawędzie to zarazem
+    aktywności obserwowane po prefiksie i nowe węzły poziomu d + 1.
+    Znakowanie węzła liczone jest raz - z odpalenia aktywności w znakowaniu
+    rodzica - a przejścia włączone i uciekające tylko dla węzłów bieżącego
+    poziomu. Waga węzła to liczba śladów, które po prefiksie mają kolejne
+    zdarzenie. Przy `max_nodes` przejście zatrzymuje się przed poziomem o
+    co najmniej tylu węzłach. Zwraca (allowed, escaping, stan), gdzie stan
+    (markings, node, active, depth) to nieodwiedzony jeszcze poziom.
+    """
+    lengths = np.diff(offsets)
+    num_codes = len(net.in_net)
+    allowed = escaping = 0.0
+    while len(active) and (max_nodes is None or len(markings) < max_nodes):
+        parents = node[active]
+        codes = events[offsets[active] + depth]
+        edges, children = np.unique(parents * num_codes + codes, return_inverse=True)
+        edge_parents, edge_codes = edges // num_codes, edges % num_codes
+
+        enabled = _enabled(net, markings)
+        node_weights = np.bincount(parents, weights=weights[active], minlength=len(markings))
+        enabled_count = enabled.sum(axis=1)
+        observed_enabled = np.bincount(edge_parents, weights=enabled[edge_parents, edge_codes], minlength=len(markings))
+        allowed += float((node_weights * enabled_count).sum())
+        escaping += float((node_weights * (enabled_count - observed_enabled)).sum())
+
+        # Znakowania węzłów kolejnego poziomu (zdarzenia spoza sieci nie zmieniają znakowania)
+        steps = np.where(net.in_net[edge_codes], edge_codes, net.skip_code)
+        markings, _ = _fire(net, markings[edge_parents], steps)
+        node[active] = children
+        depth += 1
+        active = active[lengths[active] > depth]
+    return allowed, escaping, (markings, node, active, depth)
+
+
+def _precision_subtrees(net, events, offsets, weights, markings, node, depth):
+    """Sumy (allowed, escaping) poddrzew węzłów `markings` dla wariantów przechodzących przez te węzły."""
+    allowed, escaping, _ = _precision_levels(net, events, offsets, weights, markings, node,
+                                             np.arange(len(weights)), depth)
+    return allowed, escaping
+
+
+def _subtree_arguments(net, events, offsets, weights, state, parts):
+    """Dzieli węzły poziomu `state` na `parts` grup o zbliżonej liczbie wariantów; argumenty _precision_subtrees."""
+    markings, node, active, depth = state
+    order = active[np.argsort(node[active], kind='stable')]
+    variants_per_node = np.bincount(node[order], minlength=len(markings))
+    first_variant = np.cumsum(variants_per_node) - variants_per_node
+    group_of_node = first_variant * parts // len(order)
+    arguments = []
+    for group in range(parts):
+        nodes = np.flatnonzero(group_of_node == group)
+        if not len(nodes):
+            continue
+        selected = order[(group_of_node[node[order]] == group)]
+        lengths = np.diff(offsets)[selected]
+        sub_offsets = np.concatenate(([0], np.cumsum(lengths)))
+        positions = np.repeat(offsets[selected] - sub_offsets[:-1], lengths) + np.arange(sub_offsets[-1])
+        local_node = np.searchsorted(nodes, node[selected])
+        arguments.append((net, events[positions], sub_offsets, weights[selected], markings[nodes], local_node, depth))
+    return arguments
+
+
+def _precision(net, events, offsets, weights, executor=None, workers=1):
+    """Precyzja ETConformance na drzewie prefiksów wariantów (zob. _precision_levels).
+
+    Z `executor` poziomy drzewa przechodzone są w procesie głównym tylko do
+    poziomu z co najmniej 4 * workers węzłami; ich rozłączne poddrzewa
+    liczone są potem równolegle.
+    """
+    markings = np.zeros((1, net.pre.shape[1]), dtype=np.int64)
+    markings[0, net.initial_place] = 1
+    node = np.zeros(len(weights), dtype=np.int64)   # węzeł bieżącego poziomu dla każdego wariantu
+    active = np.flatnonzero(np.diff(offsets) > 0)
+    max_nodes = 4 * workers if executor is not None and workers > 1 else None
+    allowed, escaping, state = _precision_levels(net, events, offsets, weights, markings, node, active, 0, max_nodes)
+    if len(state[2]):
+        arguments = _subtree_arguments(net, events, offsets, weights, state, workers)
+        for subtree_allowed, subtree_escaping in executor.map(_precision_subtrees, *zip(*arguments)):
+            allowed += subtree_allowed
+            escaping += subtree_escaping
+    return 1.0 - escaping / allowed if allowed else 1.0
+
+
+def token_replay(encoded_log, petri_net, workers=1, batch_size=BATCH_SIZE, with_precision=True):
+    """Odtwarza log (najlepiej log wariantów) na sieci Petriego; zwraca ReplayResult."""
+    net = CompiledNet.from_petri_net(petri_net, encoded_log.vocabulary)
+    events, offsets = encoded_log.as_numpy()
+    events = events.astype(np.intp)
+    weights = encoded_log.trace_weights().astype(np.int64)
+
+    ranges = split_evenly(len(encoded_log), workers)
+    arguments = [(net, events[offsets[first]:offsets[last]], offsets[first:last + 1] - offsets[first],
+                  weights[first:last], batch_size) for first, last in ranges]
+    precision = None
+    if workers > 1 and len(ranges) > 1:
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            partial_results = list(executor.map(_replay_range, *zip(*arguments)))
+            if with_precision:
+                precision = _precision(net, events, offsets, weights, executor, len(ranges))
+    else:
+        partial_results = [_replay_range(*args) for args in arguments]
+        if with_precision:
+            precision = _precision(net, events, offsets, weights)
+
+    batches = [batch for results, _ in partial_results for batch in results]
+    produced, consumed, missing, remaining = (np.concatenate([batch[i] for batch in batches]) if batches
+                                              else np.zeros(0, dtype=np.int64) for i in range(4))
+    totals = tuple(int((values * weights).sum()) for values in (produced, consumed, missing, remaining))
+    trace_fitness = (0.5 * (1 - missing / np.maximum(consumed, 1)) + 0.5 * (1 - remaining / np.maximum(produced, 1)))
+    missing_by_transition = sum((batch[4] for batch in batches), np.zeros(len(net.in_net), dtype=np.int64))
+    remaining_by_place = sum((batch[5] for batch in batches), np.zeros(len(net.places), dtype=np.int64))
+    unknown_by_transition = sum((unknown for _, unknown in partial_results), np.zeros(len(net.in_net), dtype=np.int64))
+
+    return ReplayResult(net, totals, trace_fitness, weights, missing_by_transition,
+                        remaining_by_place, unknown_by_transition, precision)
+
+
+def print_conformance_report(result, petri_net=None):
+    """Wypisuje dopasowanie, precyzję i diagnostykę tokenów."""
+    print(f"Dopasowanie (fitness): {result.fitness:.4f}")
+    if result.precision is not None:
+        print(f"Precyzja: {result.precision:.4f}")
+    print(f"Ślady w pełni dopasowane: {result.fitting_traces:.2%}")
+    print(f"Tokeny: wyprodukowane {result.produced}, zużyte {result.consumed}, "
+          f"brakujące {result.missing}, pozostałe {result.remaining}")
+    missing = result.missing_by_activity()
+    if missing:
+        print("Brakujące tokeny przy aktywnościach:")
+        for activity, count in sorted(missing.items(), key=lambda item: -item[1]):
+            print(f"  {activity}: {count}")
+    remaining = result.remaining_by_place_name()
+    if remaining:
+        print("Pozostałe tokeny w miejscach:")
+        for place, count in sorted(remaining.items(), key=lambda item: -item[1]):
+            description = ''
+            if petri_net is not None:
+                inputs, outputs = petri_net.places[place]
+                description = f" ({{{', '.join(sorted(inputs))}}} -> {{{', '.join(sorted(outputs))}}})"
+            print(f"  {place}{description}: {count}")
+    unknown = result.unknown_activities()
+    if unknown:
+        print("Zdarzenia aktywności spoza sieci (pominięte):")
+        for activity, count in sorted(unknown.items(), key=lambda item: -item[1]):
+            print(f"  {activity}: {count}")
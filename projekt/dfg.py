@@ -0,0 +1,141 @@
+"""Wektorowe zliczanie aktywności i relacji bezpośredniego następstwa (>).
+
+Pary kolejnych zdarzeń (src, dst) z płaskiego strumienia kodów EncodedLog są
+kodowane jako jedna liczba `src * n + dst`, a cała macierz następstw powstaje
+z jednego wywołania `np.bincount`. Pary przechodzące przez granicę śladów
+(ostatnie zdarzenie jednego śladu i pierwsze następnego) są maskowane.
+"""
+from collections import defaultdict
+
+import numpy as np
+
+
+class DirectlyFollowsCounts:
+    """Liczności aktywności i macierz bezpośrednich następstw dla zakodowanego logu.
+
+    `activity_counts[a]` to liczba wystąpień aktywności o kodzie `a`,
+    `matrix[a, b]` to liczba bezpośrednich przejść a -> b (|a > b|).
+    """
+
+    def __init__(self, vocabulary, activity_counts, matrix):
+        self.vocabulary = list(vocabulary)
+        self.activity_counts = activity_counts
+        self.matrix = matrix
+
+    @classmethod
+    def from_encoded_log(cls, encoded_log):
+        events, offsets = encoded_log.as_numpy()
+        weights = None if encoded_log.weights is None else encoded_log.trace_weights()
+        return cls.from_arrays(encoded_log.vocabulary, events, offsets, weights)
+
+    @classmethod
+    def from_arrays(cls, vocabulary, events, offsets, weights=None):
+        """Liczności dla fragmentu logu podanego jako bufor kodów i przesunięcia śladów.
+
+        `weights` to opcjonalne krotności śladów (log wariantów).
+        """
+        n = len(vocabulary)
+        event_weights = _event_weights(offsets, weights)
+        activity_counts = _count(events, event_weights, n)
+        matrix = directly_follows_matrix(events, offsets, n, weights)
+        return cls(vocabulary, activity_counts, matrix)
+
+    @classmethod
+    def merge(cls, partial_counts):
+        """Sumuje liczności częściowe (np. z różnych procesów) we wspólnym słowniku aktywności.
+
+        Słowniki częściowe są łączone w kolejności pierwszego wystąpienia, tak
+        jak robi to EncodedLog.concatenate, więc kody obu wyników są zgodne.
+        """
+        partial_counts = list(partial_counts)
+        vocabulary, codes = [], {}
+        for part in partial_counts:
+            for activity in part.vocabulary:
+                if activity not in codes:
+                    codes[activity] = len(vocabulary)
+                    vocabulary.append(activity)
+
+        n = len(vocabulary)
+        activity_counts = np.zeros(n, dtype=np.int64)
+        matrix = np.zeros((n, n), dtype=np.int64)
+        for part in partial_counts:
+            index = np.array([codes[activity] for activity in part.vocabulary], dtype=np.intp)
+            activity_counts[index] += part.activity_counts
+            matrix[np.ix_(index, index)] += part.matrix
+        return cls(vocabulary, activity_counts, matrix)
+
+    @property
+    def num_activities(self):
+        return len(self.vocabulary)
+
+    def to_dicts(self):
+        """Zwraca (activity_counter, transition_counter, direct_succession_rel) jak w sekcji 3 projekt.py."""
+        vocabulary = self.vocabulary
+        activity_counter = defaultdict(int)
+        transition_counter = defaultdict(int)
+        direct_succession_rel = defaultdict(set)
+
+        for code in np.flatnonzero(self.activity_counts):
+            activity_counter[vocabulary[code]] = int(self.activity_counts[code])
+
+        sources, targets = np.nonzero(self.matrix)
+        for source_code, target_code in zip(sources.tolist(), targets.tolist()):
+            source_activity = vocabulary[source_code]
+            target_activity = vocabulary[target_code]
+            transition_counter[(source_activity, target_activity)] = int(self.matrix[source_code, target_code])
+            direct_succession_rel[source_activity].add(target_activity)
+
+        return activity_counter, transition_counter, direct_succession_rel
+
+
+def _event_weights(offsets, weights):
+    """Waga każdego zdarzenia (krotność jego śladu) lub None dla logu bez wag."""
+    if weights is None:
+        return None
+    return np.repeat(np.asarray(weights, dtype=np.int64), np.diff(offsets))
+
+
+def _count(codes, code_weights, size):
+    """np.bincount z opcjonalnymi wagami całkowitymi; wynik zawsze int64."""
+    if code_weights is None:
+        return np.bincount(codes, minlength=size).astype(np.int64)
+    return np.rint(np.bincount(codes, weights=code_weights, minlength=size)).astype(np.int64)
+
+
+def trace_boundary_mask(offsets, num_events):
+    """Maska długości num_events-1: True dla par (i, i+1) leżących w tym samym śladzie."""
+    mask = np.ones(max(num_events - 1, 0), dtype=bool)
+    last_positions = offsets[1:-1] - 1 # Ostatnie zdarzenie każdego śladu poza ostatnim
+    last_positions = last_positions[(last_positions >= 0) & (last_positions < len(mask))]
+    mask[last_positions] = False
+    return mask
+
+
+def directly_follows_matrix(events, offsets, num_activities, weights=None):
+    """Macierz n x n liczności |a > b| policzona jednym np.bincount po kodach par."""
+    n = num_activities
+    if len(events) < 2:
+        return np.zeros((n, n), dtype=np.int64)
+    mask = trace_boundary_mask(offsets, len(events))
+    pair_codes = events[:-1][mask].astype(np.int64) * n + events[1:][mask]
+    event_weights = _event_weights(offsets, weights)
+    pair_weights = None if event_weights is None else event_weights[:-1][mask]
+    return _count(pair_codes, pair_weights, n * n).reshape(n, n)
+
+
+def two_loop_matrix(events, offsets, num_activities, weights=None):
+    """Macierz n x n liczności wzorca a b a (|a >> b|) w obrębie śladów.
+
+    Potrzebna do miary pętli długości dwa w Heuristics Miner. Trójka
+    (i, i+1, i+2) leży w jednym śladzie, gdy obie pary (i, i+1) i (i+1, i+2)
+    nie przekraczają granicy śladu.
+    """
+    n = num_activities
+    if len(events) < 3:
+        return np.zeros((n, n), dtype=np.int64)
+    pair_mask = trace_boundary_mask(offsets, len(events))
+    mask = pair_mask[:-1] & pair_mask[1:] & (events[:-2] == events[2:])
+    pattern_codes = events[:-2][mask].astype(np.int64) * n + events[1:-1][mask]
+    event_weights = _event_weights(offsets, weights)
+    pattern_weights = None if event_weights is None else event_weights[:-2][mask]
+    return _count(pattern_codes, pattern_weights, n * n).reshape(n, n)
@@ -0,0 +1,165 @@
+"""Zwarta reprezentacja logu: aktywności zakodowane liczbami całkowitymi.
+
+Nazwy aktywności są internowane do słownika (vocabulary) tylko raz, a wszystkie
+ślady trzymane są w jednym płaskim buforze `array('i')` z indeksem przesunięć
+(offsets) - ślad `i` to `events[offsets[i]:offsets[i+1]]`. Zamiast listy list
+napisów mamy dwa ciągłe bufory, które można bez kopiowania oglądać jako
+tablice NumPy.
+
+Opcjonalnie log może przechowywać każdy unikalny wariant śladu tylko raz,
+z krotnością w `weights` (zob. variants.py). Przebiegi zliczające
+uwzględniają wtedy wagi, więc wyniki są takie same jak dla pełnego logu.
+"""
+from array import array
+
+import numpy as np
+
+
+class EncodedLog:
+    """Log przepływu pracy zakodowany liczbami całkowitymi.
+
+    Iteracja po obiekcie zwraca ślady jako listy nazw aktywności, więc kod
+    napisany dla `workflow_log` w postaci listy list (np. calculate_alpha_relations)
+    działa bez zmian. Szybkie przebiegi zliczające powinny korzystać z
+    `iter_codes()` lub `as_numpy()`. W logu wariantów (`weights` nie jest None)
+    iteracja zwraca każdy wariant raz - kod zależny od liczności musi
+    korzystać z `trace_weights()`.
+    """
+
+    def __init__(self):
+        self.vocabulary = []          # kod -> nazwa aktywności
+        self.codes = {}               # nazwa aktywności -> kod
+        self.events = array('i')      # kody wszystkich zdarzeń, ślad za śladem
+        self.offsets = array('q', [0]) # początki śladów (+ koniec ostatniego)
+        self.weights = None           # krotności śladów (None = każdy ślad raz)
+
+    @classmethod
+    def from_traces(cls, traces):
+        """Buduje log z iterowalnej kolekcji śladów (list nazw); puste ślady są pomijane."""
+        encoded_log = cls()
+        for trace in traces:
+            if trace:
+                encoded_log.append_trace(trace)
+        return encoded_log
+
+    @classmethod
+    def from_arrays(cls, vocabulary, events, offsets, weights=None):
+        """Tworzy log tylko do odczytu na gotowych buforach (np. tablicach NumPy mapowanych z dysku)."""
+        encoded_log = cls()
+        encoded_log.vocabulary = list(vocabulary)
+        encoded_log.codes = {activity: code for code, activity in enumerate(encoded_log.vocabulary)}
+        encoded_log.events = events
+        encoded_log.offsets = offsets
+        encoded_log.weights = weights
+        return encoded_log
+
+    @classmethod
+    def concatenate(cls, encoded_logs):
+        """Łączy kilka logów w jeden, przekodowując aktywności do wspólnego słownika.
+
+        Kolejność śladów i kodów (kolejność pierwszego wystąpienia) jest taka
+        sama, jak przy wczytaniu wszystkich śladów po kolei do jednego logu.
+        Jeśli którakolwiek część ma wagi, wynik również je ma (warianty
+        powtarzające się w różnych częściach nie są scalane).
+        """
+        encoded_logs = list(encoded_logs)
+        merged_log = cls()
+        for part in encoded_logs:
+            remap = np.array([merged_log.encode(activity) for activity in part.vocabulary], dtype=np.int32)
+            events, offsets = part.as_numpy()
+            base = len(merged_log.events)
+            merged_log.events.frombytes(remap[events].astype(np.int32).tobytes())
+            merged_log.offsets.frombytes((offsets[1:] + base).astype(np.int64).tobytes())
+        if any(part.weights is not None for part in encoded_logs):
+            merged_log.weights = array('q')
+            for part in encoded_logs:
+                merged_log.weights.frombytes(part.trace_weights().astype(np.int64).tobytes())
+        return merged_log
+
+    def encode(self, activity):
+        """Zwraca kod aktywności, dodając ją do słownika przy pierwszym wystąpieniu."""
+        code = self.codes.get(activity)
+        if code is None:
+            code = len(self.vocabulary)
+            self.codes[activity] = code
+            self.vocabulary.append(activity)
+        return code
+
+    def append_trace(self, trace):
+        encode = self.encode
+        self.events.extend(encode(activity) for activity in trace)
+        self.offsets.append(len(self.events))
+
+    @property
+    def num_activities(self):
+        return len(self.vocabulary)
+
+    @property
+    def num_events(self):
+        """Liczba zapisanych zdarzeń (w logu wariantów - bez uwzględnienia krotności)."""
+        return len(self.events)
+
+    @property
+    def num_traces(self):
+        """Liczba śladów w logu (z uwzględnieniem krotności wariantów)."""
+        return len(self) if self.weights is None else int(sum(self.weights))
+
+    @property
+    def total_events(self):
+        """Liczba zdarzeń w logu (z uwzględnieniem krotności wariantów)."""
+        if self.weights is None:
+            return len(self.events)
+        lengths = np.diff(np.asarray(self.offsets, dtype=np.int64))
+        return int(lengths @ np.asarray(self.weights, dtype=np.int64))
+
+    def trace_weights(self):
+        """Krotności śladów jako tablica NumPy int64 (same jedynki, gdy log nie ma wag)."""
+        if self.weights is None:
+            return np.ones(len(self), dtype=np.int64)
+        return np.asarray(self.weights, dtype=np.int64)
+
+    @property
+    def nbytes(self):
+        """Rozmiar buforów zdarzeń i przesunięć w bajtach (bez słownika)."""
+        total = self.events.itemsize * len(self.events) + self.offsets.itemsize * len(self.offsets)
+        if self.weights is not None:
+            total += self.weights.itemsize * len(self.weights)
+        return total
+
+    def trace_codes(self, index):
+        """Kody aktywności śladu o podanym indeksie."""
+        return self.events[self.offsets[index]:self.offsets[index + 1]]
+
+    def iter_codes(self):
+        """Generator śladów w postaci tablic kodów."""
+        events, offsets = self.events, self.offsets
+        for i in range(len(offsets) - 1):
+            yield events[offsets[i]:offsets[i + 1]]
+
+    def decode(self, codes):
+        vocabulary = self.vocabulary
+        return [vocabulary[code] for code in codes]
+
+    def as_numpy(self):
+        """Zwraca (events, offsets) jako tablice NumPy współdzielące pamięć z buforami.
+
+        Dopóki widoki istnieją, bufory `array` nie mogą zmieniać rozmiaru.
+        """
+        return np.asarray(self.events, dtype=np.int32), np.asarray(self.offsets, dtype=np.int64)
+
+    # --- Adapter do dotychczasowego interfejsu (lista list nazw) ---
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Indeks śladu poza zakresem")
+        return self.decode(self.trace_codes(index))
+
+    def __iter__(self):
+        vocabulary = self.vocabulary
+        for codes in self.iter_codes():
+            yield [vocabulary[code] for code in codes]
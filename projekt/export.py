@@ -0,0 +1,224 @@
+"""Eksport odkrytych modeli bez uruchamiania układu Graphviz oraz sterowanie renderowaniem.
+
+Model zapisywany jest bezpośrednio do plików tekstowych:
+  * DOT   - źródło grafu Graphviz (`.gv`, zawsze),
+  * JSON  - aktywności i przejścia sieci heurystycznej lub miejsca sieci Petriego,
+  * PNML  - sieć Petriego (gramatyka ptnet),
+  * BPMN  - proces BPMN 2.0 (zadania, bramki, zdarzenia, przepływy) bez diagramu.
+Renderowanie do PNG (`dot`) jest opcjonalne: 'sync' - jak dotąd, 'background'
+- w puli wątków (potok działa dalej, a `wait_for_renders` czeka na koniec),
+'none' - tylko zapis źródła. Duże grafy heurystyczne są przed rysowaniem
+przycinane: aktywności spoza `max_nodes` najczęstszych są zwijane do
+jednego węzła, a krawędzie spoza `max_edges` najczęstszych są usuwane
+(każda aktywność zachowuje najczęstszą krawędź wejściową i wyjściową).
+"""
+import json
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+from profiling import stage
+
+RENDER_MODES = ('sync', 'background', 'none')
+EXPORT_FORMATS = ('json', 'pnml', 'bpmn')
+MAX_GRAPH_NODES = 100
+MAX_GRAPH_EDGES = 300
+OTHER_ACTIVITIES = '[Inne]' # Nazwa węzła zwiniętych aktywności (z sufiksem, jeśli zajęta)
+
+BPMN_NAMESPACE = 'http://www.omg.org/spec/BPMN/20100524/MODEL'
+PNML_GRAMMAR = 'http://www.pnml.org/version-2009/grammar/ptnet'
+
+_render_executor = None
+_render_futures = []
+
+
+# --- Renderowanie ---
+
+def _render(G, output_filename_dot, output_filename_png, description):
+    try:
+        G.render(output_filename_dot, view=False, format='png', outfile=output_filename_png) # Zapisuje .gv i .png
+        print(f"{description} zapisany jako '{output_filename_png}' i '{output_filename_dot}'")
+        return G
+    except Exception as e:
+        print(f"Błąd podczas renderowania grafu Graphviz ({output_filename_dot}): {e}")
+        print("Upewnij się, że Graphviz jest zainstalowany i dostępny w ścieżce systemowej (PATH).")
+        return None
+
+
+def render_graph(G, filename_base, description, mode='sync', profiler=None):
+    """Zapisuje `filename_base`.gv i (zależnie od trybu) renderuje `filename_base`.png.
+
+    Zwraca G (w trybie 'sync' None, gdy renderowanie się nie powiodło).
+    Z `profiler` (profiling.StageProfiler) mierzony jest etap 'render' - w
+    trybie 'background' tylko zlecenie zadania (zob. wait_for_renders).
+    """
+    global _render_executor
+    output_filename_dot = f"{filename_base}.gv"
+    output_filename_png = f"{filename_base}.png"
+    with stage(profiler, 'render'):
+        if mode == 'none':
+            G.save(output_filename_dot)
+            print(f"{description} zapisany jako '{output_filename_dot}' (bez renderowania)")
+            return G
+        if mode == 'background':
+            if _render_executor is None:
+                _render_executor = ThreadPoolExecutor(thread_name_prefix='render')
+            _render_futures.append(_render_executor.submit(_render, G, output_filename_dot, output_filename_png, description))
+            return G
+        return _render(G, output_filename_dot, output_filename_png, description)
+
+
+def wait_for_renders():
+    """Czeka na renderowania w tle; zwraca (udane, wszystkie)."""
+    futures = list(_render_futures)
+    _render_futures.clear()
+    succeeded = sum(future.result() is not None for future in futures)
+    return succeeded, len(futures)
+
+
+# --- Przycinanie dużych grafów heurystycznych ---
+
+def _unused_name(name, taken):
+    """`name` albo `name` z numerem ('[Inne] 2', ...), jeśli nazwa jest już w `taken`."""
+    candidate, number = name, 1
+    while candidate in taken:
+        number += 1
+        candidate = f"{name} {number}"
+    return candidate
+
+
+def limit_heuristic_view(activity_counts, filtered_activities, filtered_transitions,
+                         max_nodes=MAX_GRAPH_NODES, max_edges=MAX_GRAPH_EDGES):
+    """Ogranicza rozmiar widoku grafu heurystycznego.
+
+    Zwraca (activity_counts, filtered_activities, filtered_transitions) -
+    przy zwijaniu aktywności słownik liczności zawiera dodatkowo węzeł
+    zwiniętych aktywności (OTHER_ACTIVITIES, a gdy log ma aktywność o tej
+    nazwie - z kolejnym numerem), a przejścia do/z niego są sumowane.
+    """
+    if max_nodes and len(filtered_activities) > max_nodes:
+        ranked = sorted(filtered_activities, key=lambda act: (-activity_counts[act], act))
+        kept = set(ranked[:max_nodes - 1])
+        collapsed = set(ranked[max_nodes - 1:])
+        other = _unused_name(OTHER_ACTIVITIES, activity_counts)
+        print(f"Graf heurystyczny: {len(collapsed)} rzadkich aktywności zwiniętych do węzła '{other}'.")
+        activity_counts = dict(activity_counts)
+        activity_counts[other] = sum(activity_counts[act] for act in collapsed)
+        merged = {}
+        for (source, target), count in filtered_transitions.items():
+            key = (source if source in kept else other, target if target in kept else other)
+            merged[key] = merged.get(key, 0) + count
+        filtered_activities = kept | {other}
+        filtered_transitions = merged
+
+    if max_edges and len(filtered_transitions) > max_edges:
+        ranked = sorted(filtered_transitions.items(), key=lambda item: -item[1])
+        kept = dict(ranked[:max_edges])
+        best_out, best_in = {}, {}
+        for (source, target), count in ranked:
+            best_out.setdefault(source, (source, target))
+            best_in.setdefault(target, (source, target))
+        for transition in list(best_out.values()) + list(best_in.values()):
+            kept[transition] = filtered_transitions[transition]
+        print(f"Graf heurystyczny: pozostawiono {len(kept)} z {len(filtered_transitions)} przejść.")
+        filtered_transitions = {trans: count for trans, count in filtered_transitions.items() if trans in kept}
+    return activity_counts, filtered_activities, filtered_transitions
+
+
+# --- Zapis modeli ---
+
+def _write_json(path, document):
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(document, output, ensure_ascii=False, indent=2)
+    print(f"Model zapisany jako '{path}'")
+
+
+def _write_xml(path, root):
+    ET.indent(root)
+    ET.ElementTree(root).write(path, encoding='utf-8', xml_declaration=True)
+    print(f"Model zapisany jako '{path}'")
+
+
+def export_heuristic_json(path, activity_counts, filtered_activities, filtered_transitions, performance=None, statistic='mean'):
+    """Sieć heurystyczna jako JSON: aktywności z licznościami i przejścia (opcjonalnie z czasami)."""
+    service = performance.service_statistic(statistic) if performance is not None else {}
+    waiting = performance.edge_statistic(statistic) if performance is not None else {}
+    document = {
+        'activities': [dict({'name': act, 'count': int(activity_counts[act])},
+                            **({f'service_{statistic}': service[act]} if act in service else {}))
+                       for act in sorted(filtered_activities)],
+        'transitions': [dict({'source': source, 'target': target, 'count': int(count)},
+                             **({f'waiting_{statistic}': waiting[(source, target)]} if (source, target) in waiting else {}))
+                        for (source, target), count in filtered_transitions.items()],
+    }
+    _write_json(path, document)
+
+
+def export_petri_net_json(path, petri_net):
+    document = {
+        'transitions': list(petri_net.transitions),
+        'places': [{'name': name, 'inputs': sorted(inputs), 'outputs': sorted(outputs)}
+                   for name, (inputs, outputs) in petri_net.places.items()],
+        'initial_place': petri_net.initial_place,
+        'final_place': petri_net.final_place,
+    }
+    _write_json(path, document)
+
+
+def export_bpmn_json(path, nodes, flows):
+    """Graf BPMN (węzły z typami elementów i przepływy) jako JSON."""
+    document = {
+        'nodes': [{'name': name, 'type': kind} for name, kind in nodes.items()],
+        'flows': [{'source': source, 'target': target} for source, target in flows],
+    }
+    _write_json(path, document)
+
+
+def export_pnml(path, petri_net):
+    """Sieć Petriego w formacie PNML (jeden token w miejscu początkowym)."""
+    root = ET.Element('pnml')
+    net = ET.SubElement(root, 'net', id='net1', type=PNML_GRAMMAR)
+    ET.SubElement(ET.SubElement(net, 'name'), 'text').text = 'Alpha Miner'
+    page = ET.SubElement(net, 'page', id='page1')
+
+    place_ids = {name: f"place_{index}" for index, name in enumerate(petri_net.places)}
+    transition_ids = {name: f"transition_{index}" for index, name in enumerate(petri_net.transitions)}
+    for name, place_id in place_ids.items():
+        place = ET.SubElement(page, 'place', id=place_id)
+        ET.SubElement(ET.SubElement(place, 'name'), 'text').text = name
+        if name == petri_net.initial_place:
+            ET.SubElement(ET.SubElement(place, 'initialMarking'), 'text').text = '1'
+    for name, transition_id in transition_ids.items():
+        transition = ET.SubElement(page, 'transition', id=transition_id)
+        ET.SubElement(ET.SubElement(transition, 'name'), 'text').text = name
+
+    arc_count = 0
+    for name, (inputs, outputs) in petri_net.places.items():
+        arcs = [(transition_ids[t], place_ids[name]) for t in sorted(inputs)]
+        arcs += [(place_ids[name], transition_ids[t]) for t in sorted(outputs)]
+        for source, target in arcs:
+            arc_count += 1
+            ET.SubElement(page, 'arc', id=f"arc_{arc_count}", source=source, target=target)
+
+    final = ET.SubElement(ET.SubElement(net, 'finalmarkings'), 'marking')
+    ET.SubElement(ET.SubElement(final, 'place', idref=place_ids[petri_net.final_place]), 'text').text = '1'
+    _write_xml(path, root)
+
+
+def export_bpmn_xml(path, nodes, flows, process_name='Alpha Miner'):
+    """Proces BPMN 2.0 z węzłów {nazwa: typ elementu BPMN} i przepływów [(źródło, cel)]."""
+    ET.register_namespace('', BPMN_NAMESPACE)
+    root = ET.Element(f"{{{BPMN_NAMESPACE}}}definitions", id='definitions',
+                      targetNamespace='http://www.omg.org/bpmn20')
+    process = ET.SubElement(root, f"{{{BPMN_NAMESPACE}}}process", id='process', name=process_name, isExecutable='false')
+    node_ids = {}
+    for index, (name, kind) in enumerate(nodes.items()):
+        node_ids[name] = f"node_{index}"
+        attributes = {'id': node_ids[name]}
+        if kind == 'task':
+            attributes['name'] = name
+        ET.SubElement(process, f"{{{BPMN_NAMESPACE}}}{kind}", attributes)
+    for index, (source, target) in enumerate(flows):
+        if source in node_ids and target in node_ids:
+            ET.SubElement(process, f"{{{BPMN_NAMESPACE}}}sequenceFlow", id=f"flow_{index}",
+                          sourceRef=node_ids[source], targetRef=node_ids[target])
+    _write_xml(path, root)
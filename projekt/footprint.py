@@ -0,0 +1,151 @@
+"""Macierz śladu (footprint) algorytmu Alpha liczona operacjami na macierzach logicznych.
+
+Dla macierzy bezpośredniego następstwa F (F[a, b] = a > b):
+  * przyczynowość  a -> b :  F & ~F.T
+  * równoległość   a || b :  F &  F.T
+  * wybór          a #  b : ~F & ~F.T
+Zbiory aktywności startowych i końcowych to redukcje po kolumnach / wierszach
+macierzy (-> lub ||) z pominięciem przekątnej.
+
+Relacje można też zapisać jako jedną macierz kodów `F + 2 * F.T`
+(0 = #, 1 = ->, 2 = <-, 3 = ||), więc porównanie śladów dwóch logów
+(zgodność) to pojedyncze porównanie macierzy po wyrównaniu słowników.
+
+Użycie (porównanie dwóch logów): python footprint.py log_a.xes log_b.xes
+"""
+import argparse
+from collections import defaultdict
+
+import numpy as np
+
+CHOICE, CAUSALITY, REVERSE_CAUSALITY, PARALLEL = '#', '->', '<-', '||'
+RELATION_SYMBOLS = np.array([CHOICE, CAUSALITY, REVERSE_CAUSALITY, PARALLEL])
+
+
+class Footprint:
+    """Relacje ->, <-, ||, # między aktywnościami logu."""
+
+    def __init__(self, vocabulary, follows):
+        self.vocabulary = list(vocabulary)
+        self.codes = {activity: code for code, activity in enumerate(self.vocabulary)}
+        F = np.asarray(follows, dtype=bool)
+        self.follows = F
+        self.causality = F & ~F.T
+        self.parallel = F & F.T
+        self.choice = ~F & ~F.T
+
+    @classmethod
+    def from_directly_follows(cls, directly_follows):
+        """Footprint z DirectlyFollowsCounts (a > b, gdy |a > b| > 0)."""
+        return cls(directly_follows.vocabulary, np.asarray(directly_follows.matrix) > 0)
+
+    @classmethod
+    def from_relation(cls, direct_succession, activities):
+        """Footprint ze słownika a -> {b: a > b}; aktywności w kolejności alfabetycznej."""
+        vocabulary = sorted(activities)
+        codes = {activity: code for code, activity in enumerate(vocabulary)}
+        follows = np.zeros((len(vocabulary), len(vocabulary)), dtype=bool)
+        for source, targets in direct_succession.items():
+            if source not in codes:
+                continue
+            target_codes = [codes[target] for target in targets if target in codes]
+            follows[codes[source], target_codes] = True
+        return cls(vocabulary, follows)
+
+    # --- Macierz relacji ---
+
+    def relation_codes(self):
+        """Macierz kodów relacji: 0 = #, 1 = ->, 2 = <-, 3 = ||."""
+        F = self.follows.astype(np.int8)
+        return F + 2 * F.T
+
+    def relation(self, act_a, act_b):
+        """Symbol relacji między dwiema aktywnościami."""
+        return str(RELATION_SYMBOLS[self.relation_codes()[self.codes[act_a], self.codes[act_b]]])
+
+    def to_matrix(self):
+        """Macierz symboli relacji (wiersze i kolumny w kolejności `vocabulary`)."""
+        return RELATION_SYMBOLS[self.relation_codes()]
+
+    # --- Zbiory start/end ---
+
+    def _leads_to(self):
+        """a -> b lub a || b, bez przekątnej."""
+        leads = self.causality | self.parallel
+        np.fill_diagonal(leads, False)
+        return leads
+
+    @property
+    def start_activities(self):
+        """T_start = {a | nie istnieje b != a takie, że b -> a lub b || a}."""
+        incoming = self._leads_to().any(axis=0)
+        return {self.vocabulary[code] for code in np.flatnonzero(~incoming)}
+
+    @property
+    def end_activities(self):
+        """T_end = {a | nie istnieje b != a takie, że a -> b lub a || b}."""
+        outgoing = self._leads_to().any(axis=1)
+        return {self.vocabulary[code] for code in np.flatnonzero(~outgoing)}
+
+    # --- Relacje w postaci słowników (interfejs calculate_alpha_relations) ---
+
+    def causality_dict(self, transpose=False):
+        """{a: {b: a -> b}} (lub odwrotnie przy transpose=True)."""
+        matrix = self.causality.T if transpose else self.causality
+        result = defaultdict(set)
+        sources, targets = np.nonzero(matrix)
+        for source, target in zip(sources.tolist(), targets.tolist()):
+            result[self.vocabulary[source]].add(self.vocabulary[target])
+        return result
+
+    def parallel_pairs(self):
+        """Zbiór par (a, b) z a || b (obie kolejności)."""
+        sources, targets = np.nonzero(self.parallel)
+        return {(self.vocabulary[a], self.vocabulary[b]) for a, b in zip(sources.tolist(), targets.tolist())}
+
+    # --- Zgodność dwóch logów ---
+
+    def aligned_codes(self, vocabulary):
+        """Macierz kodów relacji w podanym (nad)słowniku; brakujące aktywności mają relację #."""
+        index = np.array([self.codes.get(activity, -1) for activity in vocabulary], dtype=np.intp)
+        present = index >= 0
+        aligned = np.zeros((len(vocabulary), len(vocabulary)), dtype=np.int8)
+        aligned[np.ix_(present, present)] = self.relation_codes()[np.ix_(index[present], index[present])]
+        return aligned
+
+    def diff(self, other):
+        """Porównuje dwa footprinty.
+
+        Zwraca (fitness, differences): fitness = 1 - (liczba różnych komórek / n^2)
+        dla wspólnego słownika, differences = lista (a, b, relacja_tu, relacja_tam).
+        """
+        vocabulary = self.vocabulary + [activity for activity in other.vocabulary if activity not in self.codes]
+        mine, theirs = self.aligned_codes(vocabulary), other.aligned_codes(vocabulary)
+        different = mine != theirs
+        sources, targets = np.nonzero(different)
+        differences = [
+            (vocabulary[a], vocabulary[b], str(RELATION_SYMBOLS[mine[a, b]]), str(RELATION_SYMBOLS[theirs[a, b]]))
+            for a, b in zip(sources.tolist(), targets.tolist())
+        ]
+        fitness = 1.0 - different.sum() / different.size if different.size else 1.0
+        return float(fitness), differences
+
+
+def main():
+    from projekt import load_workflow_log
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('log_a', help="Pierwszy plik XES")
+    parser.add_argument('log_b', help="Drugi plik XES")
+    args = parser.parse_args()
+
+    _, counts_a = load_workflow_log(args.log_a)
+    _, counts_b = load_workflow_log(args.log_b)
+    fitness, differences = Footprint.from_directly_follows(counts_a).diff(Footprint.from_directly_follows(counts_b))
+    print(f"Zgodność footprintów: {fitness:.4f} ({len(differences)} różnych relacji)")
+    for act_a, act_b, relation_a, relation_b in differences:
+        print(f"  {act_a} {relation_a} {act_b}  vs  {act_a} {relation_b} {act_b}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Miary zależności algorytmu Heuristics Miner liczone macierzowo.
+
+Na podstawie macierzy bezpośrednich następstw F (|a > b|) oraz macierzy
+wzorców a b a (|a >> b|) wyznaczane są:
+  * miara zależności      a => b  = (|a>b| - |b>a|) / (|a>b| + |b>a| + 1),
+  * pętle długości jeden  a => a  = |a>a| / (|a>a| + 1),
+  * pętle długości dwa    a =>2 b = (|a>>b| + |b>>a|) / (|a>>b| + |b>>a| + 1),
+  * miara AND/XOR dla par wyjść b, c aktywności a
+                          a => (b ^ c) = (|b>c| + |c>b|) / (|a>b| + |a>c| + 1)
+    (analogicznie dla wejść).
+Wszystkie miary par liczone są na całych macierzach NumPy; pętla w Pythonie
+przebiega jedynie po aktywnościach przy analizie rozgałęzień.
+"""
+import numpy as np
+
+# Domyślne progi (jak w Flexible Heuristics Miner)
+DEPENDENCY_THRESHOLD = 0.9
+POSITIVE_OBSERVATIONS = 1
+RELATIVE_TO_BEST = 0.05
+LOOP_THRESHOLD = 0.9
+AND_THRESHOLD = 0.1
+
+
+def dependency_matrix(matrix):
+    """Miary zależności a => b; na przekątnej miara pętli długości jeden."""
+    F = np.asarray(matrix, dtype=np.float64)
+    dependency = (F - F.T) / (F + F.T + 1)
+    loops = np.diag(F)
+    np.fill_diagonal(dependency, loops / (loops + 1))
+    return dependency
+
+
+def two_loop_dependency_matrix(two_loop_counts):
+    """Miary pętli długości dwa a =>2 b (macierz symetryczna)."""
+    L = np.asarray(two_loop_counts, dtype=np.float64)
+    both = L + L.T
+    return both / (both + 1)
+
+
+def _branch_pairs(F, activity, branches, outgoing):
+    """Miary AND/XOR dla wszystkich par gałęzi (wyjść lub wejść) danej aktywności."""
+    sub = F[np.ix_(branches, branches)]
+    together = sub + sub.T
+    to_branches = F[activity, branches] if outgoing else F[branches, activity]
+    measure = together / (to_branches[:, None] + to_branches[None, :] + 1)
+    first, second = np.triu_indices(len(branches), k=1)
+    return branches[first], branches[second], measure[first, second]
+
+
+class HeuristicsNet:
+    """Wynik Heuristics Miner: zaakceptowane krawędzie, pętle i typy rozgałęzień."""
+
+    def __init__(self, vocabulary, matrix, dependency, accepted, splits, joins):
+        self.vocabulary = list(vocabulary)
+        self.matrix = matrix          # |a > b|
+        self.dependency = dependency  # a => b
+        self.accepted = accepted      # macierz logiczna zaakceptowanych krawędzi
+        self.splits = splits          # aktywność -> lista (b, c, miara, 'AND'/'XOR')
+        self.joins = joins            # aktywność -> lista (b, c, miara, 'AND'/'XOR')
+
+    @property
+    def edges(self):
+        """Zaakceptowane krawędzie {(a, b): |a > b|} (pętle jako (a, a))."""
+        vocabulary = self.vocabulary
+        sources, targets = np.nonzero(self.accepted)
+        return {(vocabulary[a], vocabulary[b]): int(self.matrix[a, b])
+                for a, b in zip(sources.tolist(), targets.tolist())}
+
+    def branch_type(self, activity, outgoing=True):
+        """'AND', 'XOR', 'MIXED' lub None (brak rozgałęzienia) dla wyjść/wejść aktywności."""
+        pairs = (self.splits if outgoing else self.joins).get(activity)
+        if not pairs:
+            return None
+        kinds = {kind for _, _, _, kind in pairs}
+        return kinds.pop() if len(kinds) == 1 else 'MIXED'
+
+
+def mine_heuristics_net(directly_follows, two_loop_counts=None,
+                        dependency_threshold=DEPENDENCY_THRESHOLD,
+                        positive_observations=POSITIVE_OBSERVATIONS,
+                        relative_to_best=RELATIVE_TO_BEST,
+                        loop_threshold=LOOP_THRESHOLD,
+                        and_threshold=AND_THRESHOLD,
+                        all_connected=True):
+    """Buduje HeuristicsNet z DirectlyFollowsCounts (i opcjonalnie macierzy |a >> b|).
+
+    Krawędź a -> b (a != b) jest akceptowana, gdy |a>b| >= positive_observations,
+    a => b >= dependency_threshold i miara różni się od najlepszej krawędzi
+    wychodzącej z a lub wchodzącej do b o mniej niż relative_to_best.
+    Przy all_connected każda aktywność zachowuje ponadto swojego najlepszego
+    następnika i poprzednika (niezależnie od progów). Pętle długości dwa dodawane są tylko między
+    aktywnościami bez pętli długości jeden.
+    """
+    F = np.asarray(directly_follows.matrix, dtype=np.float64)
+    n = F.shape[0]
+    dependency = dependency_matrix(F)
+    off_diagonal = ~np.eye(n, dtype=bool)
+    observed = F >= positive_observations
+
+    candidate = off_diagonal & observed & (dependency > 0)
+    scores = np.where(candidate, dependency, -np.inf)
+    accepted = np.zeros((n, n), dtype=bool)
+    if n:
+        best_out = scores.max(axis=1, keepdims=True)
+        best_in = scores.max(axis=0, keepdims=True)
+        with np.errstate(invalid='ignore'): # -inf - (-inf) dla aktywności bez kandydatów
+            near_best = ((best_out - scores) < relative_to_best) | ((best_in - scores) < relative_to_best)
+        accepted = candidate & (dependency >= dependency_threshold) & near_best
+        if all_connected:
+            accepted |= candidate & (scores == best_out)
+            accepted |= candidate & (scores == best_in)
+
+    # Pętle długości jeden
+    loops_one = (np.diag(dependency) >= loop_threshold) & np.diag(observed)
+    accepted[np.diag_indices(n)] = loops_one
+
+    # Pętle długości dwa
+    if two_loop_counts is not None:
+        two_loop_dependency = two_loop_dependency_matrix(two_loop_counts)
+        no_loop_one = ~loops_one
+        accepted |= (off_diagonal & (two_loop_dependency >= loop_threshold)
+                     & no_loop_one[:, None] & no_loop_one[None, :] & observed)
+
+    # Analiza rozgałęzień AND/XOR
+    vocabulary = directly_follows.vocabulary
+    branches_accepted = accepted & off_diagonal
+    splits, joins = {}, {}
+    for outgoing, result in ((True, splits), (False, joins)):
+        branch_matrix = branches_accepted if outgoing else branches_accepted.T
+        for activity in np.flatnonzero(branch_matrix.sum(axis=1) > 1):
+            branches = np.flatnonzero(branch_matrix[activity])
+            firsts, seconds, measures = _branch_pairs(F, activity, branches, outgoing)
+            result[vocabulary[activity]] = [
+                (vocabulary[b], vocabulary[c], float(m), 'AND' if m >= and_threshold else 'XOR')
+                for b, c, m in zip(firsts.tolist(), seconds.tolist(), measures.tolist())
+            ]
+
+    return HeuristicsNet(vocabulary, directly_follows.matrix, dependency, accepted, splits, joins)
@@ -0,0 +1,166 @@
+"""Przyrostowe (online) odkrywanie modelu ze strumienia zdarzeń.
+
+Zamiast wczytywać cały log, IncrementalMiner przyjmuje pojedyncze zdarzenia
+(case_id, aktywność, znacznik czasu) i aktualizuje liczności w czasie O(1):
+  * dla każdego otwartego przypadku pamiętana jest tylko ostatnia aktywność
+    i czas ostatniego zdarzenia (OrderedDict w kolejności aktywności),
+  * liczności aktywności, przejść a -> b oraz aktywności startowych
+    i końcowych są sumami bieżącymi.
+Pamięć jest ograniczona: przy przekroczeniu `max_cases` albo po czasie
+bezczynności `idle_timeout` najdawniej aktywne przypadki są zamykane (ich
+ostatnia aktywność liczy się jako końcowa). Zdarzenie przypadku już
+zamkniętego rozpoczyna go od nowa.
+
+Migawka (`snapshot`) to zwykłe DirectlyFollowsCounts, więc graf heurystyczny,
+Heuristics Miner i relacje Alpha liczone są tym samym kodem co w trybie
+wsadowym, bez ponownego przeglądania zdarzeń.
+"""
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+
+from alpha import discover_alpha_net
+from dfg import DirectlyFollowsCounts
+from footprint import Footprint
+
+DEFAULT_MAX_CASES = 100_000
+
+
+class IncrementalMiner:
+    """Bieżące liczności bezpośrednich następstw dla strumienia zdarzeń."""
+
+    def __init__(self, max_cases=DEFAULT_MAX_CASES, idle_timeout=None):
+        if isinstance(idle_timeout, (int, float)):
+            idle_timeout = timedelta(seconds=idle_timeout)
+        if max_cases < 1:
+            raise ValueError(f"max_cases musi być dodatnie (podano {max_cases}).")
+        self.max_cases = max_cases
+        self.idle_timeout = idle_timeout
+
+        self.vocabulary = []
+        self.codes = {}
+        self.activity_counts = []
+        self.start_counts = []
+        self.end_counts = []
+        self.transition_counts = {} # (kod a, kod b) -> |a > b|
+
+        self._open_cases = OrderedDict() # case_id -> (kod ostatniej aktywności, czas)
+        self.num_events = 0
+        self.closed_cases = 0
+        self.evicted_cases = 0
+
+    def _encode(self, activity):
+        code = self.codes.get(activity)
+        if code is None:
+            code = self.codes[activity] = len(self.vocabulary)
+            self.vocabulary.append(activity)
+            self.activity_counts.append(0)
+            self.start_counts.append(0)
+            self.end_counts.append(0)
+        return code
+
+    def consume(self, case_id, activity, timestamp=None):
+        """Przetwarza jedno zdarzenie."""
+        code = self._encode(activity)
+        self.activity_counts[code] += 1
+        self.num_events += 1
+
+        state = self._open_cases.pop(case_id, None)
+        if state is None:
+            self.start_counts[code] += 1
+            # Miejsce robione przed wstawieniem, żeby nie usunąć właśnie otwartego przypadku
+            if len(self._open_cases) >= self.max_cases:
+                self._evict_oldest()
+        else:
+            transition = (state[0], code)
+            self.transition_counts[transition] = self.transition_counts.get(transition, 0) + 1
+        self._open_cases[case_id] = (code, timestamp)
+
+        if self.idle_timeout is not None and timestamp is not None:
+            self.evict_idle(timestamp - self.idle_timeout)
+
+    def consume_all(self, events):
+        """Przetwarza iterowalną kolekcję krotek (case_id, aktywność, czas)."""
+        for case_id, activity, timestamp in events:
+            self.consume(case_id, activity, timestamp)
+
+    def close_case(self, case_id):
+        """Zamyka przypadek (np. po zdarzeniu końcowym); zwraca False, gdy nie był otwarty."""
+        state = self._open_cases.pop(case_id, None)
+        if state is None:
+            return False
+        self.end_counts[state[0]] += 1
+        self.closed_cases += 1
+        return True
+
+    def close_all(self):
+        """Zamyka wszystkie otwarte przypadki (koniec strumienia)."""
+        for code, _ in self._open_cases.values():
+            self.end_counts[code] += 1
+        self.closed_cases += len(self._open_cases)
+        self._open_cases.clear()
+
+    def _evict_oldest(self):
+        _, (code, _) = self._open_cases.popitem(last=False)
+        self.end_counts[code] += 1
+        self.closed_cases += 1
+        self.evicted_cases += 1
+
+    def evict_idle(self, older_than):
+        """Zamyka przypadki, których ostatnie zdarzenie jest starsze niż `older_than`."""
+        while self._open_cases:
+            _, last_timestamp = next(iter(self._open_cases.values()))
+            if last_timestamp is None or last_timestamp >= older_than:
+                break
+            self._evict_oldest()
+
+    @property
+    def open_cases(self):
+        return len(self._open_cases)
+
+    # --- Migawki ---
+
+    def snapshot(self):
+        """DirectlyFollowsCounts dla wszystkich dotychczas przetworzonych zdarzeń."""
+        n = len(self.vocabulary)
+        matrix = np.zeros((n, n), dtype=np.int64)
+        if self.transition_counts:
+            pairs = np.array(list(self.transition_counts), dtype=np.intp)
+            matrix[pairs[:, 0], pairs[:, 1]] = np.fromiter(self.transition_counts.values(), dtype=np.int64)
+        return DirectlyFollowsCounts(self.vocabulary, np.array(self.activity_counts, dtype=np.int64), matrix)
+
+    def start_end_activities(self, include_open=True):
+        """Zbiory aktywności startowych i końcowych.
+
+        Przy include_open=True ostatnie aktywności otwartych przypadków
+        traktowane są jak końcowe (stan jak po close_all).
+        """
+        end_counts = list(self.end_counts)
+        if include_open:
+            for code, _ in self._open_cases.values():
+                end_counts[code] += 1
+        starts = {self.vocabulary[code] for code, count in enumerate(self.start_counts) if count}
+        ends = {self.vocabulary[code] for code, count in enumerate(end_counts) if count}
+        return starts, ends
+
+    def footprint(self):
+        """Footprint (relacje Alpha) bieżącej migawki."""
+        return Footprint.from_directly_follows(self.snapshot())
+
+    def alpha_net(self, include_open=True):
+        """Sieć Petriego algorytmu Alpha dla bieżącej migawki."""
+        starts, ends = self.start_end_activities(include_open)
+        return discover_alpha_net(self.footprint(), starts, ends)
+
+    def heuristic_graph(self, act_threshold, trans_threshold, filename_base):
+        """Renderuje graf heurystyczny bieżącej migawki (generate_heuristic_graph z projekt.py)."""
+        from projekt import generate_heuristic_graph
+
+        activity_counter, transition_counter, direct_succession_rel = self.snapshot().to_dicts()
+        return generate_heuristic_graph(activity_counter, transition_counter, direct_succession_rel,
+                                        act_threshold, trans_threshold, filename_base)
+
+    def __repr__(self):
+        return (f"IncrementalMiner({self.num_events} zdarzeń, {len(self.vocabulary)} aktywności, "
+                f"{self.open_cases} otwartych przypadków)")
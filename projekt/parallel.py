@@ -0,0 +1,262 @@
+"""Równoległe wczytywanie i zliczanie logu w wielu procesach.
+
+Liczności aktywności i przejść oraz relacja > są łączne względem podziału
+logu na ślady, więc każdy proces może policzyć je dla swojej części, a wyniki
+częściowe wystarczy zsumować (DirectlyFollowsCounts.merge).
+
+Dostępne są dwa tryby:
+  * `count_parallel` - dzieli już wczytany EncodedLog na zakresy śladów,
+  * `mine_xes_parallel` - dzieli sam plik XES na zakresy bajtów wyrównane do
+    znaczników <trace>; każdy proces parsuje i zlicza swój fragment, więc
+    równolegle wykonuje się także najdroższy etap - parsowanie.
+`encode_views_parallel` w ten sam sposób buduje kilka widoków logu (np.
+aktywności i zasobów) z jednego przebiegu, bez zliczania następstw.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from dfg import DirectlyFollowsCounts
+from encoded_log import EncodedLog
+from variants import VariantIndex, deduplicate
+from xes_stream import DEFAULT_ACTIVITY_KEYS, XES_NAMESPACE, as_classifier, iter_classified_traces, iter_traces
+
+TRACE_OPEN_TAG = b'<trace'
+LOG_CLOSE_TAG = b'</log>'
+_SEARCH_BLOCK_SIZE = 1 << 20
+
+
+def split_evenly(num_items, parts):
+    """Dzieli zakres [0, num_items) na co najwyżej `parts` ciągłych, niepustych przedziałów."""
+    parts = max(1, min(parts, num_items))
+    bounds = [num_items * k // parts for k in range(parts + 1)]
+    return [(bounds[k], bounds[k + 1]) for k in range(parts) if bounds[k] < bounds[k + 1]]
+
+
+# --- Tryb 1: podział wczytanego logu ---
+
+def _count_trace_range(vocabulary, events, offsets, weights):
+    return DirectlyFollowsCounts.from_arrays(vocabulary, events, offsets - offsets[0], weights)
+
+
+def count_parallel(encoded_log, workers):
+    """Liczy DirectlyFollowsCounts dla EncodedLog, dzieląc ślady między `workers` procesów."""
+    if workers <= 1 or len(encoded_log) < 2:
+        return DirectlyFollowsCounts.from_encoded_log(encoded_log)
+
+    events, offsets = encoded_log.as_numpy()
+    weights = None if encoded_log.weights is None else encoded_log.trace_weights()
+    vocabulary = encoded_log.vocabulary
+    ranges = split_evenly(len(encoded_log), workers)
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [
+            executor.submit(_count_trace_range, vocabulary,
+                            events[offsets[first]:offsets[last]], offsets[first:last + 1],
+                            None if weights is None else weights[first:last])
+            for first, last in ranges
+        ]
+        return DirectlyFollowsCounts.merge(future.result() for future in futures)
+
+
+# --- Tryb 2: podział pliku XES na zakresy bajtów ---
+
+def _find(log_file, pattern, position):
+    """Pozycja pierwszego wystąpienia `pattern` od `position` lub -1."""
+    log_file.seek(position)
+    overlap = len(pattern) - 1
+    tail = b''
+    while True:
+        block = log_file.read(_SEARCH_BLOCK_SIZE)
+        if not block:
+            return -1
+        index = (tail + block).find(pattern)
+        if index != -1:
+            return position - len(tail) + index
+        tail = block[-overlap:] if overlap else b''
+        position += len(block)
+
+
+def _rfind_from_end(log_file, pattern, file_size):
+    """Pozycja ostatniego wystąpienia `pattern` (szukając od końca pliku) lub -1."""
+    position = file_size
+    tail = b''
+    while position > 0:
+        start = max(0, position - _SEARCH_BLOCK_SIZE)
+        log_file.seek(start)
+        block = log_file.read(position - start) + tail
+        index = block.rfind(pattern)
+        if index != -1:
+            return start + index
+        tail = block[:len(pattern) - 1]
+        position = start
+    return -1
+
+
+def xes_trace_byte_ranges(log_file_path, parts):
+    """Dzieli plik XES na zakresy bajtów, z których każdy zawiera wyłącznie całe ślady.
+
+    Zwraca (header, ranges): `header` to bajty przed pierwszym <trace>,
+    `ranges` to lista par (start, end) pokrywających wszystkie ślady.
+    """
+    file_size = os.path.getsize(log_file_path)
+    with open(log_file_path, 'rb') as log_file:
+        first_trace = _find(log_file, TRACE_OPEN_TAG, 0)
+        if first_trace == -1:
+            log_file.seek(0)
+            return log_file.read(), []
+        log_end = _rfind_from_end(log_file, LOG_CLOSE_TAG, file_size)
+        if log_end < first_trace:
+            log_end = file_size
+
+        log_file.seek(0)
+        header = log_file.read(first_trace)
+
+        boundaries = [first_trace]
+        for start, _ in split_evenly(log_end - first_trace, parts)[1:]:
+            boundary = _find(log_file, TRACE_OPEN_TAG, first_trace + start)
+            if boundary == -1 or boundary >= log_end:
+                break
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+        boundaries.append(log_end)
+
+    return header, list(zip(boundaries[:-1], boundaries[1:]))
+
+
+class _ByteRangeReader:
+    """Obiekt plikopodobny: deklaracja XML + <log> + bajty [start, end) pliku + </log>."""
+
+    def __init__(self, log_file_path, start, end, prefix):
+        self._file = open(log_file_path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+        self._prefix = prefix
+        self._suffix = LOG_CLOSE_TAG
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._remaining + len(self._prefix) + len(self._suffix)
+        chunk = b''
+        if self._prefix:
+            chunk, self._prefix = self._prefix[:size], self._prefix[size:]
+        if len(chunk) < size and self._remaining:
+            data = self._file.read(min(size - len(chunk), self._remaining))
+            self._remaining -= len(data)
+            chunk += data
+        if len(chunk) < size and not self._remaining and not self._prefix:
+            needed = size - len(chunk)
+            chunk, self._suffix = chunk + self._suffix[:needed], self._suffix[needed:]
+        return chunk
+
+    def close(self):
+        self._file.close()
+
+
+def _fragment_prefix(header):
+    """Deklaracja XML z nagłówka oryginału i sztuczny element <log> otwierający fragment."""
+    declaration = re.match(rb'\s*(<\?xml[^>]*\?>)', header)
+    prefix = declaration.group(1) if declaration else b''
+    return prefix + f'<log xmlns="{XES_NAMESPACE}">'.encode()
+
+
+def _map_byte_range(log_file_path, start, end, prefix, function, args):
+    reader = _ByteRangeReader(log_file_path, start, end, prefix)
+    try:
+        return function(reader, *args)
+    finally:
+        reader.close()
+
+
+def map_xes_byte_ranges(log_file_path, workers, function, *args):
+    """Wywołuje `function(plik, *args)` dla zakresów bajtów pliku XES w `workers` procesach.
+
+    Każdy zakres widziany jest jako samodzielny plik XES z całymi śladami
+    (bez nagłówka oryginału). `function` musi być funkcją poziomu modułu
+    (przekazywaną do procesów); zwracana jest lista wyników w kolejności
+    zakresów (pusta, gdy plik nie zawiera śladów).
+    """
+    header, ranges = xes_trace_byte_ranges(log_file_path, workers)
+    prefix = _fragment_prefix(header)
+    if not ranges:
+        return []
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [executor.submit(_map_byte_range, log_file_path, start, end, prefix, function, args)
+                   for start, end in ranges]
+        return [future.result() for future in futures]
+
+
+def build_encoded_log(traces, variants=False):
+    """EncodedLog ze śladów (puste są pomijane); przy variants=True - log wariantów z krotnościami."""
+    return VariantIndex.from_traces(traces) if variants else EncodedLog.from_traces(traces)
+
+
+def merge_encoded_logs(encoded_logs, variants=False):
+    """Łączy logi częściowe w kolejności zakresów; przy variants=True scala powtórzone warianty."""
+    encoded_log = EncodedLog.concatenate(encoded_logs)
+    return deduplicate(encoded_log) if variants else encoded_log # Te same warianty mogły wystąpić w kilku zakresach
+
+
+def mine_xes(log_file_path, workers, mine_log, classifier, variants=False, *args):
+    """Wczytuje plik XES funkcją `mine_log(plik, classifier, variants, *args)` w całości lub w `workers` procesach.
+
+    `mine_log` (funkcja poziomu modułu) zwraca (EncodedLog,
+    DirectlyFollowsCounts, *wyniki dodatkowe) dla pliku lub zakresu bajtów.
+    Logi częściowe są łączone przez merge_encoded_logs, a liczności
+    sumowane. Zwraca (EncodedLog, DirectlyFollowsCounts, lista krotek wyników
+    dodatkowych z kolejnych zakresów).
+    """
+    if workers <= 1:
+        encoded_log, directly_follows, *extra = mine_log(log_file_path, classifier, variants, *args)
+        return encoded_log, directly_follows, [tuple(extra)]
+    partial_results = map_xes_byte_ranges(log_file_path, workers, mine_log, classifier, variants, *args)
+    if not partial_results:
+        encoded_log = EncodedLog()
+        return encoded_log, DirectlyFollowsCounts.from_encoded_log(encoded_log), []
+    encoded_log = merge_encoded_logs([result[0] for result in partial_results], variants)
+    directly_follows = DirectlyFollowsCounts.merge(result[1] for result in partial_results)
+    return encoded_log, directly_follows, [tuple(result[2:]) for result in partial_results]
+
+
+def _mine_traces(log_file, classifier, variants):
+    encoded_log = build_encoded_log(iter_traces(log_file, classifier), variants)
+    return encoded_log, DirectlyFollowsCounts.from_encoded_log(encoded_log)
+
+
+def mine_xes_parallel(log_file_path, workers, activity_keys=DEFAULT_ACTIVITY_KEYS, variants=False):
+    """Wczytuje i zlicza plik XES w `workers` procesach.
+
+    Zwraca (EncodedLog, DirectlyFollowsCounts) identyczne z wynikiem
+    sekwencyjnego `build_encoded_log(iter_traces(...), variants)` i
+    `DirectlyFollowsCounts.from_encoded_log(...)`.
+    """
+    encoded_log, directly_follows, _ = mine_xes(log_file_path, workers, _mine_traces, as_classifier(activity_keys), variants)
+    return encoded_log, directly_follows
+
+
+def encode_views(log_file, classifiers, variants=False):
+    """Jeden przebieg po pliku: osobny EncodedLog dla każdego klasyfikatora.
+
+    Puste ślady są pomijane w każdym widoku osobno, więc widoki mogą mieć
+    różną liczbę śladów (np. gdy części zdarzeń brakuje org:resource).
+    """
+    if variants:
+        indexes = [VariantIndex() for _ in classifiers]
+        for views in iter_classified_traces(log_file, classifiers):
+            for index, trace in zip(indexes, views):
+                index.add(trace)
+        return [index.to_encoded_log() for index in indexes]
+    logs = [EncodedLog() for _ in classifiers]
+    for views in iter_classified_traces(log_file, classifiers):
+        for encoded_log, trace in zip(logs, views):
+            if trace:
+                encoded_log.append_trace(trace)
+    return logs
+
+
+def encode_views_parallel(log_file_path, workers, classifiers, variants=False):
+    """encode_views dla zakresów bajtów pliku XES w `workers` procesach."""
+    classifiers = [as_classifier(classifier) for classifier in classifiers]
+    partial_results = map_xes_byte_ranges(log_file_path, workers, encode_views, classifiers, variants)
+    if not partial_results:
+        return [EncodedLog() for _ in classifiers]
+    return [merge_encoded_logs(views, variants) for views in zip(*partial_results)]
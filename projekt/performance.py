@@ -0,0 +1,306 @@
+"""Widok wydajnościowy sieci heurystycznej: czasy oczekiwania i obsługi.
+
+W jednym przebiegu po strumieniu śladów (xes_stream.iter_timed_traces,
+z wybranym klasyfikatorem) budowany jest log (warianty) do zliczeń oraz
+próbki czasów:
+  * czas oczekiwania na krawędzi a -> b: różnica znaczników czasu dwóch
+    kolejnych zdarzeń śladu (z pominięciem par start -> complete tej samej
+    aktywności, które są czasem obsługi),
+  * czas obsługi aktywności: od zdarzenia `start` do odpowiadającego mu
+    (kolejka FIFO w obrębie śladu) zdarzenia `complete` tej samej aktywności.
+Zdarzenia start i complete łączone są po nazwie aktywności (concept:name),
+a nie po klasie, więc działa to także z klasyfikatorem zawierającym
+lifecycle:transition (np. 'MXML Legacy Classifier'); czas obsługi
+przypisywany jest wtedy klasie zdarzenia complete ('X+complete').
+
+Próbki trafiają do szkiców kwantylowych DDSketch (Masson i in., 2019):
+wartość x > 0 zliczana jest w kubełku ceil(log_gamma(x)), gdzie
+gamma = (1 + alpha) / (1 - alpha), więc każdy kwantyl ma błąd względny
+co najwyżej alpha, a liczba kubełków jest ograniczona (`max_bins`, przy
+przekroczeniu scalane są najniższe kubełki). Szkice sumuje się kubełek
+po kubełku, więc wyniki z części logu (np. z różnych procesów) można scalać.
+Próbki nie są gromadzone dla całego logu: trafiają do bufora krawędzi
+opróżnianego do szkiców co FLUSH_SAMPLES próbek, więc pamięć jest
+ograniczona (max_bins na szkic), a nie proporcjonalna do liczby zdarzeń.
+"""
+import math
+
+import numpy as np
+
+from dfg import DirectlyFollowsCounts
+from parallel import build_encoded_log, mine_xes
+from xes_stream import DEFAULT_ACTIVITY_KEYS, LIFECYCLE_COMPLETE, LIFECYCLE_START, as_classifier, iter_timed_traces
+
+RELATIVE_ACCURACY = 0.01
+MAX_BINS = 2048
+MIN_POSITIVE = 1e-9 # Wartości mniejsze (np. zerowe czasy) trafiają do kubełka zera
+STATISTICS = ('mean', 'median', 'p95')
+FLUSH_SAMPLES = 1 << 16 # Rozmiar bufora próbek przed dodaniem ich do szkiców
+
+
+class DDSketch:
+    """Szkic kwantylowy o ograniczonym błędzie względnym i stałej pamięci."""
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY, max_bins=MAX_BINS):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}       # indeks kubełka -> liczba próbek
+        self.zero_count = 0  # próbki <= MIN_POSITIVE
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value, count=1):
+        if value > MIN_POSITIVE:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def add_many(self, values):
+        """Dodaje tablicę próbek jednym przebiegiem NumPy."""
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        positive = values > MIN_POSITIVE
+        keys, counts = np.unique(np.ceil(np.log(values[positive]) / self._log_gamma).astype(np.int64),
+                                 return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += int(len(values) - positive.sum())
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def merge(self, other):
+        """Dodaje do szkicu próbki innego szkicu o tej samej dokładności."""
+        if not math.isclose(self.gamma, other.gamma):
+            raise ValueError("Nie można scalić szkiców o różnej dokładności względnej.")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        return self
+
+    def _collapse(self):
+        """Scala najniższe kubełki, aby ich liczba nie przekraczała max_bins."""
+        keys = sorted(self.bins)
+        excess = keys[:len(keys) - self.max_bins + 1]
+        self.bins[excess[-1]] = sum(self.bins.pop(key) for key in excess[:-1]) + self.bins[excess[-1]]
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else math.nan
+
+    def quantile(self, q):
+        """Przybliżony kwantyl rzędu q (0 <= q <= 1); NaN dla pustego szkicu."""
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.min, 0.0)
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def statistic(self, name):
+        """Wartość statystyki 'mean', 'median' lub 'p95'."""
+        if name == 'mean':
+            return self.mean
+        if name == 'median':
+            return self.quantile(0.5)
+        if name == 'p95':
+            return self.quantile(0.95)
+        raise ValueError(f"Nieznana statystyka: '{name}'")
+
+    def to_dict(self):
+        """Stan szkicu jako słownik (do zapisu JSON, np. w pamięci podręcznej)."""
+        return {'relative_accuracy': self.relative_accuracy, 'max_bins': self.max_bins,
+                'bins': sorted(self.bins.items()), 'zero_count': self.zero_count,
+                'count': self.count, 'sum': self.sum, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state['relative_accuracy'], state['max_bins'])
+        sketch.bins = {int(key): count for key, count in state['bins']}
+        for name in ('zero_count', 'count', 'sum', 'min', 'max'):
+            setattr(sketch, name, state[name])
+        return sketch
+
+    def __repr__(self):
+        return f"DDSketch(n={self.count}, kubełki={len(self.bins)})"
+
+
+class PerformanceCollector:
+    """Przyrostowe zbieranie czasów oczekiwania i obsługi ślad po śladzie."""
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY, flush_samples=FLUSH_SAMPLES):
+        self.relative_accuracy = relative_accuracy
+        self.flush_samples = flush_samples
+        self.edge_sketches = {}
+        self.service_sketches = {}
+        self._pending_edges = {}     # (a, b) -> lista próbek czekających na szkic
+        self._pending_service = {}   # a -> lista próbek
+        self._pending_count = 0
+
+    def add(self, activities, names, timestamps, lifecycles):
+        """Dodaje próbki jednego śladu (listy równoległe, jak z iter_timed_traces)."""
+        pending_edges, pending_service = self._pending_edges, self._pending_service
+        added = 0
+        for i in range(len(activities) - 1):
+            waiting = timestamps[i + 1] - timestamps[i]
+            if math.isnan(waiting):
+                continue
+            # Start -> complete tej samej aktywności to czas obsługi, nie oczekiwania
+            if (lifecycles[i] == LIFECYCLE_START and lifecycles[i + 1] == LIFECYCLE_COMPLETE
+                    and names[i] == names[i + 1]):
+                continue
+            pending_edges.setdefault((activities[i], activities[i + 1]), []).append(waiting)
+            added += 1
+
+        open_starts = {}
+        for activity, name, timestamp, lifecycle in zip(activities, names, timestamps, lifecycles):
+            if lifecycle == LIFECYCLE_START:
+                open_starts.setdefault(name, []).append(timestamp)
+            elif lifecycle == LIFECYCLE_COMPLETE:
+                starts = open_starts.get(name)
+                if starts:
+                    service = timestamp - starts.pop(0)
+                    if not math.isnan(service):
+                        pending_service.setdefault(activity, []).append(service)
+                        added += 1
+
+        self._pending_count += added
+        if self._pending_count >= self.flush_samples:
+            self.flush()
+
+    def flush(self):
+        """Przenosi zbuforowane próbki do szkiców."""
+        for pending, sketches in ((self._pending_edges, self.edge_sketches),
+                                  (self._pending_service, self.service_sketches)):
+            for key, values in pending.items():
+                sketch = sketches.get(key)
+                if sketch is None:
+                    sketch = sketches[key] = DDSketch(self.relative_accuracy)
+                sketch.add_many(values)
+            pending.clear()
+        self._pending_count = 0
+
+    def to_stats(self):
+        self.flush()
+        return PerformanceStats(self.edge_sketches, self.service_sketches)
+
+
+class PerformanceStats:
+    """Szkice czasów oczekiwania na krawędziach i czasów obsługi aktywności (w sekundach)."""
+
+    def __init__(self, edge_sketches, service_sketches):
+        self.edge_sketches = edge_sketches        # (a, b) -> DDSketch
+        self.service_sketches = service_sketches  # a -> DDSketch
+
+    @classmethod
+    def merge(cls, parts):
+        """Scala statystyki częściowe (szkice o tych samych kluczach są sumowane)."""
+        edge_sketches, service_sketches = {}, {}
+        for part in parts:
+            for merged, sketches in ((edge_sketches, part.edge_sketches), (service_sketches, part.service_sketches)):
+                for key, sketch in sketches.items():
+                    if key in merged:
+                        merged[key].merge(sketch)
+                    else:
+                        merged[key] = DDSketch(sketch.relative_accuracy, sketch.max_bins).merge(sketch)
+        return cls(edge_sketches, service_sketches)
+
+    def to_dict(self):
+        return {
+            'edges': [[source, target, sketch.to_dict()] for (source, target), sketch in self.edge_sketches.items()],
+            'service': [[activity, sketch.to_dict()] for activity, sketch in self.service_sketches.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls({(source, target): DDSketch.from_dict(sketch) for source, target, sketch in state['edges']},
+                   {activity: DDSketch.from_dict(sketch) for activity, sketch in state['service']})
+
+    def edge_statistic(self, statistic='mean'):
+        """{(a, b): czas oczekiwania w sekundach} dla krawędzi z próbkami."""
+        return {edge: sketch.statistic(statistic) for edge, sketch in self.edge_sketches.items()}
+
+    def service_statistic(self, statistic='mean'):
+        """{a: czas obsługi w sekundach} dla aktywności z parami start/complete."""
+        return {activity: sketch.statistic(statistic) for activity, sketch in self.service_sketches.items()}
+
+
+def _mine_timed_traces(log_file, classifier, variants, relative_accuracy):
+    """Jeden przebieg po strumieniu: (EncodedLog, DirectlyFollowsCounts, PerformanceStats)."""
+    collector = PerformanceCollector(relative_accuracy)
+
+    def traces():
+        for activities, names, timestamps, lifecycles in iter_timed_traces(log_file, classifier):
+            if activities:
+                collector.add(activities, names, timestamps, lifecycles)
+            yield activities
+
+    encoded_log = build_encoded_log(traces(), variants)
+    return encoded_log, DirectlyFollowsCounts.from_encoded_log(encoded_log), collector.to_stats()
+
+
+def mine_performance(log_file, classifier=DEFAULT_ACTIVITY_KEYS, variants=True, workers=1,
+                     relative_accuracy=RELATIVE_ACCURACY):
+    """Wczytuje log razem z czasami: (EncodedLog, DirectlyFollowsCounts, PerformanceStats).
+
+    Log i liczności wczytywane są tak samo jak bez czasów (parallel.mine_xes),
+    a szkice częściowe z zakresów pliku są scalane.
+    """
+    encoded_log, directly_follows, partial_results = mine_xes(
+        log_file, workers, _mine_timed_traces, as_classifier(classifier), variants, relative_accuracy)
+    return encoded_log, directly_follows, PerformanceStats.merge(stats for stats, in partial_results)
+
+
+def format_duration(seconds):
+    """Krótki zapis czasu trwania: '2d 3h', '4h 10m', '12m', '45s'."""
+    if seconds is None or math.isnan(seconds):
+        return '-'
+    seconds = int(round(seconds))
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, secs = divmod(rest, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m"
+    return f"{secs}s"
+
+
+def print_performance_report(performance, statistic='mean', top=10):
+    """Wypisuje najdłuższe czasy obsługi i oczekiwania."""
+    print(f"\nCzasy obsługi aktywności ({statistic}):")
+    for activity, value in sorted(performance.service_statistic(statistic).items(), key=lambda item: -item[1]):
+        print(f"  {activity}: {format_duration(value)}")
+    print(f"Najdłuższe oczekiwania na krawędziach ({statistic}, top {top}):")
+    edges = sorted(performance.edge_statistic(statistic).items(), key=lambda item: -item[1])[:top]
+    for (source, target), value in edges:
+        print(f"  {source} -> {target}: {format_duration(value)}")
@@ -0,0 +1,141 @@
+"""Pomiar etapów potoku odkrywania: czas, pamięć i przepustowość.
+
+Każdy etap (parsowanie, zliczanie, relacje Alpha, budowa grafu,
+renderowanie...) uruchamiany jest w `with profiler.stage(nazwa):`.
+Dla etapu zapisywane są:
+  * czas ścienny (time.perf_counter),
+  * szczytowy RSS procesu po etapie i jego przyrost w trakcie etapu
+    (getrusage - maksimum od startu procesu, więc przyrost pokazuje,
+    który etap podniósł szczyt; procesy potomne liczone są osobno),
+  * opcjonalnie szczyt pamięci zaalokowanej przez Pythona i NumPy w
+    trakcie etapu (tracemalloc - dokładny, ale spowalnia kod Pythona),
+  * liczba przetworzonych zdarzeń i przepustowość (zdarzenia/s), jeśli
+    etap ją poda (`record.events = ...`).
+Etapy mogą być zagnieżdżone ('graph/render'); czas etapu obejmuje czas
+etapów podrzędnych. Raport jest słownikiem gotowym do zapisu jako JSON.
+"""
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+SCHEMA_VERSION = 1
+
+
+def _peak_rss_mb(who=resource.RUSAGE_SELF):
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux podaje kilobajty, macOS - bajty
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class StageRecord:
+    """Wynik pomiaru jednego etapu."""
+
+    def __init__(self, name, depth, order=0):
+        self.name = name
+        self.depth = depth
+        self.order = order # kolejność rozpoczęcia (etap nadrzędny przed podrzędnymi)
+        self.seconds = None
+        self.events = None
+        self.peak_rss_mb = None
+        self.rss_growth_mb = None
+        self.python_peak_mb = None
+        self.info = {}   # dodatkowe dane etapu (np. liczba wariantów)
+
+    @property
+    def events_per_second(self):
+        if not self.events or not self.seconds:
+            return None
+        return self.events / self.seconds
+
+    def to_dict(self):
+        record = {
+            'stage': self.name,
+            'depth': self.depth,
+            'seconds': round(self.seconds, 6),
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+            'rss_growth_mb': round(self.rss_growth_mb, 1),
+        }
+        if self.python_peak_mb is not None:
+            record['python_peak_mb'] = round(self.python_peak_mb, 1)
+        if self.events is not None:
+            record['events'] = int(self.events)
+            record['events_per_second'] = round(self.events_per_second or 0.0, 1)
+        if self.info:
+            record['info'] = self.info
+        return record
+
+
+class StageProfiler:
+    """Zbiera pomiary etapów potoku; raport podaje je w kolejności rozpoczęcia."""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._open = []
+        self._started = time.perf_counter()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, events=None):
+        """Mierzy blok kodu jako etap `name`; zwraca StageRecord do uzupełnienia."""
+        path = f"{self._open[-1].name}/{name}" if self._open else name
+        record = StageRecord(path, len(self._open), len(self.records) + len(self._open))
+        record.events = events
+        self._open.append(record)
+        rss_before = _peak_rss_mb()
+        if self.trace_memory:
+            # Szczyt rodzica jest zachowywany, bo reset_peak działa globalnie
+            for parent in self._open[:-1]:
+                parent.python_peak_mb = max(parent.python_peak_mb or 0.0, tracemalloc.get_traced_memory()[1] / 2**20)
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            if self.trace_memory:
+                record.python_peak_mb = max(record.python_peak_mb or 0.0, tracemalloc.get_traced_memory()[1] / 2**20)
+            record.peak_rss_mb = _peak_rss_mb()
+            record.rss_growth_mb = record.peak_rss_mb - rss_before
+            self._open.pop()
+            self.records.append(record)
+
+    def report(self, **metadata):
+        """Raport wszystkich etapów jako słownik (serializowalny do JSON)."""
+        return {
+            'schema': SCHEMA_VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'metadata': metadata,
+            'total_seconds': round(time.perf_counter() - self._started, 6),
+            'peak_rss_mb': round(_peak_rss_mb(), 1),
+            'children_peak_rss_mb': round(_peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+            'stages': [record.to_dict() for record in sorted(self.records, key=lambda record: record.order)],
+        }
+
+    def write_json(self, path, **metadata):
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(self.report(**metadata), output, ensure_ascii=False, indent=2)
+
+    def print_report(self):
+        """Tabela etapów: czas, udział w całości, przepustowość i pamięć."""
+        total = time.perf_counter() - self._started
+        print(f"\n{'etap':<32} {'czas [s]':>10} {'%':>6} {'zdarzenia/s':>13} {'RSS [MB]':>9} {'+RSS [MB]':>10}")
+        for entry in self.report()['stages']:
+            rate = f"{entry['events_per_second']:,.0f}" if 'events_per_second' in entry else '-'
+            share = 100 * entry['seconds'] / total if total else 0.0
+            print(f"{'  ' * entry['depth'] + entry['stage'].rsplit('/', 1)[-1]:<32} {entry['seconds']:>10.3f} {share:>6.1f} "
+                  f"{rate:>13} {entry['peak_rss_mb']:>9.1f} {entry['rss_growth_mb']:>10.1f}")
+        print(f"{'razem':<32} {total:>10.3f}")
+
+
+def stage(profiler, name, events=None):
+    """`profiler.stage(...)` lub pusty kontekst, gdy profiler jest None."""
+    if profiler is None:
+        return nullcontext(StageRecord(name, 0))
+    return profiler.stage(name, events)
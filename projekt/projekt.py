@@ -1,103 +1,190 @@
+import argparse
 import graphviz
-from opyenxes.data_in.XUniversalParser import XUniversalParser
 from collections import defaultdict
 from functools import reduce
 
+from alpha import discover_alpha_net, observed_start_end
+from cache import LogCache
+from conformance import print_conformance_report, token_replay
+from dfg import two_loop_matrix
+from export import (
+    EXPORT_FORMATS, MAX_GRAPH_EDGES, MAX_GRAPH_NODES, RENDER_MODES, export_bpmn_json, export_bpmn_xml, export_heuristic_json,
+    export_petri_net_json, export_pnml, limit_heuristic_view, render_graph, wait_for_renders,
+)
+from footprint import Footprint
+from heuristics import (
+    AND_THRESHOLD, LOOP_THRESHOLD, POSITIVE_OBSERVATIONS, RELATIVE_TO_BEST, mine_heuristics_net,
+)
+from parallel import build_encoded_log, count_parallel, encode_views, encode_views_parallel, mine_xes_parallel
+from profiling import StageProfiler, stage
+from social import (
+    HANDOVER, RESOURCE_CLASSIFIER, WORKING_TOGETHER, generate_social_graph, handover_of_work, working_together,
+)
+from performance import PerformanceStats, STATISTICS, format_duration, mine_performance, print_performance_report
+from variants import print_variant_report
+from xes_stream import (
+    DEFAULT_ACTIVITY_KEYS, as_classifier, iter_traces, read_classifiers,
+    read_workflow_log_opyenxes,
+)
+
 # --- Konfiguracja ---
 LOG_FILE_PATH = 'repairexample.xes' # Ścieżka do pliku XES
 OUTPUT_HEURISTIC_BASE = 'heuristic_net'
 OUTPUT_BPMN_BASE = 'alpha_bpmn_graph'
+OUTPUT_SOCIAL_BASE = 'social_network'
 
 # Progi filtrowania dla Heuristic Miner
 ACTIVITY_FREQUENCY_THRESHOLD = 0  # Minimalna liczba wystąpień aktywności, aby ją pokazać (0 = pokaż wszystkie)
 TRANSITION_FREQUENCY_THRESHOLD = 0 # Minimalna liczba wystąpień przejścia, aby je pokazać (0 = pokaż wszystkie)
+DEPENDENCY_THRESHOLD = None # Próg miary zależności a => b (None = rysuj surowe częstotliwości bez przycinania)
+PERFORMANCE_STATISTIC = None # 'mean', 'median' lub 'p95' = graf wydajnościowy (czasy zamiast częstotliwości)
+
+# Renderowanie PNG: 'sync', 'background' (w tle, potok działa dalej) lub 'none' (tylko plik .gv)
+RENDER_MODE = 'background'
+# Dodatkowe formaty zapisu modelu bez układu Graphviz: 'json', 'pnml', 'bpmn'
+EXPORT = ()
+# Limity rozmiaru grafu heurystycznego (0 = bez limitu)
+MAX_NODES = MAX_GRAPH_NODES
+MAX_EDGES = MAX_GRAPH_EDGES
 
 # Wybór trybu: 'heuristic' lub 'alpha'
 MINER_TYPE = 'heuristic'
 # MINER_TYPE = 'alpha'
 
-# --- 1. Wczytywanie i Parsowanie Logu XES ---
-try:
-    with open(LOG_FILE_PATH) as log_file:
-        log = XUniversalParser().parse(log_file)[0]
-except FileNotFoundError:
-    print(f"Błąd: Plik logu '{LOG_FILE_PATH}' nie został znaleziony.")
-    exit()
-except Exception as e:
-    print(f"Błąd podczas parsowania pliku XES: {e}")
-    exit()
-
-print(f"Log '{LOG_FILE_PATH}' wczytany pomyślnie.")
-
-# --- 2. Ekstrakcja Śladów Przepływu Pracy (Nazwy Aktywności) ---
-workflow_log = []
-for trace in log:
-    workflow_trace = []
-    for event in trace:
-        try:
-        
-            attributes = event.get_attributes()
-            if 'Activity' in attributes:
-                 event_name = attributes['Activity'].get_value()
-                 workflow_trace.append(event_name)
-            elif 'concept:name' in attributes:
-                 event_name = attributes['concept:name'].get_value()
-                 workflow_trace.append(event_name)
-
-        except Exception as e:
-            print(f"Ostrzeżenie: Problem z odczytem atrybutu zdarzenia w śladzie {log.index(trace)}: {e}")
-
-    if workflow_trace: # Dodajemy tylko niepuste ślady
-        workflow_log.append(workflow_trace)
-
-if not workflow_log:
-    print("Błąd: Nie udało się wyekstrahować żadnych śladów przepływu pracy z logu. Sprawdź strukturę pliku XES i nazwy atrybutów.")
-    exit()
-
-print(f"Wyekstrahowano {len(workflow_log)} śladów.")
-
-# --- 3. Obliczanie Częstotliwości Aktywności i Przejść ---
-activity_counter = defaultdict(int)
-transition_counter = defaultdict(int)
-direct_succession_rel = defaultdict(set) # Dla relacji > (bezpośredniego następstwa)
-
-for w_trace in workflow_log:
-    if not w_trace: continue # Pomiń puste ślady
-
-    # Zliczanie aktywności
-    for activity in w_trace:
-        activity_counter[activity] += 1
-
-    # Zliczanie przejść i budowanie relacji bezpośredniego następstwa
-    for i in range(len(w_trace) - 1):
-        source_activity = w_trace[i]
-        target_activity = w_trace[i+1]
-        transition = (source_activity, target_activity)
-        transition_counter[transition] += 1
-        direct_succession_rel[source_activity].add(target_activity)
-
-all_activities = set(activity_counter.keys())
-if not all_activities:
-    print("Błąd: Nie znaleziono żadnych aktywności w logu.")
-    exit()
-
-print(f"Znaleziono {len(all_activities)} unikalnych aktywności.")
-# --- Implementacja Heuristic Miner ---
+# Parser XES: 'stream' (iterparse, ślad po śladzie) lub 'opyenxes' (pełny model obiektowy)
+XES_PARSER = 'stream'
+
+# Liczba procesów do wczytywania i zliczania logu (1 = sekwencyjnie)
+WORKERS = 1
+
+# Klasyfikator zdarzeń z nagłówka XES (np. 'Event Name', 'MXML Legacy Classifier', 'Resource');
+# None = pierwszy znaleziony klucz z DEFAULT_ACTIVITY_KEYS
+CLASSIFIER = None
+
+# Sieci zasobów (org:resource): None, 'handover', 'together' lub 'both'
+SOCIAL_NETWORK = None
+
+# Deduplikacja śladów do wariantów z krotnościami (wszystkie zliczenia uwzględniają wagi)
+VARIANTS = True
+
+# Pamięć podręczna wczytanych logów (None = wyłączona) i jej maksymalny rozmiar
+CACHE_DIR = '.mining_cache'
+CACHE_MAX_MB = 1024
+
+# --- 1-3. Wczytywanie Logu XES, Ekstrakcja Śladów i Zliczanie Aktywności oraz Przejść ---
+def load_workflow_log(log_file_path, xes_parser=XES_PARSER, workers=WORKERS, cache=None, variants=VARIANTS,
+                      classifier=None, profiler=None, with_performance=False):
+    """Wczytuje log do EncodedLog i zlicza przejścia: (workflow_log, directly_follows[, performance])."""
+    classifier = as_classifier(classifier or DEFAULT_ACTIVITY_KEYS)
+    cache_key = classifier.cache_key + ('|variants' if variants else '') + ('|performance' if with_performance else '')
+    if cache is not None:
+        with stage(profiler, 'cache_load'):
+            cached = cache.load(log_file_path, cache_key)
+            performance_state = cache.load_extra(log_file_path, cache_key) if with_performance else None
+        if cached is not None and (not with_performance or performance_state is not None):
+            print(f"Log wczytany z pamięci podręcznej '{cache.cache_dir}'.")
+            if with_performance:
+                return cached + (PerformanceStats.from_dict(performance_state),)
+            return cached
+
+    if with_performance:
+        if xes_parser != 'stream':
+            print(f"Ostrzeżenie: czasy wydajności czytane są parserem strumieniowym (zamiast '{xes_parser}').")
+        with stage(profiler, 'parse_count') as record:
+            workflow_log, directly_follows, performance = mine_performance(log_file_path, classifier, variants, workers)
+            record.events = workflow_log.total_events
+        if cache is not None:
+            with stage(profiler, 'cache_store'):
+                cache.store(log_file_path, cache_key, workflow_log, directly_follows, extra=performance.to_dict())
+        return workflow_log, directly_follows, performance
+
+    # Ślady trafiają od razu do zakodowanego logu (puste są pomijane)
+    if xes_parser == 'stream' and workers > 1:
+        with stage(profiler, 'parse_count') as record:
+            workflow_log, directly_follows = mine_xes_parallel(log_file_path, workers, classifier, variants=variants)
+            record.events = workflow_log.total_events
+    else:
+        with stage(profiler, 'parse') as record:
+            if xes_parser == 'stream':
+                workflow_log = build_encoded_log(iter_traces(log_file_path, classifier), variants)
+            else:
+                workflow_log = build_encoded_log(read_workflow_log_opyenxes(log_file_path, classifier), variants)
+            record.events = workflow_log.total_events
+        with stage(profiler, 'count', workflow_log.total_events):
+            directly_follows = count_parallel(workflow_log, workers)
+
+    if cache is not None:
+        with stage(profiler, 'cache_store'):
+            cache.store(log_file_path, cache_key, workflow_log, directly_follows)
+    return workflow_log, directly_follows
+
+
+def load_encoded_views(log_file_path, classifiers, xes_parser=XES_PARSER, workers=WORKERS, cache=None,
+                       variants=VARIANTS, profiler=None):
+    """Wczytuje log raz i zwraca osobny EncodedLog (bez grafu następstw) dla każdego klasyfikatora."""
+    classifiers = [as_classifier(classifier) for classifier in classifiers]
+    cache_keys = [classifier.cache_key + ('|variants' if variants else '') + '|log' for classifier in classifiers]
+    if cache is not None:
+        with stage(profiler, 'cache_load'):
+            cached = [cache.load(log_file_path, cache_key) for cache_key in cache_keys]
+        if all(entry is not None for entry in cached):
+            print(f"Log wczytany z pamięci podręcznej '{cache.cache_dir}'.")
+            return [encoded_log for encoded_log, _ in cached]
+
+    with stage(profiler, 'parse') as record:
+        if xes_parser == 'stream' and workers > 1:
+            logs = encode_views_parallel(log_file_path, workers, classifiers, variants)
+        elif xes_parser == 'stream':
+            logs = encode_views(log_file_path, classifiers, variants)
+        else:
+            logs = [build_encoded_log(read_workflow_log_opyenxes(log_file_path, classifier), variants)
+                    for classifier in classifiers]
+        record.events = logs[0].total_events
+
+    if cache is not None:
+        with stage(profiler, 'cache_store'):
+            for cache_key, encoded_log in zip(cache_keys, logs):
+                cache.store(log_file_path, cache_key, encoded_log, None)
+    return logs
+
+
+def resolve_classifier(log_file_path, name):
+    """Klasyfikator o podanej nazwie z nagłówka logu (None dla name=None)."""
+    if name is None:
+        return None
+    classifiers = read_classifiers(log_file_path)
+    if name not in classifiers:
+        available = ', '.join(f"'{known}'" for known in classifiers) or 'brak'
+        raise KeyError(f"Log nie deklaruje klasyfikatora '{name}' (dostępne: {available}).")
+    return classifiers[name]
 
-def generate_heuristic_graph(activity_counts, transition_counts, direct_succession, act_threshold, trans_threshold, filename_base):
-    """Generuje graf heurystyczny z filtrowaniem i wizualizacją częstotliwości."""
 
-    # Filtrowanie aktywności
-    filtered_activities = {act for act, count in activity_counts.items() if count >= act_threshold}
-    if not filtered_activities:
-        print(f"Ostrzeżenie: Żadne aktywności nie spełniają progu częstotliwości {act_threshold}. Graf będzie pusty.")
-        return None
+# --- Implementacja Heuristic Miner ---
 
-    # Filtrowanie przejść
+def filter_heuristic_view(activity_counts, transition_counts, act_threshold, trans_threshold):
+    """Zwraca (filtered_activities, filtered_transitions) dla podanych progów."""
+    filtered_activities = {act for act, count in activity_counts.items() if count >= act_threshold}
     filtered_transitions = {trans: count for trans, count in transition_counts.items()
                             if count >= trans_threshold and
                             trans[0] in filtered_activities and
                             trans[1] in filtered_activities}
+    return filtered_activities, filtered_transitions
+
+
+def generate_heuristic_graph(activity_counts, transition_counts, direct_succession, act_threshold, trans_threshold, filename_base, filtered_view=None, performance=None, statistic='mean',
+                             render=RENDER_MODE, exports=EXPORT, max_nodes=MAX_NODES, max_edges=MAX_EDGES, profiler=None):
+    """Generuje graf heurystyczny z filtrowaniem i wizualizacją częstotliwości (lub czasów z `performance`)."""
+
+    # Filtrowanie aktywności i przejść
+    if filtered_view is None:
+        filtered_view = filter_heuristic_view(activity_counts, transition_counts, act_threshold, trans_threshold)
+    filtered_activities, filtered_transitions = filtered_view
+    activity_counts, filtered_activities, filtered_transitions = limit_heuristic_view(
+        activity_counts, filtered_activities, filtered_transitions, max_nodes, max_edges)
+
+    if not filtered_activities:
+        print(f"Ostrzeżenie: Żadne aktywności nie spełniają progu częstotliwości {act_threshold}. Graf będzie pusty.")
+        return None
 
     if not filtered_transitions and len(filtered_activities) > 1 : # Jeśli są aktywności, ale nie ma przejść
          print(f"Ostrzeżenie: Żadne przejścia nie spełniają progu częstotliwości {trans_threshold} (lub łączą odfiltrowane aktywności).")
@@ -110,16 +197,25 @@ def generate_heuristic_graph(activity_counts, transition_counts, direct_successi
     G.node_attr['style'] = 'rounded,filled'
     G.node_attr['fillcolor'] = '#FFFFCC' # Jasnożółty dla aktywności
 
+    # Wartości skalujące kolory i grubości linii: częstotliwości albo czasy trwania
+    if performance is None:
+        node_values, edge_values = activity_counts, filtered_transitions
+    else:
+        service_times = performance.service_statistic(statistic)
+        waiting_times = performance.edge_statistic(statistic)
+        node_values = {act: service_times[act] for act in filtered_activities if act in service_times}
+        edge_values = {trans: waiting_times[trans] for trans in filtered_transitions if trans in waiting_times}
+
     # Obliczanie min/max dla kolorów i grubości linii
-    if activity_counts:
-        min_act_freq = min(activity_counts.values()) if activity_counts else 1
-        max_act_freq = max(activity_counts.values()) if activity_counts else 1
+    if node_values:
+        min_act_freq = min(node_values.values()) if node_values else 1
+        max_act_freq = max(node_values.values()) if node_values else 1
     else:
          min_act_freq, max_act_freq = 1, 1
 
-    if filtered_transitions:
-        min_trans_freq = min(filtered_transitions.values()) if filtered_transitions else 1
-        max_trans_freq = max(filtered_transitions.values()) if filtered_transitions else 1
+    if edge_values:
+        min_trans_freq = min(edge_values.values()) if edge_values else 1
+        max_trans_freq = max(edge_values.values()) if edge_values else 1
     else:
         min_trans_freq, max_trans_freq = 1, 1
 
@@ -127,6 +223,9 @@ def generate_heuristic_graph(activity_counts, transition_counts, direct_successi
     for activity in filtered_activities:
         count = activity_counts[activity]
         label = f"{activity}\n({count})" # Etykieta z nazwą i częstotliwością
+        if performance is not None:
+            label += f"\n{statistic}: {format_duration(node_values.get(activity))}"
+        value = node_values.get(activity, min_act_freq)
 
         # Skalowanie koloru na podstawie częstotliwości (od jasnego do ciemniejszego pomarańczowego)
         # Normalizacja do zakresu [0, 99] dla wartości szesnastkowej koloru
@@ -134,7 +233,7 @@ def generate_heuristic_graph(activity_counts, transition_counts, direct_successi
         if max_act_freq > min_act_freq:
              # Normalizujemy do 0-1, a potem mnożymy przez 99
              # Odwracamy, aby większa częstotliwość = ciemniejszy kolor (mniejsza wartość hex)
-             normalized_freq = (count - min_act_freq) / (max_act_freq - min_act_freq)
+             normalized_freq = (value - min_act_freq) / (max_act_freq - min_act_freq)
              color_intensity = 99 - int(normalized_freq * 99) # Wartość od 0 (ciemny) do 99 (jasny)
         else: # Jeśli wszystkie mają tę samą częstotliwość
              color_intensity = 50 # Średni kolor
@@ -147,16 +246,22 @@ def generate_heuristic_graph(activity_counts, transition_counts, direct_successi
 
     # Dodawanie krawędzi (przefiltrowanych przejść)
     for (source, target), count in filtered_transitions.items():
+        label = str(count)
+        value = count
+        if performance is not None:
+            label = f"{format_duration(edge_values.get((source, target)))} ({count})"
+            value = edge_values.get((source, target), 0)
+
         # Skalowanie grubości linii (np. od 1 do 6)
         penwidth = 1.0
         if max_trans_freq > min_trans_freq:
             # Liniowe skalowanie:
-             normalized_penwidth = (count - min_trans_freq) / (max_trans_freq - min_trans_freq)
+             normalized_penwidth = max(value - min_trans_freq, 0) / (max_trans_freq - min_trans_freq)
              penwidth = 1 + normalized_penwidth * 5 # Skala 1 do 6
-        elif count > 0: # Jeśli wszystkie przejścia mają tę samą częstotliwość > 0
+        elif value > 0: # Jeśli wszystkie przejścia mają tę samą częstotliwość > 0
             penwidth = 2.0 # Ustawiamy średnią grubość
 
-        G.edge(source, target, label=str(count), penwidth=str(penwidth))
+        G.edge(source, target, label=label, penwidth=str(penwidth))
 
     # Identyfikacja i dodawanie zdarzeń startowych i końcowych (heurystycznie)
     # Aktywności, które są źródłami w przefiltrowanych przejściach
@@ -187,84 +292,45 @@ def generate_heuristic_graph(activity_counts, transition_counts, direct_successi
 
 
     # Zapis i renderowanie
-    try:
-        output_filename_dot = f"{filename_base}_filtered_act{act_threshold}_trans{trans_threshold}.gv"
-        output_filename_png = f"{filename_base}_filtered_act{act_threshold}_trans{trans_threshold}.png"
-        G.render(output_filename_dot, view=False, format='png', outfile=output_filename_png) # Zapisuje .gv i .png
-        print(f"Graf heurystyczny zapisany jako '{output_filename_png}' i '{output_filename_dot}'")
-        return G # Zwracamy obiekt grafu
-    except Exception as e:
-        print(f"Błąd podczas renderowania grafu Graphviz: {e}")
-        print("Upewnij się, że Graphviz jest zainstalowany i dostępny w ścieżce systemowej (PATH).")
-        return None
-
-
-# --- Implementacja Algorytmu Alpha (Uproszczonego) ---
-
-def calculate_alpha_relations(workflow_log, all_activities):
-    """Oblicza relacje Alpha: >, ->, ||, # oraz zbiory start/end."""
-    direct_succession = defaultdict(set)  # x > y
-    footprint_matrix = defaultdict(lambda: defaultdict(str)) # Przechowuje relacje ->, ||, #
-
-    # 1. Oblicz bezpośrednie następstwo (>)
-    for trace in workflow_log:
-        for i in range(len(trace) - 1):
-            direct_succession[trace[i]].add(trace[i+1])
-
-    # 2. Oblicz relacje ->, ||, # (Footprint Matrix)
-    causality = defaultdict(set) 
-    parallel = set()           
-
-    activities_list = sorted(list(all_activities)) # Dla deterministycznej kolejności
-    for act_a in activities_list:
-        for act_b in activities_list:
-            a_follows_b = act_b in direct_succession.get(act_a, set())
-            b_follows_a = act_a in direct_succession.get(act_b, set())
-
-            if a_follows_b and not b_follows_a:
-                footprint_matrix[act_a][act_b] = "->"
-                causality[act_a].add(act_b)
-            elif not a_follows_b and b_follows_a:
-                footprint_matrix[act_a][act_b] = "<-"
-                # Nie potrzebujemy <- explicite dla dalszych kroków, ale causality wystarczy
-            elif a_follows_b and b_follows_a:
-                footprint_matrix[act_a][act_b] = "||"
-               
-                if (act_a, act_b) not in parallel and (act_b, act_a) not in parallel:
-                     parallel.add((act_a, act_b))
-                     parallel.add((act_b, act_a)) # Jak w przykładzie
-            else: 
-                footprint_matrix[act_a][act_b] = "#"
-
-    # 3. Oblicz zbiory Start (T_start) i End (T_end)
-    start_events = set()
-    end_events = set()
-    if workflow_log:
-        start_events = {trace[0] for trace in workflow_log if trace}
-        end_events = {trace[-1] for trace in workflow_log if trace}
-
+    output_base = f"{filename_base}_filtered_act{act_threshold}_trans{trans_threshold}"
+    if 'json' in exports:
+        with stage(profiler, 'export'):
+            export_heuristic_json(f"{output_base}.json", activity_counts, filtered_activities, filtered_transitions,
+                                  performance, statistic)
+    return render_graph(G, output_base, "Graf heurystyczny", render, profiler) # Zwracamy obiekt grafu
+
+
+# --- Implementacja Algorytmu Alpha ---
+
+def calculate_alpha_relations(workflow_log, all_activities, direct_succession=None, footprint=None):
+    """Oblicza relacje Alpha: >, ->, ||, # oraz zbiory start/end.
+
+    Jeśli relacja > została już policzona (np. równolegle, razem z
+    licznościami przejść), można ją przekazać w `direct_succession`, a gotowy
+    Footprint (np. z DirectlyFollowsCounts) - w `footprint`.
+    """
+    if footprint is None:
+        # 1. Oblicz bezpośrednie następstwo (>)
+        if direct_succession is None:
+            direct_succession = defaultdict(set)  # x > y
+            for trace in workflow_log:
+                for i in range(len(trace) - 1):
+                    direct_succession[trace[i]].add(trace[i+1])
+
+        # 2. Oblicz relacje ->, ||, # (Footprint Matrix) operacjami na macierzach logicznych
+        footprint = Footprint.from_relation(direct_succession, all_activities)
+
+    causality = footprint.causality_dict()
+    parallel = footprint.parallel_pairs()
+
+    # 3. Zbiory Start (T_start) i End (T_end) - redukcje po kolumnach/wierszach macierzy
     # T_start = {a in all_activities | not exists b such that b -> a or b || a}
     # T_end = {a in all_activities | not exists b such that a -> b or a || b}
-    formal_start_events = all_activities.copy()
-    formal_end_events = all_activities.copy()
-    for act_a in all_activities:
-        for act_b in all_activities:
-             if act_a == act_b: continue
-             # Czy coś prowadzi do act_a?
-             if footprint_matrix[act_b][act_a] in ["->", "||"]:
-                 formal_start_events.discard(act_a)
-             # Czy act_a prowadzi do czegoś?
-             if footprint_matrix[act_a][act_b] in ["->", "||"]:
-                 formal_end_events.discard(act_a)
-
-    start_set_events = formal_start_events
-    end_set_events = formal_end_events
-
-    # 4. Oblicz odwróconą przyczynowość (pomocnicze dla bramek scalających)
-    inv_causality = defaultdict(set)
-    for source, targets in causality.items():
-        for target in targets:
-            inv_causality[target].add(source)
+    start_set_events = footprint.start_activities
+    end_set_events = footprint.end_activities
+
+    # 4. Odwrócona przyczynowość (pomocnicze dla bramek scalających)
+    inv_causality = footprint.causality_dict(transpose=True)
 
     print("Relacje Alpha obliczone.")
 
@@ -281,6 +347,8 @@ class MyGraph(graphviz.Digraph):
         self.graph_attr['nodesep'] = '0.6' 
         self.edge_attr.update(penwidth='1.5') 
         self._gateway_count = 0 # Licznik do tworzenia unikalnych nazw bramek
+        self.bpmn_nodes = {}    # Nazwa węzła -> typ elementu BPMN (do eksportu BPMN XML)
+        self.bpmn_flows = []    # Przepływy (źródło, cel)
 
     def _unique_gateway_name(self, prefix, hint=""):
         self._gateway_count += 1
@@ -289,6 +357,7 @@ class MyGraph(graphviz.Digraph):
     def add_activity(self, name, **kwargs):
          merged_attrs = {'shape': 'box', 'style': 'rounded,filled', 'fillcolor': '#FFFFCC'}
          merged_attrs.update(kwargs)
+         self.bpmn_nodes[name] = 'task'
          super(MyGraph, self).node(name, **merged_attrs)
 
 
@@ -300,6 +369,7 @@ class MyGraph(graphviz.Digraph):
         elif 'end' in name.lower():
              merged_attrs.update({'shape': 'doublecircle', 'fillcolor': '#FFB6C1', 'style': 'filled'}) # Różowy/Czerwony koniec
         merged_attrs.update(kwargs)
+        self.bpmn_nodes[name] = 'endEvent' if 'end' in name.lower() else 'startEvent'
         super(MyGraph, self).node(name, **merged_attrs)
 
     def add_gateway(self, name, label, **kwargs):
@@ -314,8 +384,13 @@ class MyGraph(graphviz.Digraph):
              'fillcolor': '#E0E0E0' 
              }
          merged_attrs.update(kwargs)
+         self.bpmn_nodes[name] = 'parallelGateway' if label == '+' else 'exclusiveGateway'
          super(MyGraph, self).node(name, **merged_attrs)
 
+    def edge(self, tail_name, head_name, *args, **kwargs):
+        self.bpmn_flows.append((tail_name, head_name))
+        super(MyGraph, self).edge(tail_name, head_name, *args, **kwargs)
+
     def add_and_gateway(self, name, **kwargs):
         self.add_gateway(name, '+', **kwargs)
 
@@ -339,9 +414,9 @@ class MyGraph(graphviz.Digraph):
         else: # XOR or AUTO and not parallel
             self.add_xor_gateway(gateway_name, *args)
 
-        super(MyGraph, self).edge(source, gateway_name)
+        self.edge(source, gateway_name)
         for target in targets:
-            super(MyGraph, self).edge(gateway_name, target)
+            self.edge(gateway_name, target)
         return gateway_name # Zwracamy nazwę utworzonej bramki
 
     def add_merge_gateway(self, sources, target, gateway_type, parallel_rel, *args):
@@ -359,15 +434,68 @@ class MyGraph(graphviz.Digraph):
         else: # XOR or AUTO and not parallel
             self.add_xor_gateway(gateway_name, *args)
 
-        super(MyGraph, self).edge(gateway_name, target)
+        self.edge(gateway_name, target)
         for source in sources:
-            super(MyGraph, self).edge(source, gateway_name)
+            self.edge(source, gateway_name)
         return gateway_name
 
+    def add_petri_net(self, petri_net):
+        """Rysuje sieć Petriego (alpha.PetriNet) w notacji BPMN.
+
+        Miejsca z wieloma wejściami lub wyjściami stają się bramkami XOR,
+        aktywności z wieloma miejscami wejściowymi/wyjściowymi - bramkami AND.
+        Miejsca początkowe i końcowe sieci to zdarzenia start/end.
+        """
+        entry_nodes, exit_nodes = {}, {}
+        for activity in petri_net.transitions:
+            self.add_activity(activity)
+            entry_nodes[activity] = exit_nodes[activity] = activity
+            if len(petri_net.input_places(activity)) > 1:
+                gateway_name = self._unique_gateway_name("ANDm", activity)
+                self.add_and_gateway(gateway_name)
+                self.edge(gateway_name, activity)
+                entry_nodes[activity] = gateway_name
+            if len(petri_net.output_places(activity)) > 1:
+                gateway_name = self._unique_gateway_name("ANDs", activity)
+                self.add_and_gateway(gateway_name)
+                self.edge(activity, gateway_name)
+                exit_nodes[activity] = gateway_name
+
+        for place, (inputs, outputs) in petri_net.places.items():
+            sources = [exit_nodes[activity] for activity in sorted(inputs)]
+            targets = [entry_nodes[activity] for activity in sorted(outputs)]
+            if place == petri_net.initial_place:
+                self.add_event("start")
+                sources = ["start"]
+            if place == petri_net.final_place:
+                self.add_event("end")
+                targets = ["end"]
+            if not sources or not targets:
+                continue
+
+            if len(sources) == 1 and len(targets) == 1:
+                self.edge(sources[0], targets[0])
+                continue
+            gateway_name = self._unique_gateway_name("XOR", place)
+            self.add_xor_gateway(gateway_name)
+            for source in sources:
+                self.edge(source, gateway_name)
+            for target in targets:
+                self.edge(gateway_name, target)
 
-def generate_bpmn_graph(causality, parallel, start_events, end_events, inv_causality, all_activities, filename_base):
-    """Generuje graf BPMN na podstawie relacji Alpha."""
+
+def generate_bpmn_graph(causality, parallel, start_events, end_events, inv_causality, all_activities, filename_base, petri_net=None,
+                        render=RENDER_MODE, exports=EXPORT, profiler=None):
+    """Generuje graf BPMN na podstawie relacji Alpha.
+
+    Jeśli podano `petri_net` (wynik alpha.discover_alpha_net), graf budowany
+    jest z odkrytych miejsc Alpha zamiast z heurystycznych bramek opartych na
+    parach relacji ||.
+    """
     G = MyGraph(comment='Alpha Miner BPMN')
+    if petri_net is not None:
+        G.add_petri_net(petri_net)
+        return render_bpmn_graph(G, filename_base, render, exports, petri_net, profiler)
 
     processed_sources_for_split = set()
     processed_targets_for_merge = set()
@@ -417,54 +545,288 @@ def generate_bpmn_graph(causality, parallel, start_events, end_events, inv_causa
         G.add_merge_gateway(end_events, "end", "AUTO", parallel)
     elif len(end_events) == 1:
         G.edge(list(end_events)[0], "end")
-    
 
-    # Zapis i renderowanie
+    return render_bpmn_graph(G, filename_base, render, exports, profiler=profiler)
+
+
+def render_bpmn_graph(G, filename_base, render=RENDER_MODE, exports=EXPORT, petri_net=None, profiler=None):
+    """Zapisuje graf BPMN do .gv (i wybranych formatów) oraz renderuje go do .png."""
+    if exports:
+        with stage(profiler, 'export'):
+            if 'json' in exports:
+                if petri_net is not None:
+                    export_petri_net_json(f"{filename_base}.json", petri_net)
+                else:
+                    export_bpmn_json(f"{filename_base}.json", G.bpmn_nodes, G.bpmn_flows)
+            if 'pnml' in exports:
+                if petri_net is not None:
+                    export_pnml(f"{filename_base}.pnml", petri_net)
+                else:
+                    print("Ostrzeżenie: Eksport PNML wymaga sieci Petriego (tryb bez --alpha-simple). Pomijanie.")
+            if 'bpmn' in exports:
+                export_bpmn_xml(f"{filename_base}.bpmn", G.bpmn_nodes, G.bpmn_flows)
+    return render_graph(G, filename_base, "Graf BPMN (Alpha)", render, profiler)
+
+# --- Główna Logika Skryptu ---
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Odkrywanie modeli procesów (Heuristic Miner / Alpha) z logu XES.")
+    parser.add_argument('--log', default=LOG_FILE_PATH, help="Ścieżka do pliku XES")
+    parser.add_argument('--miner', choices=['heuristic', 'alpha'], default=MINER_TYPE, help="Typ minera")
+    parser.add_argument('--act-threshold', type=int, default=ACTIVITY_FREQUENCY_THRESHOLD,
+                        help="Minimalna liczba wystąpień aktywności (Heuristic Miner)")
+    parser.add_argument('--trans-threshold', type=int, default=TRANSITION_FREQUENCY_THRESHOLD,
+                        help="Minimalna liczba wystąpień przejścia (Heuristic Miner)")
+    parser.add_argument('--dependency-threshold', type=float, default=DEPENDENCY_THRESHOLD,
+                        help="Próg miary zależności Heuristics Miner (włącza przycinanie krawędzi)")
+    parser.add_argument('--positive-observations', type=int, default=POSITIVE_OBSERVATIONS,
+                        help="Minimalna liczba obserwacji |a > b| dla krawędzi")
+    parser.add_argument('--relative-to-best', type=float, default=RELATIVE_TO_BEST,
+                        help="Maksymalna różnica miary zależności krawędzi względem najlepszej krawędzi aktywności")
+    parser.add_argument('--loop-threshold', type=float, default=LOOP_THRESHOLD,
+                        help="Próg miar pętli długości jeden i dwa")
+    parser.add_argument('--and-threshold', type=float, default=AND_THRESHOLD,
+                        help="Próg miary AND/XOR dla rozgałęzień")
+    parser.add_argument('--performance', choices=STATISTICS, default=PERFORMANCE_STATISTIC,
+                        help="Heuristic Miner: koloruj węzły i krawędzie czasami obsługi/oczekiwania zamiast częstotliwości "
+                             "(czasy czytane w tym samym przebiegu parserem strumieniowym, szkice w pamięci podręcznej)")
+    parser.add_argument('--alpha-simple', action='store_true',
+                        help="Alpha: bramki zgadywane z relacji || zamiast odkrywania miejsc (A, B)")
+    parser.add_argument('--conformance', action='store_true',
+                        help="Alpha: oceń dopasowanie i precyzję sieci przez odtwarzanie tokenów")
+    parser.add_argument('--no-variants', action='store_true',
+                        help="Nie scalaj powtarzających się śladów w warianty (domyślnie wariant przechowywany raz z krotnością)")
+    parser.add_argument('--variants-report', type=int, default=0, metavar='N',
+                        help="Wypisz N najczęstszych wariantów śladów")
+    parser.add_argument('--social', choices=[HANDOVER, WORKING_TOGETHER, 'both'], default=SOCIAL_NETWORK,
+                        help="Dodatkowo wyznacz sieć przekazań pracy i/lub współpracy zasobów (org:resource, "
+                             "widok zasobów z tego samego przebiegu po pliku)")
+    parser.add_argument('--social-min-count', type=int, default=1,
+                        help="Minimalna liczność relacji między zasobami na grafie")
+    parser.add_argument('--render', choices=RENDER_MODES, default=RENDER_MODE,
+                        help="Renderowanie PNG: synchronicznie, w tle lub wcale (zapis tylko pliku .gv)")
+    parser.add_argument('--export', nargs='*', choices=EXPORT_FORMATS, default=list(EXPORT),
+                        help="Dodatkowe formaty zapisu modelu (bez układu Graphviz)")
+    parser.add_argument('--max-nodes', type=int, default=MAX_NODES,
+                        help="Maksymalna liczba węzłów grafu heurystycznego (rzadsze są zwijane; 0 = bez limitu)")
+    parser.add_argument('--max-edges', type=int, default=MAX_EDGES,
+                        help="Maksymalna liczba krawędzi grafu heurystycznego (0 = bez limitu)")
+    parser.add_argument('--classifier', default=CLASSIFIER,
+                        help="Nazwa klasyfikatora zdarzeń z nagłówka logu (domyślnie klucze Activity/concept:name)")
+    parser.add_argument('--list-classifiers', action='store_true', help="Wypisz klasyfikatory zadeklarowane w logu i zakończ")
+    parser.add_argument('--parser', choices=['stream', 'opyenxes'], default=XES_PARSER, help="Parser XES")
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help="Liczba procesów do parsowania i zliczania (plik XES dzielony na zakresy bajtów; 1 = sekwencyjnie)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="Katalog pamięci podręcznej wczytanych logów")
+    parser.add_argument('--cache-max-mb', type=int, default=CACHE_MAX_MB,
+                        help="Maksymalny rozmiar pamięci podręcznej w MB (najdawniej używane wpisy są usuwane)")
+    parser.add_argument('--no-cache', action='store_true', help="Nie używaj pamięci podręcznej")
+    parser.add_argument('--clear-cache', action='store_true',
+                        help="Usuń wpisy pamięci podręcznej dla podanego logu przed wczytaniem")
+    parser.add_argument('--profile', action='store_true',
+                        help="Wypisz czas, pamięć i przepustowość etapów potoku (load, dfg_dicts, heuristics/alpha, "
+                             "conformance, graph, social, render_wait)")
+    parser.add_argument('--profile-json', metavar='PLIK',
+                        help="Zapisz pomiary etapów potoku jako JSON")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="Mierz szczyt pamięci Pythona/NumPy w etapach (tracemalloc, spowalnia potok)")
+    return parser.parse_args()
+
+
+def run_pipeline(args, profiler=None):
+    """Potok odkrywania dla argumentów z parse_args, z pomiarem etapów w `profiler`."""
+    cache = None
+    if args.cache_dir and not args.no_cache:
+        cache = LogCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+        if args.clear_cache:
+            cache.invalidate(args.log)
+
+    performance = None
+    resource_log = None
     try:
-        output_filename_dot = f"{filename_base}.gv"
-        output_filename_png = f"{filename_base}.png"
-        G.render(output_filename_dot, view=False, format='png', outfile=output_filename_png) # Zapisuje .gv i .png
-        print(f"Graf BPMN (Alpha) zapisany jako '{output_filename_png}' i '{output_filename_dot}'")
-        return G
+        if args.list_classifiers:
+            for classifier in read_classifiers(args.log).values():
+                print(f"{classifier.name}: {' '.join(classifier.keys)}")
+            return
+        classifier = resolve_classifier(args.log, args.classifier)
+        with stage(profiler, 'load') as record:
+            if args.performance and args.miner == 'heuristic':
+                # Znaczniki czasu i lifecycle:transition wczytywane razem z licznościami
+                workflow_log, directly_follows, performance = load_workflow_log(
+                    args.log, args.parser, args.workers, cache, variants=not args.no_variants,
+                    classifier=classifier, profiler=profiler, with_performance=True)
+            elif args.social:
+                # Widok przepływu sterowania i widok zasobów z jednego przebiegu po pliku
+                resource_classifier = read_classifiers(args.log).get('Resource', RESOURCE_CLASSIFIER)
+                workflow_log, resource_log = load_encoded_views(
+                    args.log, [classifier or DEFAULT_ACTIVITY_KEYS, resource_classifier], args.parser, args.workers,
+                    cache, variants=not args.no_variants, profiler=profiler)
+                with stage(profiler, 'count', workflow_log.total_events):
+                    directly_follows = count_parallel(workflow_log, args.workers)
+            else:
+                workflow_log, directly_follows = load_workflow_log(args.log, args.parser, args.workers, cache,
+                                                                   variants=not args.no_variants, classifier=classifier,
+                                                                   profiler=profiler)
+            record.events = workflow_log.total_events
+            record.info.update(traces=workflow_log.num_traces, variants=len(workflow_log),
+                               activities=workflow_log.num_activities)
+    except FileNotFoundError:
+        print(f"Błąd: Plik logu '{args.log}' nie został znaleziony.")
+        return
+    except KeyError as e:
+        print(f"Błąd: {e.args[0]}")
+        return
     except Exception as e:
-        print(f"Błąd podczas renderowania grafu BPMN Graphviz: {e}")
-        print("Upewnij się, że Graphviz jest zainstalowany i dostępny w ścieżce systemowej (PATH).")
-        return None
+        print(f"Błąd podczas parsowania pliku XES: {e}")
+        return
 
-# --- Główna Logika Skryptu ---
+    print(f"Log '{args.log}' wczytany pomyślnie.")
 
-if __name__ == "__main__":
-    if MINER_TYPE == 'heuristic':
+    if not workflow_log:
+        print("Błąd: Nie udało się wyekstrahować żadnych śladów przepływu pracy z logu. Sprawdź strukturę pliku XES i nazwy atrybutów.")
+        return
+
+    print(f"Wyekstrahowano {workflow_log.num_traces} śladów ({len(workflow_log)} unikalnych wariantów).")
+    if args.variants_report:
+        print_variant_report(workflow_log, args.variants_report)
+
+    with stage(profiler, 'dfg_dicts'):
+        activity_counter, transition_counter, direct_succession_rel = directly_follows.to_dicts()
+
+    all_activities = set(activity_counter.keys())
+    if not all_activities:
+        print("Błąd: Nie znaleziono żadnych aktywności w logu.")
+        return
+
+    print(f"Znaleziono {len(all_activities)} unikalnych aktywności.")
+
+    if args.miner == 'heuristic':
         print("\n--- Generowanie Grafu Heurystycznego ---")
-        print(f"Próg częstotliwości aktywności: {ACTIVITY_FREQUENCY_THRESHOLD}")
-        print(f"Próg częstotliwości przejść: {TRANSITION_FREQUENCY_THRESHOLD}")
-        heuristic_graph = generate_heuristic_graph(
-            activity_counter,
-            transition_counter,
-            direct_succession_rel,
-            ACTIVITY_FREQUENCY_THRESHOLD,
-            TRANSITION_FREQUENCY_THRESHOLD,
-            OUTPUT_HEURISTIC_BASE
-        )
-
-
-    elif MINER_TYPE == 'alpha':
+        print(f"Próg częstotliwości aktywności: {args.act_threshold}")
+        print(f"Próg częstotliwości przejść: {args.trans_threshold}")
+        heuristic_transitions = transition_counter
+        heuristic_base = OUTPUT_HEURISTIC_BASE
+        if args.dependency_threshold is not None:
+            print(f"Próg miary zależności: {args.dependency_threshold}")
+            with stage(profiler, 'heuristics', workflow_log.total_events):
+                events, offsets = workflow_log.as_numpy()
+                heuristics_net = mine_heuristics_net(
+                    directly_follows,
+                    two_loop_matrix(events, offsets, workflow_log.num_activities, workflow_log.trace_weights()),
+                    dependency_threshold=args.dependency_threshold,
+                    positive_observations=args.positive_observations,
+                    relative_to_best=args.relative_to_best,
+                    loop_threshold=args.loop_threshold,
+                    and_threshold=args.and_threshold
+                )
+            heuristic_transitions = heuristics_net.edges
+            heuristic_base = f"{OUTPUT_HEURISTIC_BASE}_dep{args.dependency_threshold}"
+            print(f"Zaakceptowano {len(heuristic_transitions)} z {len(transition_counter)} przejść.")
+            for activity in sorted(all_activities):
+                split_type = heuristics_net.branch_type(activity, outgoing=True)
+                join_type = heuristics_net.branch_type(activity, outgoing=False)
+                if split_type or join_type:
+                    print(f"  {activity}: rozgałęzienie={split_type or '-'}, scalenie={join_type or '-'}")
+
+        if performance is not None:
+            print_performance_report(performance, args.performance)
+            heuristic_base = f"{heuristic_base}_{args.performance}"
+
+        with stage(profiler, 'graph'):
+            heuristic_graph = generate_heuristic_graph(
+                activity_counter,
+                heuristic_transitions,
+                direct_succession_rel,
+                args.act_threshold,
+                args.trans_threshold,
+                heuristic_base,
+                performance=performance,
+                statistic=args.performance or 'mean',
+                render=args.render,
+                exports=args.export,
+                max_nodes=args.max_nodes,
+                max_edges=args.max_edges,
+                profiler=profiler
+            )
+
+
+    elif args.miner == 'alpha':
         print("\n--- Generowanie Grafu BPMN (Algorytm Alpha) ---")
-        causality, parallel, start_events, end_events, inv_causality = calculate_alpha_relations(
-            workflow_log,
-            all_activities
-        )
-        bpmn_graph = generate_bpmn_graph(
-            causality,
-            parallel,
-            start_events,
-            end_events,
-            inv_causality,
-            all_activities,
-            OUTPUT_BPMN_BASE
-        )
+        with stage(profiler, 'alpha_relations', workflow_log.total_events):
+            footprint = Footprint.from_directly_follows(directly_follows)
+            causality, parallel, start_events, end_events, inv_causality = calculate_alpha_relations(
+                workflow_log,
+                all_activities,
+                footprint=footprint
+            )
+        petri_net = None
+        if not args.alpha_simple or args.conformance:
+            with stage(profiler, 'alpha_net'):
+                petri_net = discover_alpha_net(footprint, *observed_start_end(workflow_log))
+            print(f"Odkryto {len(petri_net.places) - 2} miejsc Alpha (bez miejsc start/end).")
+        if args.conformance:
+            print("\n--- Zgodność logu z siecią Alpha (odtwarzanie tokenów) ---")
+            with stage(profiler, 'conformance', workflow_log.total_events):
+                replay = token_replay(workflow_log, petri_net, args.workers)
+            print_conformance_report(replay, petri_net)
+            if args.alpha_simple:
+                petri_net = None
+        with stage(profiler, 'graph'):
+            bpmn_graph = generate_bpmn_graph(
+                causality,
+                parallel,
+                start_events,
+                end_events,
+                inv_causality,
+                all_activities,
+                OUTPUT_BPMN_BASE,
+                petri_net=petri_net,
+                render=args.render,
+                exports=args.export,
+                profiler=profiler
+            )
 
     else:
-        print(f"Nieznany typ minera: '{MINER_TYPE}'. Wybierz 'heuristic' lub 'alpha'.")
+        print(f"Nieznany typ minera: '{args.miner}'. Wybierz 'heuristic' lub 'alpha'.")
+
+    if args.social:
+        print("\n--- Generowanie Sieci Zasobów ---")
+        with stage(profiler, 'social'):
+            if resource_log is None:
+                resource_classifier = read_classifiers(args.log).get('Resource', RESOURCE_CLASSIFIER)
+                with stage(profiler, 'load'):
+                    [resource_log] = load_encoded_views(args.log, [resource_classifier], args.parser, args.workers,
+                                                        cache, variants=not args.no_variants, profiler=profiler)
+            print(f"Znaleziono {resource_log.num_activities} zasobów.")
+            kinds = [HANDOVER, WORKING_TOGETHER] if args.social == 'both' else [args.social]
+            for kind in kinds:
+                with stage(profiler, kind, resource_log.total_events):
+                    network = handover_of_work(resource_log) if kind == HANDOVER else working_together(resource_log)
+                print(f"Najsilniejsze relacje ({kind}):")
+                for (source, target), count in network.top(5):
+                    print(f"  {source} {'->' if network.directed else '-'} {target}: {count}")
+                with stage(profiler, 'graph'):
+                    generate_social_graph(network, f"{OUTPUT_SOCIAL_BASE}_{kind}", args.social_min_count, args.render,
+                                          profiler)
+
+    if args.render == 'background':
+        print("\nOczekiwanie na zakończenie renderowania w tle...")
+        with stage(profiler, 'render_wait'):
+            rendered, scheduled = wait_for_renders()
+        print(f"Wyrenderowano {rendered} z {scheduled} grafów.")
+
+    print("\n--- Zakończono ---")
 
-    print("\n--- Zakończono ---")
\ No newline at end of file
+
+if __name__ == "__main__":
+    args = parse_args()
+    profiler = StageProfiler(trace_memory=args.profile_memory)
+    try:
+        run_pipeline(args, profiler)
+    finally:
+        if args.profile:
+            profiler.print_report()
+        if args.profile_json:
+            profiler.write_json(args.profile_json, log=args.log, miner=args.miner, workers=args.workers,
+                                render=args.render, variants=not args.no_variants)
+            print(f"Pomiary etapów zapisane jako '{args.profile_json}'")
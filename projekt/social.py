@@ -0,0 +1,131 @@
+"""Sieci społeczne zasobów (org:resource): przekazanie pracy i współpraca.
+
+Widok zasobów logu to zwykły EncodedLog, w którym klasą zdarzenia jest
+wykonawca (klasyfikator 'Resource'), więc liczenie korzysta z tej samej
+maszynerii co macierz bezpośrednich następstw:
+  * przekazanie pracy (handover of work) r1 -> r2: kolejne zdarzenia
+    przypadku wykonane przez różne zasoby - pary z maski granic śladów
+    trafiają do rzadkiej macierzy (duplikaty są sumowane),
+  * współpraca (working together) r1 - r2: liczba przypadków, w których
+    oba zasoby występują; dla macierzy incydencji przypadek x zasób A
+    (0/1) jest to A^T W A z wyzerowaną przekątną (W - krotności wariantów).
+Macierze są rzadkie (scipy.sparse), więc rozmiar rośnie z liczbą
+obserwowanych par, a nie z kwadratem liczby zasobów.
+"""
+import graphviz
+import numpy as np
+from scipy import sparse
+
+from dfg import _event_weights, trace_boundary_mask
+from export import render_graph
+from xes_stream import Classifier
+
+RESOURCE_CLASSIFIER = Classifier('Resource', ['org:resource'])
+HANDOVER, WORKING_TOGETHER = 'handover', 'together'
+
+
+class SocialNetwork:
+    """Sieć zasobów: `matrix[a, b]` to liczność relacji a -> b (rzadka macierz CSR)."""
+
+    def __init__(self, vocabulary, resource_counts, matrix, kind):
+        self.vocabulary = list(vocabulary)
+        self.resource_counts = resource_counts # liczba zdarzeń wykonanych przez zasób
+        self.matrix = matrix
+        self.kind = kind
+
+    @property
+    def directed(self):
+        return self.kind == HANDOVER
+
+    def edges(self, min_count=1):
+        """{(a, b): liczność} dla par o liczności >= min_count (dla współpracy tylko a < b wg kodu)."""
+        matrix = self.matrix if self.directed else sparse.triu(self.matrix, k=1)
+        matrix = matrix.tocoo()
+        keep = matrix.data >= min_count
+        vocabulary = self.vocabulary
+        return {(vocabulary[a], vocabulary[b]): int(count)
+                for a, b, count in zip(matrix.row[keep].tolist(), matrix.col[keep].tolist(), matrix.data[keep].tolist())}
+
+    def top(self, count=10):
+        """Najsilniejsze relacje malejąco: lista ((a, b), liczność)."""
+        return sorted(self.edges().items(), key=lambda item: -item[1])[:count]
+
+
+def _resource_counts(events, offsets, weights, n):
+    event_weights = _event_weights(offsets, weights)
+    counts = np.bincount(events, weights=event_weights, minlength=n)
+    return np.rint(counts).astype(np.int64)
+
+
+def handover_of_work(resource_log, include_self=False):
+    """Sieć przekazań pracy z widoku zasobów (EncodedLog z klasyfikatorem zasobów)."""
+    events, offsets = resource_log.as_numpy()
+    weights = None if resource_log.weights is None else resource_log.trace_weights()
+    n = resource_log.num_activities
+    mask = trace_boundary_mask(offsets, len(events))
+    sources, targets = events[:-1][mask], events[1:][mask]
+    event_weights = _event_weights(offsets, weights)
+    pair_weights = np.ones(len(sources), dtype=np.int64) if event_weights is None else event_weights[:-1][mask]
+    if not include_self:
+        different = sources != targets
+        sources, targets, pair_weights = sources[different], targets[different], pair_weights[different]
+    matrix = sparse.coo_matrix((pair_weights, (sources, targets)), shape=(n, n), dtype=np.int64).tocsr()
+    return SocialNetwork(resource_log.vocabulary, _resource_counts(events, offsets, weights, n), matrix, HANDOVER)
+
+
+def working_together(resource_log):
+    """Sieć współpracy: liczba przypadków, w których dwa zasoby występują razem."""
+    events, offsets = resource_log.as_numpy()
+    weights = resource_log.trace_weights()
+    n = resource_log.num_activities
+    cases = np.repeat(np.arange(len(resource_log)), np.diff(offsets))
+    incidence = sparse.coo_matrix((np.ones(len(events), dtype=np.int64), (cases, events)),
+                                  shape=(len(resource_log), n)).tocsr()
+    incidence.data[:] = 1 # Zasób liczony raz na przypadek
+    matrix = (incidence.T @ sparse.diags(weights, dtype=np.int64) @ incidence).tocsr()
+    matrix.setdiag(0)
+    matrix.eliminate_zeros()
+    return SocialNetwork(resource_log.vocabulary, _resource_counts(events, offsets, resource_log.weights, n),
+                         matrix.astype(np.int64), WORKING_TOGETHER)
+
+
+class SocialGraph(graphviz.Digraph):
+    def __init__(self, *args, **kwargs):
+        super(SocialGraph, self).__init__(*args, **kwargs)
+        self.graph_attr['rankdir'] = 'LR'
+        self.graph_attr['nodesep'] = '0.6'
+        self.node_attr['shape'] = 'ellipse'
+        self.node_attr['style'] = 'filled'
+        self.node_attr['fillcolor'] = '#CCE5FF'
+        self.edge_attr.update(color='#4D4D4D')
+
+    def add_resource(self, name, count, **kwargs):
+        merged_attrs = {'label': f"{name}\n({count})"}
+        merged_attrs.update(kwargs)
+        super(SocialGraph, self).node(name, **merged_attrs)
+
+    def add_relation(self, source, target, count, min_count, max_count, directed=True):
+        # Grubość linii od 1 do 6 proporcjonalnie do liczności relacji
+        penwidth = 1.0
+        if max_count > min_count:
+            penwidth = 1 + (count - min_count) / (max_count - min_count) * 5
+        attrs = {'label': str(count), 'penwidth': str(penwidth)}
+        if not directed:
+            attrs['dir'] = 'none'
+        super(SocialGraph, self).edge(source, target, **attrs)
+
+
+def generate_social_graph(network, filename_base, min_count=1, render='sync', profiler=None):
+    """Rysuje sieć zasobów (relacje o liczności >= min_count) i renderuje ją do .png."""
+    edges = network.edges(min_count)
+    G = SocialGraph(comment='Handover of Work' if network.directed else 'Working Together')
+    resources = {resource for edge in edges for resource in edge}
+    for code, resource in enumerate(network.vocabulary):
+        if resource in resources:
+            G.add_resource(resource, int(network.resource_counts[code]))
+    if edges:
+        min_count_seen, max_count_seen = min(edges.values()), max(edges.values())
+        for (source, target), count in edges.items():
+            G.add_relation(source, target, count, min_count_seen, max_count_seen, network.directed)
+
+    return render_graph(G, filename_base, "Graf sieci zasobów", render, profiler)
@@ -0,0 +1,125 @@
+"""Przegląd progów filtrowania grafu heurystycznego przy jednokrotnym zliczaniu.
+
+Log jest wczytywany i zliczany raz. Aktywności i przejścia są sortowane
+malejąco według liczności, więc widok dla progu to prefiks posortowanej
+tablicy (wyszukiwanie binarne) zamiast ponownego przeglądania słowników.
+Renderowanie wariantów (`heuristic_net_filtered_actX_transY`) odbywa się
+współbieżnie w puli wątków - czas zajmują głównie procesy `dot`, które
+nie blokują GIL.
+
+Użycie: python sweep.py --act-thresholds 0:400:100 --trans-thresholds 0 50 100
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from cache import LogCache
+from projekt import (
+    CACHE_DIR, CACHE_MAX_MB, LOG_FILE_PATH, OUTPUT_HEURISTIC_BASE, WORKERS, XES_PARSER,
+    generate_heuristic_graph, load_workflow_log,
+)
+
+
+def _prefix_length(sorted_descending, threshold):
+    """Liczba początkowych elementów tablicy malejącej, które są >= threshold."""
+    return int(np.searchsorted(-sorted_descending, -threshold, side='right'))
+
+
+class ThresholdIndex:
+    """Indeks liczności pozwalający tanio wyznaczać widoki dla dowolnych progów."""
+
+    def __init__(self, activity_counts, transition_counts):
+        self.activities = list(activity_counts)
+        activity_values = np.array([activity_counts[act] for act in self.activities], dtype=np.int64)
+        self._activity_order = np.argsort(-activity_values, kind='stable')
+        self._activity_sorted = activity_values[self._activity_order]
+
+        self.transitions = list(transition_counts)
+        self.transition_values = np.array([transition_counts[trans] for trans in self.transitions], dtype=np.int64)
+        # Przejście jest widoczne tylko, gdy obie jego aktywności spełniają próg aktywności
+        endpoint_min = np.array([min(activity_counts.get(source, 0), activity_counts.get(target, 0))
+                                 for source, target in self.transitions], dtype=np.int64)
+        self._transition_order = np.argsort(-self.transition_values, kind='stable')
+        self._transition_sorted = self.transition_values[self._transition_order]
+        self._endpoint_min_sorted = endpoint_min[self._transition_order]
+
+    def view(self, act_threshold, trans_threshold):
+        """Zwraca (filtered_activities, filtered_transitions) jak filter_heuristic_view."""
+        k = _prefix_length(self._activity_sorted, act_threshold)
+        filtered_activities = {self.activities[i] for i in self._activity_order[:k]}
+
+        m = _prefix_length(self._transition_sorted, trans_threshold)
+        selected = self._transition_order[:m][self._endpoint_min_sorted[:m] >= act_threshold]
+        selected.sort() # Zachowujemy oryginalną kolejność przejść
+        filtered_transitions = {self.transitions[i]: int(self.transition_values[i]) for i in selected}
+        return filtered_activities, filtered_transitions
+
+
+def sweep_heuristic_graphs(activity_counts, transition_counts, direct_succession,
+                           act_thresholds, trans_thresholds, filename_base, max_workers=None):
+    """Generuje graf heurystyczny dla każdej pary progów; zwraca {(act, trans): graf lub None}."""
+    index = ThresholdIndex(activity_counts, transition_counts)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            (act_threshold, trans_threshold): executor.submit(
+                generate_heuristic_graph,
+                activity_counts, transition_counts, direct_succession,
+                act_threshold, trans_threshold, filename_base,
+                filtered_view=index.view(act_threshold, trans_threshold), render='sync',
+            )
+            for act_threshold in act_thresholds
+            for trans_threshold in trans_thresholds
+        }
+        return {thresholds: future.result() for thresholds, future in futures.items()}
+
+
+def parse_thresholds(values):
+    """Zamienia argumenty typu '100' lub 'start:stop:krok' (stop włącznie) na listę progów."""
+    thresholds = []
+    for value in values:
+        if ':' in value:
+            parts = [int(part) for part in value.split(':')]
+            start, stop = parts[0], parts[1]
+            step = parts[2] if len(parts) > 2 else 1
+            if step <= 0:
+                raise argparse.ArgumentTypeError(f"Krok zakresu musi być dodatni: '{value}'")
+            thresholds.extend(range(start, stop + 1, step))
+        else:
+            thresholds.append(int(value))
+    return sorted(set(thresholds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--log', default=LOG_FILE_PATH, help="Ścieżka do pliku XES")
+    parser.add_argument('--act-thresholds', nargs='+', default=['0'], help="Progi aktywności (liczby lub start:stop:krok)")
+    parser.add_argument('--trans-thresholds', nargs='+', default=['0'], help="Progi przejść (liczby lub start:stop:krok)")
+    parser.add_argument('--output', default=OUTPUT_HEURISTIC_BASE, help="Przedrostek nazw plików wynikowych")
+    parser.add_argument('--render-threads', type=int, default=None, help="Liczba wątków renderujących")
+    parser.add_argument('--parser', choices=['stream', 'opyenxes'], default=XES_PARSER, help="Parser XES")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="Liczba procesów do parsowania i zliczania")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="Katalog pamięci podręcznej wczytanych logów")
+    parser.add_argument('--no-cache', action='store_true', help="Nie używaj pamięci podręcznej")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache or not args.cache_dir else LogCache(args.cache_dir, CACHE_MAX_MB * 1024 * 1024)
+    workflow_log, directly_follows = load_workflow_log(args.log, args.parser, args.workers, cache)
+    if not workflow_log:
+        print("Błąd: Nie udało się wyekstrahować żadnych śladów przepływu pracy z logu.")
+        return
+    activity_counter, transition_counter, direct_succession_rel = directly_follows.to_dicts()
+
+    act_thresholds = parse_thresholds(args.act_thresholds)
+    trans_thresholds = parse_thresholds(args.trans_thresholds)
+    print(f"Generowanie {len(act_thresholds) * len(trans_thresholds)} wariantów grafu heurystycznego...")
+    graphs = sweep_heuristic_graphs(
+        activity_counter, transition_counter, direct_succession_rel,
+        act_thresholds, trans_thresholds, args.output, args.render_threads,
+    )
+    rendered = sum(graph is not None for graph in graphs.values())
+    print(f"\n--- Zakończono: wyrenderowano {rendered} z {len(graphs)} wariantów ---")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Generator syntetycznych logów XES do benchmarków potoku.
+
+Model procesu to ciąg bloków aktywności: blok jednoelementowy to zwykła
+sekwencja, a blok wieloelementowy to fragment równoległy (AND), którego
+aktywności w każdym śladzie występują w losowej kolejności. Parametr
+`concurrency` (0-1) to odsetek aktywności należących do bloków
+równoległych (co najwyżej `max_parallel` aktywności w bloku), a `noise`
+(0-1) - odsetek śladów z jednym zaburzeniem: zamianą sąsiednich zdarzeń,
+usunięciem zdarzenia albo jego powtórzeniem. Każde zdarzenie ma nazwę
+aktywności, wykonawcę (org:resource), lifecycle:transition = complete i
+rosnący znacznik czasu, a nagłówek deklaruje klasyfikatory, więc log
+nadaje się dla wszystkich trybów projekt.py.
+
+Ślady są losowane i zapisywane partiami (NumPy), więc pamięć nie zależy
+od rozmiaru logu - można generować logi do setek milionów zdarzeń.
+
+Użycie: python synthetic_log.py synthetic.xes [--events 1000000] [--activities 20]
+        [--concurrency 0.3] [--noise 0.05] [--resources 10] [--seed 0]
+"""
+import argparse
+import time
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+
+DEFAULT_ACTIVITIES = 20
+DEFAULT_CONCURRENCY = 0.3
+DEFAULT_NOISE = 0.05
+DEFAULT_RESOURCES = 10
+MAX_PARALLEL = 4
+BATCH_TRACES = 10_000
+CASE_INTERVAL_S = 60       # średni odstęp między początkami przypadków
+EVENT_INTERVAL_S = 600     # średni czas między kolejnymi zdarzeniami przypadku
+START_TIME = np.datetime64('2020-01-01T00:00:00', 'ms')
+
+HEADER = """<?xml version="1.0" encoding="UTF-8" ?>
+<log xes.version="1.0" xes.features="nested-attributes" xmlns="http://www.xes-standard.org/">
+\t<extension name="Lifecycle" prefix="lifecycle" uri="http://www.xes-standard.org/lifecycle.xesext"/>
+\t<extension name="Organizational" prefix="org" uri="http://www.xes-standard.org/org.xesext"/>
+\t<extension name="Time" prefix="time" uri="http://www.xes-standard.org/time.xesext"/>
+\t<extension name="Concept" prefix="concept" uri="http://www.xes-standard.org/concept.xesext"/>
+\t<classifier name="MXML Legacy Classifier" keys="concept:name lifecycle:transition"/>
+\t<classifier name="Event Name" keys="concept:name"/>
+\t<classifier name="Resource" keys="org:resource"/>
+\t<string key="concept:name" value={name}/>
+"""
+FOOTER = "</log>\n"
+TRACE_START = '\t<trace>\n\t\t<string key="concept:name" value="%d"/>\n'
+TRACE_END = '\t</trace>\n'
+EVENT = ('\t\t<event>\n\t\t\t<string key="concept:name" value=%s/>\n\t\t\t<string key="org:resource" value=%s/>\n'
+         '\t\t\t<string key="lifecycle:transition" value="complete"/>\n'
+         '\t\t\t<date key="time:timestamp" value="%s"/>\n\t\t</event>\n')
+
+
+def activity_names(count):
+    return [f"Activity_{index:03d}" for index in range(count)]
+
+
+def build_model(num_activities, concurrency=DEFAULT_CONCURRENCY, max_parallel=MAX_PARALLEL, rng=None):
+    """Lista bloków (listy kodów aktywności); bloki dłuższe niż 1 są równoległe."""
+    rng = np.random.default_rng() if rng is None else rng
+    parallel_left = int(round(concurrency * num_activities))
+    blocks, code = [], 0
+    while code < num_activities:
+        size = 1
+        if parallel_left >= 2 and max_parallel >= 2:
+            size = int(rng.integers(2, min(max_parallel, parallel_left) + 1))
+            parallel_left -= size
+        blocks.append(list(range(code, code + size)))
+        code += size
+    # Bloki równoległe rozproszone w sekwencji zamiast skupienia na początku
+    order = rng.permutation(len(blocks))
+    blocks = [blocks[i] for i in order]
+    return blocks
+
+
+def sample_traces(blocks, count, noise=DEFAULT_NOISE, rng=None):
+    """`count` śladów (listy kodów aktywności) zgodnych z modelem i zaburzonych szumem."""
+    rng = np.random.default_rng() if rng is None else rng
+    columns = []
+    for block in blocks:
+        block = np.asarray(block, dtype=np.int32)
+        if len(block) == 1:
+            columns.append(np.broadcast_to(block, (count, 1)))
+        else:
+            columns.append(block[np.argsort(rng.random((count, len(block))), axis=1)])
+    traces = np.hstack(columns).tolist()
+
+    length = len(traces[0]) if traces else 0
+    noisy = np.flatnonzero(rng.random(count) < noise)
+    operations = rng.integers(0, 3, size=len(noisy))
+    positions = rng.integers(0, max(length - 1, 1), size=len(noisy))
+    for trace_index, operation, position in zip(noisy.tolist(), operations.tolist(), positions.tolist()):
+        trace = traces[trace_index]
+        if operation == 0 and length > 1:      # zamiana sąsiednich zdarzeń
+            trace[position], trace[position + 1] = trace[position + 1], trace[position]
+        elif operation == 1 and length > 1:    # usunięcie zdarzenia
+            del trace[position]
+        else:                                  # powtórzenie zdarzenia
+            trace.insert(position, trace[position])
+    return traces
+
+
+def _timestamps(first_case, lengths, rng):
+    """Znaczniki czasu (ISO 8601, UTC) dla kolejnych zdarzeń partii śladów."""
+    total = int(lengths.sum())
+    case_starts = START_TIME + ((first_case + np.arange(len(lengths))) * CASE_INTERVAL_S * 1000).astype('timedelta64[ms]')
+    gaps = rng.exponential(EVENT_INTERVAL_S * 1000, size=total).astype(np.int64)
+    elapsed = np.cumsum(gaps)
+    trace_offsets = np.r_[0, np.cumsum(lengths)[:-1]]
+    # Czas od początku przypadku: suma odstępów w obrębie śladu
+    elapsed -= np.repeat(elapsed[trace_offsets] - gaps[trace_offsets], lengths)
+    times = np.repeat(case_starts, lengths) + elapsed.astype('timedelta64[ms]')
+    return np.datetime_as_string(times, unit='ms', timezone='UTC').tolist()
+
+
+def write_synthetic_log(path, num_traces, num_activities=DEFAULT_ACTIVITIES, concurrency=DEFAULT_CONCURRENCY,
+                        noise=DEFAULT_NOISE, num_resources=DEFAULT_RESOURCES, seed=0,
+                        max_parallel=MAX_PARALLEL, batch_traces=BATCH_TRACES):
+    """Zapisuje log syntetyczny do `path`; zwraca liczbę zapisanych zdarzeń."""
+    rng = np.random.default_rng(seed)
+    blocks = build_model(num_activities, concurrency, max_parallel, rng)
+    names = [quoteattr(name) for name in activity_names(num_activities)]
+    resources = [quoteattr(f"Resource_{index:02d}") for index in range(num_resources)]
+    # Każda aktywność ma stały podzbiór wykonawców (zasób = aktywność + przesunięcie)
+    team_size = max(1, num_resources // 3)
+
+    written = 0
+    with open(path, 'w', encoding='utf-8') as output:
+        output.write(HEADER.format(name=quoteattr(f"synthetic_{num_traces}x{num_activities}")))
+        for first_case in range(0, num_traces, batch_traces):
+            count = min(batch_traces, num_traces - first_case)
+            traces = sample_traces(blocks, count, noise, rng)
+            lengths = np.fromiter((len(trace) for trace in traces), dtype=np.int64, count=count)
+            timestamps = _timestamps(first_case, lengths, rng)
+            shifts = rng.integers(0, team_size, size=int(lengths.sum())).tolist()
+            chunk, position = [], 0
+            for case_offset, trace in enumerate(traces):
+                chunk.append(TRACE_START % (first_case + case_offset))
+                for code in trace:
+                    resource = resources[(code + shifts[position]) % num_resources]
+                    chunk.append(EVENT % (names[code], resource, timestamps[position]))
+                    position += 1
+                chunk.append(TRACE_END)
+            output.write(''.join(chunk))
+            written += position
+        output.write(FOOTER)
+    return written
+
+
+def traces_for_events(num_events, num_activities=DEFAULT_ACTIVITIES):
+    """Liczba śladów dająca w przybliżeniu `num_events` zdarzeń (szum zmienia długości o ±1)."""
+    return max(1, round(num_events / num_activities))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output', help="Ścieżka pliku XES do zapisania")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--events', type=int, default=1_000_000, help="Przybliżona liczba zdarzeń")
+    size.add_argument('--traces', type=int, help="Liczba śladów (zamiast --events)")
+    parser.add_argument('--activities', type=int, default=DEFAULT_ACTIVITIES, help="Liczba aktywności w modelu")
+    parser.add_argument('--concurrency', type=float, default=DEFAULT_CONCURRENCY,
+                        help="Odsetek aktywności w blokach równoległych (0-1)")
+    parser.add_argument('--max-parallel', type=int, default=MAX_PARALLEL, help="Maksymalny rozmiar bloku równoległego")
+    parser.add_argument('--noise', type=float, default=DEFAULT_NOISE, help="Odsetek zaburzonych śladów (0-1)")
+    parser.add_argument('--resources', type=int, default=DEFAULT_RESOURCES, help="Liczba wykonawców")
+    parser.add_argument('--seed', type=int, default=0, help="Ziarno generatora liczb losowych")
+    args = parser.parse_args()
+
+    num_traces = args.traces or traces_for_events(args.events, args.activities)
+    start = time.perf_counter()
+    written = write_synthetic_log(args.output, num_traces, args.activities, args.concurrency, args.noise,
+                                  args.resources, args.seed, args.max_parallel)
+    elapsed = time.perf_counter() - start
+    print(f"Zapisano '{args.output}': {num_traces} śladów, {written} zdarzeń w {elapsed:.1f} s "
+          f"({written / elapsed:,.0f} zdarzeń/s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Deduplikacja śladów do wariantów (unikalnych sekwencji aktywności) z krotnościami.
+
+W typowych logach tysiące śladów powtarzają kilkaset różnych sekwencji.
+Indeks wariantów haszuje każdy ślad jako krotkę już w trakcie parsowania,
+więc do EncodedLog trafia każdy wariant tylko raz, a jego liczność ląduje
+w `weights`. Wszystkie przebiegi zliczające (DirectlyFollowsCounts,
+two_loop_matrix) uwzględniają wagi, a relacje Alpha zależą tylko od
+istnienia par, więc wyniki są identyczne jak dla pełnego logu.
+"""
+from array import array
+
+import numpy as np
+
+from encoded_log import EncodedLog
+
+
+class VariantIndex:
+    """Przyrostowy indeks wariantów: krotka aktywności -> numer wariantu."""
+
+    def __init__(self):
+        self.encoded_log = EncodedLog()
+        self._variant_ids = {}
+        self._counts = []
+
+    def add(self, trace, count=1):
+        """Dodaje ślad (sekwencję nazw aktywności); puste ślady są pomijane."""
+        if not trace:
+            return
+        key = tuple(trace)
+        variant_id = self._variant_ids.get(key)
+        if variant_id is None:
+            variant_id = len(self._counts)
+            self._variant_ids[key] = variant_id
+            self._counts.append(0)
+            self.encoded_log.append_trace(key)
+        self._counts[variant_id] += count
+
+    def to_encoded_log(self):
+        """EncodedLog wariantów z krotnościami w `weights`."""
+        self.encoded_log.weights = array('q', self._counts)
+        return self.encoded_log
+
+    @classmethod
+    def from_traces(cls, traces):
+        """Buduje log wariantów z iterowalnej kolekcji śladów (np. iter_traces)."""
+        index = cls()
+        for trace in traces:
+            index.add(trace)
+        return index.to_encoded_log()
+
+
+def deduplicate(encoded_log):
+    """Scala powtarzające się ślady (np. po EncodedLog.concatenate) w log wariantów.
+
+    Klucze haszowane są na surowych bajtach kodów śladu, bez dekodowania nazw.
+    """
+    events, offsets = encoded_log.as_numpy()
+    weights = encoded_log.trace_weights()
+    variant_ids = {}
+    first_trace, counts = [], []
+    for i in range(len(encoded_log)):
+        key = events[offsets[i]:offsets[i + 1]].tobytes()
+        variant_id = variant_ids.get(key)
+        if variant_id is None:
+            variant_id = variant_ids[key] = len(counts)
+            first_trace.append(i)
+            counts.append(0)
+        counts[variant_id] += int(weights[i])
+
+    result = EncodedLog()
+    result.vocabulary = list(encoded_log.vocabulary)
+    result.codes = dict(encoded_log.codes)
+    for i in first_trace:
+        result.events.frombytes(events[offsets[i]:offsets[i + 1]].astype(np.int32).tobytes())
+        result.offsets.append(len(result.events))
+    result.weights = array('q', counts)
+    return result
+
+
+def variant_report(encoded_log, top=None):
+    """Raport wariantów malejąco wg liczności.
+
+    Zwraca listę (liczność, udział, udział_skumulowany, aktywności).
+    """
+    weights = encoded_log.trace_weights()
+    total = int(weights.sum())
+    order = np.argsort(-weights, kind='stable')
+    if top is not None:
+        order = order[:top]
+    report = []
+    cumulative = 0
+    for i in order.tolist():
+        count = int(weights[i])
+        cumulative += count
+        report.append((count, count / total, cumulative / total, encoded_log[i]))
+    return report
+
+
+def print_variant_report(encoded_log, top=20, max_width=100):
+    """Wypisuje raport wariantów w postaci tabeli."""
+    report = variant_report(encoded_log, top)
+    print(f"\nWarianty: {len(encoded_log)} unikalnych na {encoded_log.num_traces} śladów")
+    print(f"{'#':>4} {'liczba':>8} {'udział':>8} {'skum.':>8} {'dł.':>4}  sekwencja")
+    for rank, (count, share, cumulative, activities) in enumerate(report, start=1):
+        sequence = ' > '.join(activities)
+        if len(sequence) > max_width:
+            sequence = sequence[:max_width - 3] + '...'
+        print(f"{rank:>4} {count:>8} {share:>8.2%} {cumulative:>8.2%} {len(activities):>4}  {sequence}")
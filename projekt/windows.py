@@ -0,0 +1,251 @@
+"""Grafy bezpośrednich następstw w oknach czasowych i wykrywanie dryfu procesu.
+
+Każde zdarzenie ma znacznik czasu `time:timestamp`, a przejście a -> b
+przypisywane jest do chwili wystąpienia b. Oś czasu dzielona jest na
+kubełki długości `step`; przechowywane są tylko zajęte kubełki (rzadkie
+liczności par (kubełek, przejście)), więc pamięć zależy od liczby
+zdarzeń, a nie od rozpiętości osi czasu. Okno przesuwne o szerokości
+k kubełków liczone jest przyrostowo na jednej macierzy n x n: przy
+przesunięciu dodawany jest najnowszy kubełek, a odejmowane te, które
+wypadły z okna (okno rozłączne to k = 1).
+
+Dryf mierzony jest odległością całkowitej zmienności (1/2 sumy |p - q|)
+między rozkładem przejść w oknie a rozkładem bazowym (pierwsze okno
+albo cały log). Okna z odległością powyżej progu są oznaczane.
+
+Użycie: python windows.py --window 7d --step 1d --drift-threshold 0.2 [--render drift]
+"""
+import argparse
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+
+from dfg import DirectlyFollowsCounts, trace_boundary_mask
+from xes_stream import read_timed_log
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+DRIFT_THRESHOLD = 0.2
+MAX_BUCKETS_WARNING = 100_000 # Powyżej - ostrzeżenie o odstających znacznikach czasu
+
+
+def parse_duration(value):
+    """Zamienia napis typu '90s', '30m', '12h', '7d', '2w' (lub liczbę sekund) na sekundy."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*', str(value))
+    if not match:
+        raise argparse.ArgumentTypeError(f"Niepoprawny czas trwania: '{value}'")
+    seconds = float(match.group(1)) * DURATION_UNITS.get(match.group(2) or 's')
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError(f"Czas trwania musi być dodatni: '{value}'")
+    return seconds
+
+
+class BucketedCounts:
+    """Liczności aktywności i przejść w kubełkach czasu o długości `step` sekund.
+
+    Przechowywane są tylko zajęte kubełki: posortowane trójki (kubełek,
+    kod, liczność) osobno dla aktywności i dla przejść (kod pary
+    `src * n + dst`). Kubełek k to przedział [origin + k * step,
+    origin + (k + 1) * step), a `num_buckets` to liczba kubełków na całej
+    osi czasu (łącznie z pustymi).
+    """
+
+    def __init__(self, vocabulary, origin, step, num_buckets, activity_entries, pair_entries):
+        self.vocabulary = list(vocabulary)
+        self.origin = origin
+        self.step = step
+        self.num_buckets = num_buckets
+        self.activity_entries = activity_entries  # (kubełki, kody aktywności, liczności)
+        self.pair_entries = pair_entries          # (kubełki, kody par, liczności)
+
+    @staticmethod
+    def _sparse_counts(buckets, codes, num_codes):
+        """Posortowane (kubełek, kod, liczność) dla niezerowych liczności."""
+        keys, counts = np.unique(buckets * num_codes + codes, return_counts=True)
+        return keys // num_codes, keys % num_codes, counts.astype(np.int64)
+
+    @classmethod
+    def from_timed_log(cls, encoded_log, timestamps, step, origin=None):
+        """Zlicza kubełki jednym przebiegiem po zdarzeniach (zdarzenia bez czasu są pomijane)."""
+        events, offsets = encoded_log.as_numpy()
+        n = encoded_log.num_activities
+        timed = ~np.isnan(timestamps)
+        if origin is None:
+            origin = float(timestamps[timed].min()) if timed.any() else 0.0
+        buckets = np.full(len(timestamps), -1, dtype=np.int64)
+        buckets[timed] = np.floor((timestamps[timed] - origin) / step).astype(np.int64)
+        timed &= buckets >= 0
+        num_buckets = int(buckets.max()) + 1 if timed.any() else 0
+
+        activity_entries = cls._sparse_counts(buckets[timed], events[timed].astype(np.int64), max(n, 1))
+        # Przejście należy do kubełka zdarzenia docelowego
+        pairs = trace_boundary_mask(offsets, len(events)) & timed[1:]
+        pair_codes = events[:-1][pairs].astype(np.int64) * n + events[1:][pairs]
+        pair_entries = cls._sparse_counts(buckets[1:][pairs], pair_codes, max(n * n, 1))
+        return cls(encoded_log.vocabulary, origin, step, num_buckets, activity_entries, pair_entries)
+
+    def __len__(self):
+        return self.num_buckets
+
+    @property
+    def occupied(self):
+        """Posortowane numery kubełków zawierających zdarzenia."""
+        return np.unique(self.activity_entries[0])
+
+    def total(self):
+        """DirectlyFollowsCounts dla wszystkich kubełków razem."""
+        n = len(self.vocabulary)
+        _, activity_codes, activity_counts = self.activity_entries
+        _, pair_codes, pair_counts = self.pair_entries
+        activity_total = np.bincount(activity_codes, weights=activity_counts, minlength=n).astype(np.int64)
+        matrix = np.bincount(pair_codes, weights=pair_counts, minlength=n * n).astype(np.int64).reshape(n, n)
+        return DirectlyFollowsCounts(self.vocabulary, activity_total, matrix)
+
+    def windows(self, width=1):
+        """Generator (początek, koniec, DirectlyFollowsCounts) okien o szerokości `width` kubełków.
+
+        Okna przesuwane są o jeden kubełek, ale zwracane są tylko okna
+        kończące się zajętym kubełkiem (okna kończące się pustym kubełkiem
+        nie wnoszą nowych zdarzeń). Jeden akumulator n x n aktualizowany jest
+        przez dodanie liczności kubełka wchodzącego i odjęcie wychodzących,
+        więc zwracany obiekt jest ważny tylko do następnego kroku (w razie
+        potrzeby trzeba go skopiować). Gdy kubełków jest mniej niż `width`,
+        zwracane jest jedno okno z całością.
+        """
+        n = len(self.vocabulary)
+        activity_counts = np.zeros(n, dtype=np.int64)
+        matrix = np.zeros((n, n), dtype=np.int64)
+        flat = matrix.reshape(-1)
+        counts = DirectlyFollowsCounts(self.vocabulary, activity_counts, matrix)
+
+        activity_buckets, activity_codes, activity_values = self.activity_entries
+        pair_buckets, pair_codes, pair_values = self.pair_entries
+        occupied = self.occupied
+        # Zakresy wpisów każdego zajętego kubełka w posortowanych tablicach
+        activity_bounds = np.searchsorted(activity_buckets, np.r_[occupied, occupied[-1:] + 1] if len(occupied) else [])
+        pair_bounds = np.searchsorted(pair_buckets, np.r_[occupied, occupied[-1:] + 1] if len(occupied) else [])
+
+        def apply(index, sign):
+            a0, a1 = activity_bounds[index], activity_bounds[index + 1]
+            p0, p1 = pair_bounds[index], pair_bounds[index + 1]
+            # Kody w obrębie kubełka są unikalne, więc zwykłe przypisanie z indeksami wystarcza
+            activity_counts[activity_codes[a0:a1]] += sign * activity_values[a0:a1]
+            flat[pair_codes[p0:p1]] += sign * pair_values[p0:p1]
+
+        oldest = 0
+        occupied = occupied.tolist()
+        for index, k in enumerate(occupied):
+            apply(index, 1)
+            while occupied[oldest] <= k - width:
+                apply(oldest, -1)
+                oldest += 1
+            if k >= width - 1 or index == len(occupied) - 1:
+                first = max(k - width + 1, 0)
+                yield self.origin + first * self.step, self.origin + (k + 1) * self.step, counts
+
+
+def transition_distribution(directly_follows):
+    """Macierz udziałów przejść (sumuje się do 1) albo None dla okna bez przejść."""
+    total = directly_follows.matrix.sum()
+    return directly_follows.matrix / total if total else None
+
+
+def transition_distance(directly_follows, baseline):
+    """Odległość całkowitej zmienności rozkładów przejść (0 - identyczne, 1 - rozłączne); NaN dla pustego okna."""
+    p, q = transition_distribution(directly_follows), transition_distribution(baseline)
+    if p is None or q is None:
+        return float('nan')
+    return float(0.5 * np.abs(p - q).sum())
+
+
+def top_shifts(directly_follows, baseline, top=3):
+    """Przejścia o największej zmianie udziału: lista ((a, b), udział_w_oknie, udział_bazowy)."""
+    p, q = transition_distribution(directly_follows), transition_distribution(baseline)
+    if p is None or q is None:
+        return []
+    change = np.abs(p - q).ravel()
+    order = np.argsort(-change, kind='stable')[:top]
+    n = len(directly_follows.vocabulary)
+    vocabulary = directly_follows.vocabulary
+    return [((vocabulary[i // n], vocabulary[i % n]), float(p.flat[i]), float(q.flat[i]))
+            for i in order.tolist() if change[i] > 0]
+
+
+def detect_drift(windows, baseline=None, threshold=DRIFT_THRESHOLD, top=3):
+    """Szereg odległości okien od rozkładu bazowego.
+
+    `windows` to wynik BucketedCounts.windows; przy baseline=None bazą jest
+    (skopiowane) pierwsze niepuste okno. Liczności okien nie są
+    przechowywane - zwracane jest (baseline, raport), gdzie raport to lista
+    (indeks, początek, koniec, liczba zdarzeń, odległość, przesunięcia),
+    a przesunięcia to wynik top_shifts dla okna z dryfem (None dla pozostałych).
+    """
+    report = []
+    for index, (start, end, counts) in enumerate(windows):
+        if baseline is None and counts.matrix.any():
+            baseline = DirectlyFollowsCounts(counts.vocabulary, counts.activity_counts.copy(), counts.matrix.copy())
+        distance = transition_distance(counts, baseline) if baseline is not None else float('nan')
+        shifts = top_shifts(counts, baseline, top) if distance > threshold else None
+        report.append((index, start, end, int(counts.activity_counts.sum()), distance, shifts))
+    return baseline, report
+
+
+def format_time(seconds):
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+
+def main():
+    from export import wait_for_renders
+    from projekt import LOG_FILE_PATH, OUTPUT_HEURISTIC_BASE, generate_heuristic_graph
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--log', default=LOG_FILE_PATH, help="Ścieżka do pliku XES")
+    parser.add_argument('--window', type=parse_duration, default=parse_duration('1d'), help="Szerokość okna (np. 12h, 7d)")
+    parser.add_argument('--step', type=parse_duration, default=None, help="Przesunięcie okna (domyślnie = szerokość, okna rozłączne)")
+    parser.add_argument('--baseline', choices=['first', 'global'], default='first', help="Rozkład bazowy: pierwsze okno lub cały log")
+    parser.add_argument('--drift-threshold', type=float, default=DRIFT_THRESHOLD, help="Próg odległości oznaczającej dryf")
+    parser.add_argument('--render', choices=['none', 'drift', 'all'], default='none', help="Które okna renderować jako grafy heurystyczne")
+    parser.add_argument('--act-threshold', type=int, default=0, help="Próg częstotliwości aktywności renderowanych grafów")
+    parser.add_argument('--trans-threshold', type=int, default=0, help="Próg częstotliwości przejść renderowanych grafów")
+    parser.add_argument('--output', default=f"{OUTPUT_HEURISTIC_BASE}_window", help="Przedrostek nazw plików wynikowych")
+    args = parser.parse_args()
+
+    step = args.step or args.window
+    width = max(int(round(args.window / step)), 1)
+    if abs(width * step - args.window) > 1e-9:
+        print(f"Uwaga: szerokość okna zaokrąglona do {width} x {step:g} s.")
+
+    encoded_log, timestamps = read_timed_log(args.log)
+    if np.isnan(timestamps).all():
+        print("Błąd: Log nie zawiera znaczników czasu (time:timestamp).")
+        return
+    buckets = BucketedCounts.from_timed_log(encoded_log, timestamps, step)
+    if len(buckets) > MAX_BUCKETS_WARNING:
+        print(f"Ostrzeżenie: oś czasu obejmuje {len(buckets)} kubełków (zajętych: {len(buckets.occupied)}) - "
+              "sprawdź, czy log nie zawiera odstających znaczników czasu.")
+    baseline = buckets.total() if args.baseline == 'global' else None
+    baseline, report = detect_drift(buckets.windows(width), baseline, args.drift_threshold)
+
+    print(f"Okna: {len(report)} (szerokość {width * step:g} s, krok {step:g} s), "
+          f"kubełki: {len(buckets)} (zajęte: {len(buckets.occupied)})")
+    print(f"{'#':>4} {'początek':>16} {'koniec':>16} {'zdarzenia':>9} {'odległość':>9}")
+    for index, start, end, num_events, distance, shifts in report:
+        marker = '  DRYF' if shifts is not None else ''
+        print(f"{index:>4} {format_time(start):>16} {format_time(end):>16} "
+              f"{num_events:>9} {distance:>9.3f}{marker}")
+        for (source, target), share, base_share in shifts or []:
+            print(f"{'':>6}{source} -> {target}: {share:.1%} (baza {base_share:.1%})")
+
+    if args.render != 'none':
+        # Drugi przebieg po oknach (tani, tylko zajęte kubełki) zamiast przechowywania ich liczności
+        drifted = {index for index, *_, shifts in report if shifts is not None}
+        for index, (start, end, counts) in enumerate(buckets.windows(width)):
+            if args.render == 'all' or index in drifted:
+                activity_counter, transition_counter, direct_succession_rel = counts.to_dicts()
+                generate_heuristic_graph(activity_counter, transition_counter, direct_succession_rel,
+                                         args.act_threshold, args.trans_threshold, f"{args.output}{index:03d}")
+    wait_for_renders()
+
+
+if __name__ == "__main__":
+    main()
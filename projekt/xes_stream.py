@@ -0,0 +1,335 @@
+"""Strumieniowe wczytywanie logów XES.
+
+Zamiast budować pełne drzewo obiektów opyenxes (XLog/XTrace/XEvent/XAttribute)
+czytamy plik przyrostowo przez `iterparse` i zwracamy ślad po śladzie jako
+listę nazw aktywności (lub, przez `iter_trace_events`, wybrane atrybuty
+zdarzeń). Przetworzone elementy XML są od razu czyszczone, więc
+zużycie pamięci nie zależy od rozmiaru pliku.
+
+Klasę zdarzenia wyznacza klasyfikator (Classifier) - domyślnie pierwszy
+znaleziony klucz z DEFAULT_ACTIVITY_KEYS, albo klasyfikator zadeklarowany
+w nagłówku logu (`<classifier name="..." keys="..."/>`). Kilka
+klasyfikatorów można zastosować w jednym przebiegu (`iter_classified_traces`).
+"""
+import math
+import shlex
+import xml.etree.ElementTree as ET
+from array import array
+from datetime import datetime
+from operator import itemgetter
+
+import numpy as np
+
+from encoded_log import EncodedLog
+
+XES_NAMESPACE = 'http://www.xes-standard.org/'
+
+# Kolejność ma znaczenie: pierwszy znaleziony klucz wyznacza nazwę aktywności
+DEFAULT_ACTIVITY_KEYS = ('Activity', 'concept:name')
+
+# Kody atrybutu lifecycle:transition (0 = inna wartość lub brak)
+LIFECYCLE_START, LIFECYCLE_COMPLETE = 1, 2
+LIFECYCLE_CODES = {'start': LIFECYCLE_START, 'complete': LIFECYCLE_COMPLETE}
+
+
+def _tags(name):
+    """Zwraca nazwę znacznika z przestrzenią nazw XES i bez niej."""
+    return {name, f"{{{XES_NAMESPACE}}}{name}"}
+
+
+EVENT_TAGS = _tags('event')
+TRACE_TAGS = _tags('trace')
+CLASSIFIER_TAGS = _tags('classifier')
+
+
+class Classifier:
+    """Klasyfikator zdarzeń: nazwa i klucze atrybutów wyznaczające klasę zdarzenia.
+
+    Jak w XES, klasa to wartości kluczy połączone znakiem '+' (np.
+    'AnalyzeDefect+start'); brakujące atrybuty są pomijane. Przy
+    first_match=True klasą jest wartość pierwszego obecnego klucza
+    (dotychczasowe zachowanie sekcji 2 projekt.py). Zdarzenie bez żadnego
+    z kluczy nie ma klasy (None).
+    """
+
+    def __init__(self, name, keys, first_match=False):
+        self.name = name
+        self.keys = tuple(keys)
+        self.first_match = first_match
+
+    @property
+    def cache_key(self):
+        """Napis identyfikujący klasyfikator (np. w kluczu pamięci podręcznej)."""
+        return '|'.join(self.keys) if self.first_match else '+'.join(self.keys)
+
+    def classify(self, attributes):
+        """Klasa zdarzenia dla słownika klucz -> wartość."""
+        values = [attributes[key] for key in self.keys if attributes.get(key) is not None]
+        if not values:
+            return None
+        return values[0] if self.first_match else '+'.join(values)
+
+    def compile(self, positions):
+        """Funkcja krotka wartości -> klasa, dla krotek ułożonych wg `positions` (klucz -> indeks)."""
+        indices = [positions[key] for key in self.keys]
+        if len(indices) == 1:
+            return itemgetter(indices[0])
+        if self.first_match:
+            return lambda values: next((values[i] for i in indices if values[i] is not None), None)
+        return lambda values: '+'.join([values[i] for i in indices if values[i] is not None]) or None
+
+    def __eq__(self, other):
+        return (isinstance(other, Classifier) and
+                (self.keys, self.first_match) == (other.keys, other.first_match))
+
+    def __hash__(self):
+        return hash((self.keys, self.first_match))
+
+    def __repr__(self):
+        return f"Classifier({self.name!r}, {' '.join(self.keys)!r})"
+
+
+DEFAULT_CLASSIFIER = Classifier('Activity', DEFAULT_ACTIVITY_KEYS, first_match=True)
+
+
+def as_classifier(activity_keys):
+    """Classifier bez zmian, a krotka kluczy jako klasyfikator 'pierwszy znaleziony klucz'."""
+    if isinstance(activity_keys, Classifier):
+        return activity_keys
+    return Classifier('Activity', activity_keys, first_match=True)
+
+
+def read_classifiers(log_file):
+    """Klasyfikatory zadeklarowane w nagłówku logu: {nazwa: Classifier}.
+
+    Czytany jest tylko nagłówek (do pierwszego <trace>). Klucze zawierające
+    spacje są w XES ujmowane w apostrofy.
+    """
+    classifiers = {}
+    for event_type, elem in ET.iterparse(log_file, events=('start',)):
+        if elem.tag in TRACE_TAGS:
+            break
+        if elem.tag in CLASSIFIER_TAGS:
+            name, keys = elem.get('name'), elem.get('keys')
+            if name and keys:
+                classifiers[name] = Classifier(name, shlex.split(keys))
+    return classifiers
+
+
+def iter_traces(log_file, activity_keys=DEFAULT_ACTIVITY_KEYS):
+    """Generator śladów: dla każdego <trace> zwraca listę nazw aktywności.
+
+    `log_file` to ścieżka lub otwarty plik binarny. Odczytywane są wyłącznie
+    bezpośrednie atrybuty zdarzeń o kluczach z `activity_keys` (pierwszy
+    pasujący klucz wygrywa, jak w sekcji 2 projekt.py) albo klasyfikatora
+    (Classifier). Zdarzenia bez klasy są pomijane; puste ślady również są
+    zwracane - o ich odrzuceniu decyduje wywołujący.
+    """
+    if isinstance(activity_keys, Classifier):
+        if not activity_keys.first_match and len(activity_keys.keys) > 1:
+            for (workflow_trace,) in iter_classified_traces(log_file, [activity_keys]):
+                yield workflow_trace
+            return
+        activity_keys = activity_keys.keys
+    activity_keys = tuple(activity_keys)
+    wanted_keys = set(activity_keys)
+    single_key = activity_keys[0] if len(activity_keys) == 1 else None
+
+    context = iter(ET.iterparse(log_file, events=('start', 'end')))
+    _, root = next(context)  # Element <log> - czyścimy go po każdym śladzie
+
+    workflow_trace = []
+    for event_type, elem in context:
+        if event_type != 'end':
+            continue
+        tag = elem.tag
+        if tag in EVENT_TAGS:
+            if single_key is not None:
+                for attribute in elem:
+                    if attribute.get('key') == single_key:
+                        workflow_trace.append(attribute.get('value'))
+                        break
+            else:
+                found = {}
+                for attribute in elem:
+                    key = attribute.get('key')
+                    if key in wanted_keys:
+                        found[key] = attribute.get('value')
+                for key in activity_keys:
+                    if key in found:
+                        workflow_trace.append(found[key])
+                        break
+            elem.clear()
+        elif tag in TRACE_TAGS:
+            yield workflow_trace
+            workflow_trace = []
+            elem.clear()
+            root.clear()
+
+
+def iter_trace_events(log_file, attribute_keys):
+    """Generator śladów z atrybutami zdarzeń: (case_id, [krotka wartości na zdarzenie]).
+
+    Dla każdego zdarzenia zwracana jest krotka wartości atrybutów z
+    `attribute_keys` (None, gdy atrybutu brak). `case_id` to concept:name
+    śladu (lub jego numer porządkowy, gdy go brak). Wartości są napisami -
+    np. znaczniki czasu zamienia `parse_timestamp`.
+    """
+    attribute_keys = tuple(attribute_keys)
+    positions = {key: position for position, key in enumerate(attribute_keys)}
+    empty = [None] * len(attribute_keys)
+
+    context = iter(ET.iterparse(log_file, events=('start', 'end')))
+    _, root = next(context)
+
+    trace_events = []
+    trace_number = 0
+    for event_type, elem in context:
+        if event_type != 'end':
+            continue
+        tag = elem.tag
+        if tag in EVENT_TAGS:
+            values = list(empty)
+            for attribute in elem:
+                position = positions.get(attribute.get('key'))
+                if position is not None:
+                    values[position] = attribute.get('value')
+            trace_events.append(tuple(values))
+            elem.clear()
+        elif tag in TRACE_TAGS:
+            case_id = str(trace_number)
+            for attribute in elem:
+                if attribute.get('key') == 'concept:name' and attribute.tag not in EVENT_TAGS:
+                    case_id = attribute.get('value')
+                    break
+            yield case_id, trace_events
+            trace_events = []
+            trace_number += 1
+            elem.clear()
+            root.clear()
+
+
+def iter_classified_traces(log_file, classifiers):
+    """Generator śladów widzianych przez kilka klasyfikatorów naraz, w jednym przebiegu.
+
+    Dla każdego <trace> zwraca krotkę list klas zdarzeń - po jednej liście
+    na klasyfikator (zdarzenia bez klasy są pomijane). Atrybuty zdarzenia
+    czytane są raz, a klasy wyznaczają funkcje skompilowane przez
+    Classifier.compile.
+    """
+    classifiers = [as_classifier(classifier) for classifier in classifiers]
+    keys = list(dict.fromkeys(key for classifier in classifiers for key in classifier.keys))
+    positions = {key: position for position, key in enumerate(keys)}
+    extractors = [classifier.compile(positions) for classifier in classifiers]
+    for _, events in iter_trace_events(log_file, keys):
+        yield tuple([event_class for event_class in map(extract, events) if event_class is not None]
+                    for extract in extractors)
+
+
+def parse_timestamp(value):
+    """Zamienia wartość atrybutu <date> XES (ISO 8601) na datetime; None dla braku wartości."""
+    if value is None:
+        return None
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+
+def iter_event_stream(log_file, activity_keys=DEFAULT_ACTIVITY_KEYS):
+    """Strumień zdarzeń (case_id, aktywność, znacznik czasu) w kolejności z pliku.
+
+    Klasę zdarzenia wyznacza klasyfikator (lub krotka kluczy); zdarzenia bez
+    klasy są pomijane, brakujący znacznik czasu to None.
+    """
+    classifier = as_classifier(activity_keys)
+    keys = classifier.keys + ('time:timestamp',)
+    classify = classifier.compile({key: position for position, key in enumerate(keys)})
+    for case_id, events in iter_trace_events(log_file, keys):
+        for values in events:
+            activity = classify(values)
+            if activity is not None:
+                yield case_id, activity, parse_timestamp(values[-1])
+
+
+def iter_timed_traces(log_file, activity_keys=DEFAULT_ACTIVITY_KEYS):
+    """Generator śladów ze znacznikami czasu: (aktywności, nazwy, czasy, kody lifecycle).
+
+    Czasy to sekundy epoki (NaN przy braku `time:timestamp`), a kody to
+    LIFECYCLE_CODES atrybutu `lifecycle:transition`. Klasę zdarzenia
+    wyznacza klasyfikator (lub krotka kluczy); zdarzenia bez klasy są
+    pomijane, puste ślady również są zwracane. Nazwy to wartości
+    DEFAULT_ACTIVITY_KEYS (bez lifecycle) - po nich łączone są zdarzenia
+    start i complete, także gdy klasa zawiera lifecycle:transition.
+    """
+    classifier = as_classifier(activity_keys)
+    name_classifier = as_classifier(DEFAULT_ACTIVITY_KEYS)
+    keys = tuple(dict.fromkeys(classifier.keys + name_classifier.keys)) + ('time:timestamp', 'lifecycle:transition')
+    positions = {key: position for position, key in enumerate(keys)}
+    classify, name_of = classifier.compile(positions), name_classifier.compile(positions)
+    for _, events in iter_trace_events(log_file, keys):
+        activities, names, timestamps, lifecycles = [], [], [], []
+        for values in events:
+            activity = classify(values)
+            if activity is None:
+                continue
+            activities.append(activity)
+            name = name_of(values)
+            names.append(activity if name is None else name)
+            timestamp = parse_timestamp(values[-2])
+            timestamps.append(timestamp.timestamp() if timestamp is not None else math.nan)
+            lifecycles.append(LIFECYCLE_CODES.get((values[-1] or '').lower(), 0))
+        yield activities, names, timestamps, lifecycles
+
+
+def read_timed_log(log_file, activity_keys=DEFAULT_ACTIVITY_KEYS, with_lifecycle=False):
+    """Wczytuje log jako (EncodedLog, znaczniki czasu zdarzeń w sekundach epoki).
+
+    Tablica czasów jest równoległa do `encoded_log.events`; brak znacznika
+    czasu to NaN. Zdarzenia bez klasy i puste ślady są pomijane. Przy
+    with_lifecycle=True zwracana jest też tablica kodów
+    `lifecycle:transition` (LIFECYCLE_CODES, 0 = inny lub brak).
+    """
+    encoded_log = EncodedLog()
+    timestamps = array('d')
+    lifecycles = array('b')
+    for trace, _, trace_timestamps, trace_lifecycles in iter_timed_traces(log_file, activity_keys):
+        if trace:
+            encoded_log.append_trace(trace)
+            timestamps.extend(trace_timestamps)
+            lifecycles.extend(trace_lifecycles)
+    timestamps = np.frombuffer(timestamps, dtype=np.float64)
+    if with_lifecycle:
+        return encoded_log, timestamps, np.frombuffer(lifecycles, dtype=np.int8)
+    return encoded_log, timestamps
+
+
+def read_workflow_log(log_file_path, activity_keys=DEFAULT_ACTIVITY_KEYS):
+    """Wczytuje cały log strumieniowo, pomijając puste ślady."""
+    return [trace for trace in iter_traces(log_file_path, activity_keys) if trace]
+
+
+def read_workflow_log_opyenxes(log_file_path, activity_keys=DEFAULT_ACTIVITY_KEYS):
+    """Dotychczasowa ścieżka: pełny model obiektowy opyenxes (wolniejsza, zachowana jako fallback)."""
+    from opyenxes.data_in.XUniversalParser import XUniversalParser
+
+    classifier = as_classifier(activity_keys)
+    with open(log_file_path) as log_file:
+        log = XUniversalParser().parse(log_file)[0]
+
+    workflow_log = []
+    for trace_index, trace in enumerate(log):
+        workflow_trace = []
+        for event in trace:
+            try:
+                attributes = event.get_attributes()
+                event_class = classifier.classify({key: attributes[key].get_value()
+                                                   for key in classifier.keys if key in attributes})
+                if event_class is not None:
+                    workflow_trace.append(event_class)
+            except Exception as e:
+                print(f"Ostrzeżenie: Problem z odczytem atrybutu zdarzenia w śladzie {trace_index}: {e}")
+
+        if workflow_trace: # Dodajemy tylko niepuste ślady
+            workflow_log.append(workflow_trace)
+
+    return workflow_log